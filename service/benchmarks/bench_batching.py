@@ -0,0 +1,97 @@
+"""
+Бенчмарк пакетной обработки задачи set_price.
+
+Скрипт ставит в очередь по одной задаче на каждую подписку и измеряет, сколько задач
+в секунду обрабатывает воркер Celery: пакетная задача set_price, которая обновляет
+цены пакета одним UPDATE-запросом, и прежний вариант с отдельной транзакцией,
+сохранением подписки и очисткой кэша на каждую подписку. Воркер, брокер memory://
+и кэш работают в процессе скрипта (настройки service.settings_loadtest), нужна только база данных.
+
+Запуск из каталога service:
+    python -m benchmarks.bench_batching --tasks 2000 --workers 2
+"""
+
+import argparse
+import os
+import time
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'service.settings_loadtest')
+django.setup()
+
+from celery.contrib.testing.worker import start_worker  # noqa: E402
+from django.db import transaction  # noqa: E402
+from django.db.models import F  # noqa: E402
+
+from benchmarks.loadtest import MemorySingletonBackend, seed  # noqa: E402
+from celery_app import app  # noqa: E402
+from services.models import Subscription  # noqa: E402
+from services.pricing import find_price_drift, price_expression  # noqa: E402
+from services.signals import send_prices_changed  # noqa: E402
+from services.tasks import set_price  # noqa: E402
+from services.totals import invalidate_total_amount  # noqa: E402
+
+
+@app.task(name='benchmarks.set_price_single')
+def set_price_single(subscription_id):
+    """
+    Прежняя задача set_price: отдельная транзакция и очистка кэша на каждую подписку.
+    """
+    with transaction.atomic():
+        subscription = Subscription.objects.filter(id=subscription_id).annotate(
+            annotated_price=price_expression()).first()
+        subscription.price = subscription.annotated_price
+        subscription.save()
+        send_prices_changed([subscription_id])
+    invalidate_total_amount()
+
+
+def run(task, subscription_ids, timeout):
+    """
+    Сбрасывает цены подписок, ставит задачи в очередь и ждет пересчета всех цен.
+
+    Returns:
+        float: Количество обработанных задач в секунду.
+    """
+    subscriptions = Subscription.objects.filter(id__in=subscription_ids)
+    subscriptions.update(price=F('price') + 1)
+
+    started = time.perf_counter()
+    for subscription_id in subscription_ids:
+        task.delay(subscription_id)
+    while find_price_drift(subscriptions).exists():
+        if time.perf_counter() - started > timeout:
+            raise TimeoutError(f'{task.name} did not finish in {timeout} s')
+        time.sleep(0.1)
+    return len(subscription_ids) / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Бенчмарк пакетной обработки задачи set_price.')
+    parser.add_argument('--tasks', type=int, default=2000, help='Количество задач, по одной на подписку.')
+    parser.add_argument('--workers', type=int, default=2, help='Количество потоков воркера Celery.')
+    parser.add_argument('--timeout', type=float, default=600, help='Максимальное время одного прогона в секундах.')
+    args = parser.parse_args()
+
+    subscription_ids = list(Subscription.objects.order_by('id').values_list('id', flat=True)[:args.tasks])
+    if len(subscription_ids) < args.tasks:
+        seed(args.tasks - len(subscription_ids))
+        subscription_ids = list(Subscription.objects.order_by('id').values_list('id', flat=True)[:args.tasks])
+
+    app.conf.result_backend = 'cache+memory://'
+    app.conf.broker_connection_retry_on_startup = True
+    app.conf.singleton_backend_class = MemorySingletonBackend
+    app.conf.worker_prefetch_multiplier = 0
+
+    with start_worker(app, pool='threads', concurrency=args.workers, perform_ping_check=False, loglevel='WARNING'):
+        results = [(name, run(task, subscription_ids, args.timeout))
+                   for name, task in (('single', set_price_single), ('batched', set_price))]
+
+    print(f"{'task':>10} {'tasks/s':>10}")
+    for name, rate in results:
+        print(f'{name:>10} {rate:>10.1f}')
+
+
+if __name__ == '__main__':
+    main()
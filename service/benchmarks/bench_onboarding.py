@@ -0,0 +1,88 @@
+"""
+Бенчмарк массового создания клиентов.
+
+Измеряет количество создаваемых учетных записей в секунду для прежнего способа
+(User.objects.create_user и Client.objects.create на каждого клиента) и для
+clients.onboarding.onboard_clients с разным количеством процессов хэширования паролей.
+Каждый прогон выполняется в транзакции, которая откатывается, поэтому база данных не меняется.
+
+Запуск из каталога service:
+    python -m benchmarks.bench_onboarding --accounts 200 --processes 1 2 4 8
+"""
+
+import argparse
+import os
+import time
+import uuid
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'service.settings')
+django.setup()
+
+from django.contrib.auth.models import User  # noqa: E402
+from django.db import transaction  # noqa: E402
+
+from clients.models import Client  # noqa: E402
+from clients.onboarding import onboard_clients  # noqa: E402
+
+
+def make_accounts(count):
+    """
+    Создает учетные записи с уникальными именами пользователей.
+    """
+    prefix = uuid.uuid4().hex[:8]
+    return [
+        {
+            'username': f'bench-{prefix}-{i}',
+            'email': f'bench-{prefix}-{i}@example.com',
+            'password': 'password123',
+            'company_name': f'Bench Company {i}',
+            'company_full_address': '',
+        }
+        for i in range(count)
+    ]
+
+
+def create_one_by_one(accounts):
+    """
+    Прежний способ: хэширование пароля и два INSERT на каждого клиента.
+    """
+    for account in accounts:
+        user = User.objects.create_user(username=account['username'], email=account['email'],
+                                        password=account['password'])
+        Client.objects.create(user=user, company_name=account['company_name'])
+
+
+def measure(function, accounts):
+    """
+    Выполняет функцию в откатываемой транзакции и возвращает количество учетных записей в секунду.
+    """
+    with transaction.atomic():
+        started = time.perf_counter()
+        function(accounts)
+        elapsed = time.perf_counter() - started
+        transaction.set_rollback(True)
+    return len(accounts) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Бенчмарк массового создания клиентов.')
+    parser.add_argument('--accounts', type=int, default=200, help='Количество учетных записей в прогоне.')
+    parser.add_argument('--processes', type=int, nargs='+', default=[1, 2, 4, os.cpu_count()],
+                        help='Количество процессов хэширования паролей.')
+    parser.add_argument('--batch-size', type=int, default=1000, help='Количество учетных записей в пакете.')
+    args = parser.parse_args()
+
+    print(f'cpu cores: {os.cpu_count()}')
+    print(f"{'method':>16} {'accounts/s':>12}")
+    rate = measure(create_one_by_one, make_accounts(args.accounts))
+    print(f"{'one-by-one':>16} {rate:>12.1f}")
+    for processes in sorted(set(args.processes)):
+        rate = measure(lambda accounts: onboard_clients(accounts, args.batch_size, processes),
+                       make_accounts(args.accounts))
+        print(f"{f'bulk x{processes}':>16} {rate:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+Бенчмарк секционирования таблицы подписок.
+
+Создает во временной схеме две копии таблицы подписок одинакового содержания: обычную
+и секционированную по хэшу client_id, как services_subscription после миграции 0007.
+Для каждой измеряет время полной суммы цен (total_amount), суммы цен одного клиента
+(отсечение секций) и пересчета цен подписок одной услуги UPDATE-запросом с подзапросами
+к ценам услуги и плана и отбрасыванием дробной части, как в services.pricing.discounted_price.
+После запуска схема удаляется.
+
+Запуск из каталога service (нужен локальный PostgreSQL из настроек):
+    python -m benchmarks.bench_partitioning --rows 1000000 --partitions 16
+"""
+
+import argparse
+import os
+import time
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'service.settings')
+django.setup()
+
+from django.db import connection  # noqa: E402
+
+SCHEMA = 'bench_partitioning'
+
+SERVICES = 100
+
+CLIENTS = 100000
+
+
+def create_tables(cursor, rows, partitions):
+    """
+    Создает и заполняет таблицы услуг, планов и две таблицы подписок.
+    """
+    cursor.execute(f'DROP SCHEMA IF EXISTS {SCHEMA} CASCADE')
+    cursor.execute(f'CREATE SCHEMA {SCHEMA}')
+    cursor.execute(f"""
+        CREATE TABLE {SCHEMA}.service AS
+        SELECT id, 50 + id * 7 % 450 AS full_price FROM generate_series(1, {SERVICES}) AS id;
+        CREATE TABLE {SCHEMA}.plan AS
+        SELECT id, (ARRAY[0, 50, 15])[id] AS discount_percent FROM generate_series(1, 3) AS id;
+        ALTER TABLE {SCHEMA}.service ADD PRIMARY KEY (id);
+        ALTER TABLE {SCHEMA}.plan ADD PRIMARY KEY (id);
+    """)
+
+    columns = 'id bigint NOT NULL, client_id bigint NOT NULL, service_id bigint NOT NULL, ' \
+              'plan_id bigint NOT NULL, price integer NOT NULL'
+    cursor.execute(f'CREATE TABLE {SCHEMA}.heap ({columns})')
+    cursor.execute(f'CREATE TABLE {SCHEMA}.hash ({columns}) PARTITION BY HASH (client_id)')
+    for remainder in range(partitions):
+        cursor.execute(f'CREATE TABLE {SCHEMA}.hash_p{remainder} PARTITION OF {SCHEMA}.hash '
+                       f'FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})')
+
+    for table, primary_key in (('heap', 'id'), ('hash', 'id, client_id')):
+        cursor.execute(f"""
+            INSERT INTO {SCHEMA}.{table}
+            SELECT id, 1 + id * 7919 % {CLIENTS}, 1 + id % {SERVICES}, 1 + id % 3, 0
+            FROM generate_series(1::bigint, {rows}) AS id
+        """)
+        cursor.execute(f'ALTER TABLE {SCHEMA}.{table} ADD PRIMARY KEY ({primary_key})')
+        cursor.execute(f'CREATE INDEX ON {SCHEMA}.{table} (client_id, service_id)')
+        cursor.execute(f'CREATE INDEX ON {SCHEMA}.{table} (service_id)')
+        cursor.execute(f'VACUUM ANALYZE {SCHEMA}.{table}')
+
+
+def measure(cursor, sql, repeat):
+    """
+    Возвращает лучшее время выполнения запроса в миллисекундах.
+    """
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        cursor.execute(sql)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Бенчмарк секционирования таблицы подписок.')
+    parser.add_argument('--rows', type=int, default=1000000, help='Количество подписок.')
+    parser.add_argument('--partitions', type=int, default=16, help='Количество секций.')
+    parser.add_argument('--repeat', type=int, default=3, help='Количество повторов, берется лучшее время.')
+    args = parser.parse_args()
+
+    connection.ensure_connection()
+    connection.connection.autocommit = True
+    with connection.cursor() as cursor:
+        print(f'Заполнение таблиц: {args.rows} подписок, {args.partitions} секций...')
+        create_tables(cursor, args.rows, args.partitions)
+        try:
+            queries = {
+                'total sum': 'SELECT SUM(price) FROM {table}',
+                'client sum': 'SELECT SUM(price) FROM {table} WHERE client_id = 42',
+                'reprice': f"""
+                    UPDATE {{table}} AS subscription SET price = CAST(FLOOR(
+                        (SELECT full_price FROM {SCHEMA}.service WHERE id = subscription.service_id)
+                        - (SELECT full_price FROM {SCHEMA}.service WHERE id = subscription.service_id)
+                        * (SELECT discount_percent FROM {SCHEMA}.plan WHERE id = subscription.plan_id) / 100.00
+                        ) AS integer)
+                    WHERE service_id = 7
+                """,
+            }
+            print(f"{'query':>12} {'heap ms':>10} {'hash ms':>10}")
+            for name, sql in queries.items():
+                timings = [measure(cursor, sql.format(table=f'{SCHEMA}.{table}'), args.repeat)
+                           for table in ('heap', 'hash')]
+                print(f'{name:>12} {timings[0]:>10.1f} {timings[1]:>10.1f}')
+        finally:
+            cursor.execute(f'DROP SCHEMA {SCHEMA} CASCADE')
+
+
+if __name__ == '__main__':
+    main()
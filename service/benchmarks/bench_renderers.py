@@ -0,0 +1,88 @@
+"""
+Бенчмарк рендереров списка подписок.
+
+Для списков из 10k и 100k строк в формате SubscriptionSerializer измеряет время кодирования
+JSONRenderer из DRF, ORJSONRenderer и MessagePackRenderer, а также размер ответа без сжатия,
+со сжатием gzip и brotli и время сжатия. База данных для запуска не нужна.
+
+Запуск из каталога service:
+    python -m benchmarks.bench_renderers --rows 10000 100000
+"""
+
+import argparse
+import datetime
+import os
+import time
+
+import brotli
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'service.settings')
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.utils.text import compress_string  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from services.renderers import ORJSONRenderer, MessagePackRenderer  # noqa: E402
+
+
+def build_rows(count):
+    """
+    Создает список строк в формате ответа SubscriptionSerializer.
+    """
+    now = datetime.datetime.now(datetime.timezone.utc)
+    plans = [{'id': plan_id, 'plan_type': plan_type, 'discount_percent': discount}
+             for plan_id, plan_type, discount in ((1, 'full', 0), (2, 'student', 50), (3, 'discount', 15))]
+    return {
+        'result': [
+            {
+                'id': i,
+                'plan_id': plans[i % 3]['id'],
+                'plan': plans[i % 3],
+                'price': 50 + i % 450,
+                'last_change_time': now - datetime.timedelta(seconds=i),
+                'client_name': f'Client Company {i % 1000}',
+                'email': f'user{i % 1000}@example.com',
+            }
+            for i in range(count)
+        ],
+        'total_amount': count * 250,
+    }
+
+
+def measure(function, repeat):
+    """
+    Возвращает результат функции и лучшее время ее выполнения в миллисекундах.
+    """
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Бенчмарк рендереров списка подписок.')
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000], help='Размеры списков.')
+    parser.add_argument('--repeat', type=int, default=3, help='Количество повторов, берется лучшее время.')
+    args = parser.parse_args()
+
+    renderers = (('drf-json', JSONRenderer()), ('orjson', ORJSONRenderer()), ('msgpack', MessagePackRenderer()))
+    print(f"{'rows':>8} {'renderer':>10} {'encode ms':>10} {'raw KiB':>10} "
+          f"{'gzip KiB':>10} {'gzip ms':>8} {'br KiB':>10} {'br ms':>8}")
+    for rows in args.rows:
+        data = build_rows(rows)
+        for name, renderer in renderers:
+            content, encode_ms = measure(lambda: renderer.render(data), args.repeat)
+            gzipped, gzip_ms = measure(lambda: compress_string(content), args.repeat)
+            brotlied, brotli_ms = measure(
+                lambda: brotli.compress(content, quality=settings.COMPRESSION_BROTLI_QUALITY), args.repeat)
+            print(f'{rows:>8} {name:>10} {encode_ms:>10.1f} {len(content) / 1024:>10.1f} '
+                  f'{len(gzipped) / 1024:>10.1f} {gzip_ms:>8.1f} {len(brotlied) / 1024:>10.1f} {brotli_ms:>8.1f}')
+
+
+if __name__ == '__main__':
+    main()
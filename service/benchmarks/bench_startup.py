@@ -0,0 +1,99 @@
+"""
+Бенчмарк запуска веб-процесса и первого запроса после развертывания.
+
+Каждый прогон выполняется в отдельном процессе Python и измеряет время django.setup(),
+загрузки WSGI-приложения, прогрева и двух запросов к /api/subscriptions/ после очистки
+кэша общей суммы цен и кэша cachalot. Режим cold выполняет первый запрос без прогрева,
+режим warm - после services.warmup.warm_up. Также измеряется время импорта Celery и
+модуля задач, которое веб-процесс больше не тратит при запуске. Нужны база данных и Redis.
+
+Запуск из каталога service:
+    python -m benchmarks.bench_startup --runs 5
+"""
+
+import time
+
+STARTED = time.perf_counter()
+
+import argparse  # noqa: E402
+import json  # noqa: E402
+import os  # noqa: E402
+import statistics  # noqa: E402
+import subprocess  # noqa: E402
+import sys  # noqa: E402
+
+COLUMNS = ('setup', 'wsgi', 'warmup', 'first', 'second', 'celery_import')
+
+
+def run_child(mode):
+    """
+    Выполняет один прогон в текущем процессе и выводит время шагов в миллисекундах в формате JSON.
+    """
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'service.settings')
+    import django
+
+    django.setup()
+    timings = {'setup': (time.perf_counter() - STARTED) * 1000}
+
+    from django.conf import settings
+    from django.core.wsgi import get_wsgi_application
+
+    started = time.perf_counter()
+    application = get_wsgi_application()
+    timings['wsgi'] = (time.perf_counter() - started) * 1000
+    celery_loaded = 'celery' in sys.modules
+
+    from cachalot.api import invalidate
+    from django.core.cache import cache
+
+    from services.totals import LAST_KEY, LOCK_KEY
+    from services.warmup import request_path, warm_up
+
+    invalidate()
+    cache.delete_many([settings.PRICE_CACHE_NAME, LAST_KEY, LOCK_KEY])
+
+    timings['warmup'] = 0.0
+    if mode == 'warm':
+        started = time.perf_counter()
+        warm_up(application, settings.WARMUP_PATHS)
+        timings['warmup'] = (time.perf_counter() - started) * 1000
+
+    for name in ('first', 'second'):
+        started = time.perf_counter()
+        request_path(application, '/api/subscriptions/')
+        timings[name] = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    import services.tasks  # noqa: F401
+    timings['celery_import'] = (time.perf_counter() - started) * 1000
+
+    print(json.dumps({'celery_loaded': celery_loaded, **timings}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Бенчмарк запуска веб-процесса и первого запроса.')
+    parser.add_argument('--runs', type=int, default=5, help='Количество прогонов каждого режима.')
+    parser.add_argument('--child', choices=('cold', 'warm'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child)
+        return
+
+    service_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    print(f"{'mode':>6} " + ' '.join(f'{f"{name} ms":>17}' for name in COLUMNS) + f" {'celery at start':>16}")
+    for mode in ('cold', 'warm'):
+        results = [
+            json.loads(subprocess.check_output(
+                [sys.executable, '-m', 'benchmarks.bench_startup', '--child', mode], cwd=service_dir,
+                text=True, stderr=subprocess.DEVNULL,
+            ).strip().splitlines()[-1])
+            for _ in range(args.runs)
+        ]
+        medians = [statistics.median(result[name] for result in results) for name in COLUMNS]
+        celery_loaded = any(result['celery_loaded'] for result in results)
+        print(f'{mode:>6} ' + ' '.join(f'{value:>17.1f}' for value in medians) + f' {str(celery_loaded):>16}')
+
+
+if __name__ == '__main__':
+    main()
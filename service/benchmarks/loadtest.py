@@ -0,0 +1,267 @@
+"""
+Нагрузочный тест эндпоинта /api/subscriptions/ во время пересчета цен.
+
+Скрипт запускает в одном процессе HTTP-сервер с приложением Django, воркер Celery
+с брокером memory:// и кэшем в памяти процесса (настройки service.settings_loadtest),
+после чего N клиентов параллельно читают список подписок, а отдельный поток
+периодически меняет Service.full_price. Внешние сервисы, кроме базы данных, не нужны.
+
+Отчет содержит перцентили задержки p50/p95/p99, пропускную способность, долю ошибок
+и устаревание total_amount: ответ считается устаревшим, если total_amount не совпадает
+с суммой цен в базе на момент получения ответа, а возраст устаревания - это время,
+прошедшее с момента, когда сумма в базе отличалась от полученной.
+
+Запуск из каталога service:
+    python -m benchmarks.loadtest --clients 20 --duration 30 --reprice-interval 2
+"""
+
+import argparse
+import json
+import os
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from socketserver import ThreadingMixIn
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'service.settings_loadtest')
+django.setup()
+
+from cachalot.api import cachalot_disabled  # noqa: E402
+from celery.contrib.testing.worker import start_worker  # noqa: E402
+from celery_singleton.backends import BaseBackend  # noqa: E402
+from django.contrib.auth.models import User  # noqa: E402
+from django.core.wsgi import get_wsgi_application  # noqa: E402
+from django.db import connection  # noqa: E402
+
+from celery_app import app  # noqa: E402
+from clients.models import Client  # noqa: E402
+from services.models import Service, Plan, Subscription  # noqa: E402
+from services.pricing import reprice_subscriptions  # noqa: E402
+from services.totals import compute_total_amount  # noqa: E402
+
+
+class MemorySingletonBackend(BaseBackend):
+    """
+    Хранилище блокировок celery_singleton в памяти процесса вместо Redis.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.locks = {}
+        self.mutex = threading.Lock()
+
+    def lock(self, lock, task_id, expiry=None):
+        with self.mutex:
+            if lock in self.locks:
+                return False
+            self.locks[lock] = task_id
+            return True
+
+    def unlock(self, lock):
+        with self.mutex:
+            self.locks.pop(lock, None)
+
+    def get(self, lock):
+        return self.locks.get(lock)
+
+    def clear(self, key_prefix):
+        with self.mutex:
+            for lock in [lock for lock in self.locks if lock.startswith(key_prefix)]:
+                del self.locks[lock]
+
+
+class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+class QuietWSGIRequestHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def percentile(values, percent):
+    """
+    Возвращает перцентиль отсортированного списка значений.
+    """
+    if not values:
+        return None
+    index = min(len(values) - 1, max(0, round(percent / 100 * len(values)) - 1))
+    return values[index]
+
+
+def seed(num_subscriptions, num_clients=1000, num_services=50, num_plans=3):
+    """
+    Быстро создает тестовые данные пакетными вставками.
+    """
+    users = User.objects.bulk_create([
+        User(username=f'loadtest{i}', email=f'loadtest{i}@example.com', password='!')
+        for i in range(num_clients)
+    ])
+    clients = Client.objects.bulk_create([
+        Client(user=user, company_name=f'Load Test Company {i}') for i, user in enumerate(users)
+    ])
+    services = Service.objects.bulk_create([
+        Service(name=f'Load Test Service {i}', full_price=random.randint(50, 500)) for i in range(num_services)
+    ])
+    plans = Plan.objects.bulk_create([
+        Plan(plan_type=random.choice(Plan.PLAN_TYPES)[0], discount_percent=random.randint(0, 50))
+        for _ in range(num_plans)
+    ])
+    created = Subscription.objects.bulk_create([
+        Subscription(client=random.choice(clients), service=random.choice(services), plan=random.choice(plans))
+        for _ in range(num_subscriptions)
+    ], batch_size=5000)
+    reprice_subscriptions(Subscription.objects.filter(id__in=[subscription.id for subscription in created]))
+
+
+class LoadTest:
+    """
+    Нагрузочный тест: читатели списка подписок, поток пересчета цен и наблюдатель за суммой в базе.
+    """
+
+    def __init__(self, url, clients, duration, reprice_interval, sample_interval):
+        self.url = url
+        self.clients = clients
+        self.duration = duration
+        self.reprice_interval = reprice_interval
+        self.sample_interval = sample_interval
+        self.stop = threading.Event()
+        self.lock = threading.Lock()
+        self.latencies = []
+        self.errors = 0
+        self.responses = []
+        self.truth = []
+        self.repricings = 0
+
+    def read_total(self):
+        with cachalot_disabled():
+            return compute_total_amount()
+
+    def reader(self):
+        while not self.stop.is_set():
+            started = time.perf_counter()
+            try:
+                with urllib.request.urlopen(self.url, timeout=60) as response:
+                    body = json.loads(response.read())
+            except (urllib.error.URLError, OSError, ValueError):
+                with self.lock:
+                    self.errors += 1
+                continue
+            finished = time.perf_counter()
+            with self.lock:
+                self.latencies.append(finished - started)
+                self.responses.append((finished, body.get('total_amount')))
+
+    def repricer(self):
+        services = list(Service.objects.values_list('id', flat=True))
+        while not self.stop.wait(self.reprice_interval):
+            service = Service.objects.get(id=random.choice(services))
+            service.full_price = random.randint(50, 500)
+            service.save()
+            self.repricings += 1
+        connection.close()
+
+    def sampler(self):
+        while True:
+            total = self.read_total()
+            if not self.truth or self.truth[-1][1] != total:
+                self.truth.append((time.perf_counter(), total))
+            if self.stop.wait(self.sample_interval):
+                break
+        connection.close()
+
+    def staleness(self, received_at, total_amount):
+        """
+        Возвращает возраст устаревания ответа в секундах или 0, если ответ актуален.
+        """
+        history = [(changed_at, total) for changed_at, total in self.truth if changed_at <= received_at]
+        if not history or history[-1][1] == total_amount:
+            return 0.0
+        diverged_at = history[0][0]
+        for (changed_at, total), (next_changed_at, _) in zip(history, history[1:]):
+            if total == total_amount:
+                diverged_at = next_changed_at
+        return received_at - diverged_at
+
+    def run(self):
+        threads = [threading.Thread(target=self.reader, daemon=True) for _ in range(self.clients)]
+        threads.append(threading.Thread(target=self.repricer, daemon=True))
+        threads.append(threading.Thread(target=self.sampler, daemon=True))
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        time.sleep(self.duration)
+        self.stop.set()
+        for thread in threads:
+            thread.join()
+        return self.report(time.perf_counter() - started)
+
+    def report(self, elapsed):
+        latencies = sorted(self.latencies)
+        staleness = sorted(self.staleness(received_at, total) for received_at, total in self.responses)
+        stale = [age for age in staleness if age > 0]
+        requests = len(latencies) + self.errors
+        return {
+            'clients': self.clients,
+            'duration_s': round(elapsed, 2),
+            'requests': requests,
+            'throughput_rps': round(len(latencies) / elapsed, 2),
+            'error_rate': round(self.errors / requests, 4) if requests else 0.0,
+            'latency_ms': {
+                name: round(percentile(latencies, percent) * 1000, 2) if latencies else None
+                for name, percent in (('p50', 50), ('p95', 95), ('p99', 99))
+            },
+            'repricings': self.repricings,
+            'stale_rate': round(len(stale) / len(staleness), 4) if staleness else 0.0,
+            'staleness_ms': {
+                name: round(percentile(stale, percent) * 1000, 2) if stale else 0.0
+                for name, percent in (('p50', 50), ('p95', 95), ('max', 100))
+            },
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Нагрузочный тест /api/subscriptions/ во время пересчета цен.')
+    parser.add_argument('--clients', type=int, default=10, help='Количество параллельных клиентов.')
+    parser.add_argument('--duration', type=float, default=30, help='Длительность теста в секундах.')
+    parser.add_argument('--reprice-interval', type=float, default=2, help='Интервал между изменениями цен.')
+    parser.add_argument('--sample-interval', type=float, default=0.05,
+                        help='Интервал опроса суммы цен в базе для оценки устаревания.')
+    parser.add_argument('--workers', type=int, default=2, help='Количество потоков воркера Celery.')
+    parser.add_argument('--seed', type=int, default=0, help='Создать указанное количество подписок перед тестом.')
+    parser.add_argument('--json', action='store_true', help='Вывести отчет в формате JSON.')
+    args = parser.parse_args()
+
+    if args.seed:
+        seed(args.seed)
+
+    app.conf.result_backend = 'cache+memory://'
+    app.conf.broker_connection_retry_on_startup = True
+    app.conf.singleton_backend_class = MemorySingletonBackend
+
+    server = make_server('127.0.0.1', 0, get_wsgi_application(), server_class=ThreadingWSGIServer,
+                         handler_class=QuietWSGIRequestHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{server.server_port}/api/subscriptions/'
+
+    with start_worker(app, pool='threads', concurrency=args.workers, perform_ping_check=False, loglevel='WARNING'):
+        report = LoadTest(url, args.clients, args.duration, args.reprice_interval, args.sample_interval).run()
+    server.shutdown()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"clients: {report['clients']}, duration: {report['duration_s']} s, requests: {report['requests']}")
+    print(f"throughput: {report['throughput_rps']} req/s, error rate: {report['error_rate']:.2%}")
+    print('latency, ms: ' + ', '.join(f'{name}={value}' for name, value in report['latency_ms'].items()))
+    print(f"repricings: {report['repricings']}, stale total_amount: {report['stale_rate']:.2%}")
+    print('staleness, ms: ' + ', '.join(f'{name}={value}' for name, value in report['staleness_ms'].items()))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,15 @@
 from django.contrib import admin
 
 from clients.models import Client
+from services.paginators import EstimatedCountPaginator
 
-admin.site.register(Client)
+
+@admin.register(Client)
+class ClientAdmin(admin.ModelAdmin):
+    list_display = ('id', 'company_name', 'user')
+    list_select_related = ('user',)
+    search_fields = ('company_name',)
+    autocomplete_fields = ('user',)
+    ordering = ('id',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
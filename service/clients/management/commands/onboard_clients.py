@@ -0,0 +1,45 @@
+"""
+Команда для массового создания клиентов из CSV-файла.
+
+Запуск:
+    python manage.py onboard_clients accounts.csv --batch-size 1000 --processes 8
+"""
+
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from clients.onboarding import onboard_clients, read_accounts_csv
+
+
+class Command(BaseCommand):
+    help = ('Создает пользователей и клиентов из CSV-файла со столбцами username, email, password, '
+            'company_name и company_full_address, хэшируя пароли в пуле процессов.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_file', help='Путь к CSV-файлу, "-" для чтения из стандартного ввода.')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Количество учетных записей в пакете.')
+        parser.add_argument('--processes', type=int, default=None,
+                            help='Количество процессов для хэширования паролей, по умолчанию по числу ядер.')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            if options['csv_file'] == '-':
+                created, skipped = self.onboard(sys.stdin, options)
+            else:
+                with open(options['csv_file'], newline='', encoding='utf-8') as file:
+                    created, skipped = self.onboard(file, options)
+        except (OSError, ValueError) as error:
+            raise CommandError(error)
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {created} clients, skipped {skipped} existing in {elapsed:.1f} s '
+            f'({created / elapsed if elapsed else 0:.1f} accounts/s).'
+        ))
+
+    def onboard(self, file, options):
+        return onboard_clients(read_accounts_csv(file), batch_size=options['batch_size'],
+                               processes=options['processes'])
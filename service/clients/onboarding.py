@@ -0,0 +1,145 @@
+"""
+Модуль для массового создания клиентов.
+
+Пароли хэшируются параллельно в пуле процессов, потому что PBKDF2 занимает основное
+время создания учетной записи, а пользователи и клиенты вставляются пакетами через
+bulk_create вместо двух отдельных INSERT на каждого клиента.
+
+Функции:
+- read_accounts_csv: Читает учетные записи клиентов из CSV-файла.
+- hash_passwords: Хэширует пароли в пуле процессов.
+- onboard_clients: Создает пользователей и клиентов пакетами.
+"""
+
+import csv
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import django
+from django.apps import apps
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+REQUIRED_COLUMNS = ('username', 'email', 'password', 'company_name')
+
+
+def read_accounts_csv(file):
+    """
+    Читает учетные записи клиентов из CSV-файла.
+
+    Файл должен содержать заголовок со столбцами username, email, password, company_name
+    и необязательным столбцом company_full_address.
+
+    Args:
+        file: Открытый текстовый файл.
+
+    Yields:
+        dict: Учетная запись клиента.
+
+    Raises:
+        ValueError: Если в заголовке нет обязательных столбцов.
+    """
+    reader = csv.DictReader(file)
+    missing = [column for column in REQUIRED_COLUMNS if column not in (reader.fieldnames or ())]
+    if missing:
+        raise ValueError(f'Missing CSV columns: {", ".join(missing)}')
+    for row in reader:
+        yield {
+            'username': row['username'],
+            'email': row['email'],
+            'password': row['password'],
+            'company_name': row['company_name'],
+            'company_full_address': row.get('company_full_address') or '',
+        }
+
+
+def init_worker():
+    """
+    Настраивает Django в процессе пула.
+
+    Процессы пула запускаются методом spawn, чтобы не наследовать открытые соединения
+    с базой данных, поэтому модуль не импортирует модели на верхнем уровне.
+    """
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'service.settings')
+    if not apps.ready:
+        django.setup()
+
+
+def hash_passwords(passwords, executor=None, chunksize=1):
+    """
+    Хэширует пароли в пуле процессов.
+
+    Args:
+        passwords (list): Пароли в открытом виде.
+        executor (ProcessPoolExecutor): Пул процессов. Если не передан, пароли хэшируются в текущем процессе.
+        chunksize (int): Количество паролей, передаваемых процессу пула за один раз.
+
+    Returns:
+        list: Хэши паролей в том же порядке.
+    """
+    if executor is None:
+        return [make_password(password) for password in passwords]
+    return list(executor.map(make_password, passwords, chunksize=chunksize))
+
+
+def onboard_clients(accounts, batch_size=1000, processes=None):
+    """
+    Создает пользователей и клиентов пакетами.
+
+    Каждый пакет создается в отдельной транзакции двумя запросами bulk_create.
+    Имя пользователя и email нормализуются, как в UserManager.create_user, и учетные записи
+    с уже существующим или повторяющимся после нормализации именем пользователя пропускаются.
+
+    Args:
+        accounts (Iterable[dict]): Учетные записи с ключами username, email, password,
+                                   company_name и company_full_address.
+        batch_size (int): Количество учетных записей в пакете.
+        processes (int): Количество процессов для хэширования паролей, по умолчанию по числу ядер.
+                         При значении 1 пароли хэшируются в текущем процессе.
+
+    Returns:
+        tuple: Количество созданных и пропущенных учетных записей.
+    """
+    from django.contrib.auth.models import User
+    from clients.models import Client
+
+    processes = processes or os.cpu_count()
+    executor = None
+    if processes > 1:
+        executor = ProcessPoolExecutor(processes, mp_context=multiprocessing.get_context('spawn'),
+                                       initializer=init_worker)
+    created = skipped = 0
+    accounts = iter(accounts)
+    try:
+        while batch := list(islice(accounts, batch_size)):
+            unique = {}
+            for account in batch:
+                account = dict(account, username=User.normalize_username(account['username']),
+                               email=User.objects.normalize_email(account['email']))
+                unique.setdefault(account['username'], account)
+            existing = set(User.objects.filter(username__in=list(unique)).values_list('username', flat=True))
+            skipped += len(batch)
+            batch = [account for username, account in unique.items() if username not in existing]
+            skipped -= len(batch)
+            if not batch:
+                continue
+
+            passwords = hash_passwords([account['password'] for account in batch], executor,
+                                       chunksize=max(1, len(batch) // (processes * 4)))
+            with transaction.atomic():
+                users = User.objects.bulk_create([
+                    User(username=account['username'], email=account['email'], password=password)
+                    for account, password in zip(batch, passwords)
+                ])
+                Client.objects.bulk_create([
+                    Client(user=user, company_name=account['company_name'],
+                           company_full_address=account['company_full_address'])
+                    for account, user in zip(batch, users)
+                ])
+            created += len(batch)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return created, skipped
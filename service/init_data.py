@@ -5,19 +5,22 @@ import random
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'service.settings')
 django.setup()
 
-from django.contrib.auth.models import User
 from clients.models import Client
+from clients.onboarding import onboard_clients
 from services.models import Service, Plan, Subscription
 
 
 def create_users_and_clients(num_users):
-    for i in range(num_users):
-        username = f'user{i + 1}'
-        email = f'user{i + 1}@example.com'
-        password = 'password123'
-        user = User.objects.create_user(username=username, email=email, password=password)
-        company_name = f'Client Company {i + 1}'
-        Client.objects.create(user=user, company_name=company_name)
+    onboard_clients(
+        {
+            'username': f'user{i + 1}',
+            'email': f'user{i + 1}@example.com',
+            'password': 'password123',
+            'company_name': f'Client Company {i + 1}',
+            'company_full_address': '',
+        }
+        for i in range(num_users)
+    )
 
 
 def create_services(num_services):
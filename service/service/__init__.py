@@ -1,3 +1,2 @@
-from celery_app import app as celery_app
-
-__all__ = ('celery_app',)
+# Приложение Celery создается модулем services.tasks при первом обращении к задачам,
+# поэтому веб-процесс не импортирует Celery при запуске.
@@ -3,6 +3,9 @@ ASGI config for service project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Besides Django, the application serves price change notifications as
+server-sent events and over WebSocket, see ``services.streams``.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
 """
@@ -13,4 +16,8 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'service.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from services.streams import PriceEventsApplication  # noqa: E402
+
+application = PriceEventsApplication(django_application)
@@ -39,6 +39,7 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
 
     'cachalot',
+    'rest_framework',
 
     'clients',
     'services',
@@ -46,16 +47,22 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'services.middleware.ConcurrencyReleaseMiddleware',
+    'services.middleware.CompressionMiddleware',
+    'services.middleware.QueryBudgetMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
+    'services.middleware.ProfilingMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
 ROOT_URLCONF = 'service.urls'
 
+TEST_RUNNER = 'tests.runner.QueryBudgetTestRunner'
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -138,12 +145,52 @@ LOGGING = {
         'django.db.backends': {
             'handlers': ['console'],
             'level': 'WARNING'
+        },
+        'services.warmup': {
+            'handlers': ['console'],
+            'level': 'INFO'
         }
     }
 }
 
 CELERY_BROKER_URL = 'redis://redis:6379/0'
 
+CELERYBEAT_SCHEDULE = {
+    'reconcile-prices': {
+        'task': 'services.tasks.reconcile_prices',
+        'schedule': 60 * 60,
+    },
+    'archive-cold-subscriptions': {
+        'task': 'services.tasks.archive_cold_subscriptions',
+        'schedule': 24 * 60 * 60,
+    },
+}
+
+# Задачи set_price и refresh_client_documents выполняются пакетами на отдельной очереди, воркер
+# которой запускается с --prefetch-multiplier 0, чтобы накапливать до PRICE_BATCH_SIZE сообщений.
+CELERY_ROUTES = {
+    'services.tasks.set_price': {'queue': 'pricing'},
+    'services.tasks.refresh_client_documents': {'queue': 'pricing'},
+}
+
+PRICE_BATCH_SIZE = 500
+PRICE_BATCH_INTERVAL = 0.1
+
+# Задание на пересчет цен повторяется после кратковременной ошибки с паузой
+# REPRICING_RETRY_DELAY секунд, которая удваивается при каждом повторе.
+REPRICING_MAX_RETRIES = 5
+REPRICING_RETRY_DELAY = 10
+
+PRICE_RECONCILIATION_CHUNK_SIZE = 1000
+PRICE_RECONCILIATION_INTERVAL = 0.1
+
+# Подписки, которые не изменялись ARCHIVE_AFTER_DAYS дней, переносятся в архив
+# задачей archive_cold_subscriptions.
+ARCHIVE_AFTER_DAYS = 365
+ARCHIVE_CHUNK_SIZE = 1000
+ARCHIVE_INTERVAL = 0.1
+ARCHIVE_PAGE_SIZE = 100
+
 CACHES = {
     'default': {
         'BACKEND': 'django_redis.cache.RedisCache',
@@ -152,3 +199,81 @@ CACHES = {
 }
 
 PRICE_CACHE_NAME = 'price_cache'
+PRICE_CACHE_TIMEOUT = 60 * 60
+PRICE_CACHE_LOCK_TIMEOUT = 60
+PRICE_CACHE_LOCK_WAIT = 5
+
+# Записи об удалении создаются триггером базы данных, о котором cachalot не знает.
+CACHALOT_UNCACHABLE_TABLES = frozenset(('django_migrations', 'services_subscriptiontombstone'))
+
+PRICE_EVENTS_REDIS_URL = 'redis://redis:6379/0'
+PRICE_EVENTS_CHANNEL = 'price_events'
+PRICE_EVENTS_BATCH_INTERVAL = 0.5
+PRICE_EVENTS_HEARTBEAT_INTERVAL = 15
+PRICE_EVENTS_MAX_BUFFER = 1000
+
+ADMIN_ESTIMATED_COUNT_THRESHOLD = 100000
+
+# Бюджет SQL-запросов представлений по имени представления. В тестах проверяется каждый
+# запрос с ошибкой при превышении, в работе - доля QUERY_BUDGET_SAMPLE_RATE запросов с записью в лог.
+QUERY_BUDGET_MODE = 'log'
+QUERY_BUDGET_SAMPLE_RATE = 0.01
+# Время запросов зависит от нагрузки на машину, поэтому тестовый раннер проверяет только количество.
+QUERY_BUDGET_CHECK_TIME = True
+QUERY_BUDGET_REPEAT_THRESHOLD = 10
+QUERY_BUDGETS = {
+    'default': {'queries': 50, 'time_ms': 1000},
+    'subscription-list': {'queries': 10, 'time_ms': 500},
+    'subscription-changes': {'queries': 10, 'time_ms': 500},
+    'repricingjob-list': {'queries': 5, 'time_ms': 200},
+    'repricingjob-detail': {'queries': 5, 'time_ms': 200},
+    'subscriptionarchive-list': {'queries': 5, 'time_ms': 200},
+    'client-subscriptions': {'queries': 6, 'time_ms': 200},
+}
+
+# Профилирование запроса сотрудником по параметру ?profile=1, отчет возвращается zip-архивом.
+PROFILING_ENABLED = True
+PROFILING_QUERY_PARAM = 'profile'
+PROFILING_MAX_EXPLAIN = 20
+PROFILING_MAX_FUNCTIONS = 100
+PROFILING_REPORTS_DIR = None
+
+# Прогрев кэшей при загрузке WSGI-приложения и запуске воркера Celery.
+WARMUP_ON_STARTUP = True
+# Полный список подписок не прогревается: он читает всю таблицу при запуске каждого процесса.
+WARMUP_PATHS = ['/api/subscriptions/changes/?limit=100', '/api/repricing-jobs/']
+WARMUP_HOST = 'localhost'
+
+CHANGES_PAGE_SIZE = 1000
+CHANGES_MAX_PAGE_SIZE = 10000
+
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'services.renderers.ORJSONRenderer',
+        'services.renderers.MessagePackRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_THROTTLE_CLASSES': [
+        'services.throttling.CostThrottle',
+        'services.throttling.ConcurrencyThrottle',
+    ],
+}
+
+# Ограничение запросов потребителей (пользователей и анонимных IP-адресов) в Redis.
+THROTTLE_ENABLED = True
+THROTTLE_KEY_PREFIX = 'throttle'
+# Корзины токенов: rate - пополнение токенов в секунду, burst - емкость корзины.
+THROTTLE_BUCKETS = {
+    'user': {'rate': 20, 'burst': 200},
+    'anon': {'rate': 5, 'burst': 50},
+}
+# Количество строк ответа, которые стоят один токен.
+THROTTLE_ROWS_PER_TOKEN = 1000
+THROTTLE_MAX_CONCURRENT = {'user': 4, 'anon': 2}
+THROTTLE_CONCURRENCY_TIMEOUT = 60
+THROTTLE_ESTIMATE_TIMEOUT = 60
+
+COMPRESSION_MIN_LENGTH = 1024
+COMPRESSION_BROTLI_QUALITY = 4
+# Сжимаются только ответы рендереров API, HTML-страницы с CSRF-токеном не сжимаются из-за атаки BREACH.
+COMPRESSION_CONTENT_TYPES = ('application/json', 'application/msgpack')
@@ -0,0 +1,33 @@
+"""
+Настройки Django для нагрузочного тестирования без внешних сервисов.
+
+Redis заменяется кэшем в памяти процесса, брокер Celery - транспортом memory://.
+Воркер Celery и HTTP-сервер запускаются в потоках процесса benchmarks/loadtest.py,
+поэтому все они используют один и тот же кэш. База данных берется из основных настроек.
+"""
+
+from .settings import *  # noqa: F401,F403
+
+DEBUG = False
+
+ALLOWED_HOSTS = ['127.0.0.1', 'localhost']
+
+CELERY_BROKER_URL = 'memory://'
+
+# Воркер в процессе теста обслуживает одну очередь по умолчанию.
+CELERY_ROUTES = {}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+PRICE_EVENTS_REDIS_URL = None
+
+# Нагрузочный тест измеряет пропускную способность, а не ограничение запросов.
+THROTTLE_ENABLED = False
+
+PASSWORD_HASHERS = [
+    'django.contrib.auth.hashers.MD5PasswordHasher',
+]
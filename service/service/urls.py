@@ -20,6 +20,10 @@
 API точки доступа:
     - `/admin/`: Административный интерфейс Django.
     - `/api/subscriptions/`: Конечная точка RESTful API для управления подписками.
+    - `/api/repricing-jobs/`: Конечная точка для отслеживания заданий на пересчет цен.
+    - `/api/archived-subscriptions/`: Конечная точка для чтения и восстановления архивных подписок.
+    - `/api/clients/<id>/subscriptions/`: Готовый документ с подписками клиента.
+    - `/metrics/`: Метрики Prometheus.
 
 """
 
@@ -27,13 +31,18 @@ from django.contrib import admin
 from django.urls import path
 from rest_framework import routers
 
-from services.views import SubscriptionView
+from services.metrics import metrics_view
+from services.views import SubscriptionView, SubscriptionArchiveView, RepricingJobView, ClientSubscriptionsView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('api/clients/<int:pk>/subscriptions/', ClientSubscriptionsView.as_view(), name='client-subscriptions'),
+    path('metrics/', metrics_view, name='metrics'),
 ]
 
 router = routers.DefaultRouter()
 router.register(r'api/subscriptions', SubscriptionView)
+router.register(r'api/repricing-jobs', RepricingJobView)
+router.register(r'api/archived-subscriptions', SubscriptionArchiveView)
 
 urlpatterns += router.urls
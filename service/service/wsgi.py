@@ -8,9 +8,21 @@ https://docs.djangoproject.com/en/4.2/howto/deployment/wsgi/
 """
 
 import os
+import time
 
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'service.settings')
 
+started = time.perf_counter()
 application = get_wsgi_application()
+
+from django.conf import settings  # noqa: E402
+
+# При settings.WARMUP_ON_STARTUP приложение прогревает кэши и первые страницы списков
+# до того, как сервер начнет принимать запросы. Если прогрев не удался, приложение
+# загружается с пустыми кэшами.
+if settings.WARMUP_ON_STARTUP:
+    from services.warmup import warm_up_on_startup
+
+    warm_up_on_startup(application, settings.WARMUP_PATHS, setup_ms=(time.perf_counter() - started) * 1000)
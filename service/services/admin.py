@@ -1,7 +1,73 @@
 from django.contrib import admin
+from django.db import transaction
 
-from services.models import Service, Plan, Subscription
+from services.models import Service, Plan, Subscription, RepricingJob
+from services.paginators import EstimatedCountPaginator
 
-admin.site.register(Service)
-admin.site.register(Plan)
-admin.site.register(Subscription)
+
+@admin.action(description='Reprice subscriptions of selected items in one job')
+def reprice_selected(modeladmin, request, queryset):
+    """
+    Создает одно задание на пересчет цен подписок выбранных услуг или планов.
+    """
+    relation = 'services' if queryset.model is Service else 'plans'
+    job = RepricingJob.schedule(**{relation: queryset})
+    modeladmin.message_user(request, f'Repricing job {job.id} scheduled.')
+
+
+@admin.register(Service)
+class ServiceAdmin(admin.ModelAdmin):
+    list_display = ('id', 'name', 'full_price')
+    search_fields = ('name',)
+    ordering = ('id',)
+    actions = (reprice_selected,)
+
+
+@admin.register(Plan)
+class PlanAdmin(admin.ModelAdmin):
+    list_display = ('id', 'plan_type', 'discount_percent')
+    list_filter = ('plan_type',)
+    search_fields = ('plan_type',)
+    ordering = ('id',)
+    actions = (reprice_selected,)
+
+
+@admin.register(Subscription)
+class SubscriptionAdmin(admin.ModelAdmin):
+    """
+    Административный интерфейс подписок.
+
+    Связанные объекты списка загружаются одним запросом с join, количество строк
+    большой таблицы оценивается без COUNT(*), фильтры используют индексированные
+    внешние ключи, а поля формы выбираются через автодополнение вместо полного списка.
+    """
+    list_display = ('id', 'client', 'service', 'plan', 'price', 'last_change_time')
+    list_select_related = ('client', 'service', 'plan')
+    list_filter = ('plan',)
+    autocomplete_fields = ('client', 'service', 'plan')
+    ordering = ('-id',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+@admin.register(RepricingJob)
+class RepricingJobAdmin(admin.ModelAdmin):
+    """
+    Административный интерфейс заданий на пересчет цен.
+
+    Задание, созданное в форме добавления, ставится в очередь после коммита транзакции,
+    когда услуги и планы задания уже сохранены, как и задание из RepricingJob.schedule.
+    """
+    list_display = ('id', 'status', 'total', 'processed', 'created_at', 'finished_at')
+    list_filter = ('status',)
+    readonly_fields = ('status', 'total', 'processed', 'last_subscription_id', 'created_at', 'started_at',
+                       'updated_at', 'finished_at')
+    autocomplete_fields = ('services', 'plans')
+    ordering = ('-id',)
+
+    def save_model(self, request, obj, form, change):
+        from services.tasks import run_repricing_job
+
+        super().save_model(request, obj, form, change)
+        if not change:
+            transaction.on_commit(lambda: run_repricing_job.delay(obj.id))
@@ -0,0 +1,146 @@
+"""
+Модуль для архивации подписок, которые давно не изменялись.
+
+Подписки переносятся из services_subscription в services_subscriptionarchive одним
+SQL-запросом на порцию: DELETE ... RETURNING, INSERT в архив и обновление сумм
+в services_archivedtotal выполняются в одном выражении с CTE. Удаление из
+services_subscription создает запись об удалении для ленты изменений триггером
+базы данных, а общая сумма цен не меняется, потому что цена переходит в ArchivedTotal
+в той же транзакции.
+
+Функции:
+- get_archivable_subscriptions: Возвращает подписки, которые можно перенести в архив.
+- archive_subscriptions: Переносит подписки в архив.
+- restore_subscriptions: Возвращает подписки из архива и пересчитывает их цены.
+- get_archived_amount: Возвращает сумму цен архивных подписок.
+"""
+
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from .signals import send_prices_changed
+from .totals import invalidate_total_amount
+
+ARCHIVE_SQL = """
+    WITH moved AS (
+        DELETE FROM services_subscription
+        WHERE id = ANY(%s)
+        RETURNING id, client_id, service_id, plan_id, price, last_change_time
+    ), archived AS (
+        INSERT INTO services_subscriptionarchive
+            (id, client_id, service_id, plan_id, price, last_change_time, archived_at)
+        SELECT id, client_id, service_id, plan_id, price, last_change_time, %s FROM moved
+        RETURNING service_id, price
+    ), totals AS (
+        INSERT INTO services_archivedtotal AS total (service_id, subscription_count, amount)
+        SELECT service_id, count(*), sum(price) FROM archived GROUP BY service_id
+        ON CONFLICT (service_id) DO UPDATE SET
+            subscription_count = total.subscription_count + EXCLUDED.subscription_count,
+            amount = total.amount + EXCLUDED.amount
+    )
+    SELECT count(*) FROM archived
+"""
+
+RESTORE_SQL = """
+    WITH moved AS (
+        DELETE FROM services_subscriptionarchive
+        WHERE id = ANY(%s)
+        RETURNING id, client_id, service_id, plan_id, price, last_change_time
+    ), restored AS (
+        INSERT INTO services_subscription
+            (id, client_id, service_id, plan_id, price, last_change_time, change_seq)
+        SELECT id, client_id, service_id, plan_id, price, last_change_time, 0 FROM moved
+        RETURNING service_id, price
+    ), totals AS (
+        UPDATE services_archivedtotal AS total SET
+            subscription_count = total.subscription_count - restored_totals.subscription_count,
+            amount = total.amount - restored_totals.amount
+        FROM (
+            SELECT service_id, count(*) AS subscription_count, sum(price) AS amount
+            FROM restored GROUP BY service_id
+        ) AS restored_totals
+        WHERE total.service_id = restored_totals.service_id
+    )
+    SELECT count(*) FROM restored
+"""
+
+
+def get_archivable_subscriptions(after_days, services=None, plans=None):
+    """
+    Возвращает подписки, которые не изменялись больше after_days дней.
+
+    Args:
+        after_days (int): Возраст последнего изменения подписки в днях.
+        services (Iterable[int]): Идентификаторы услуг, если архивировать нужно только их подписки.
+        plans (Iterable[int]): Идентификаторы планов, если архивировать нужно только их подписки.
+
+    Returns:
+        QuerySet: Подписки, которые можно перенести в архив.
+    """
+    from services.models import Subscription
+
+    queryset = Subscription.objects.filter(last_change_time__lt=timezone.now() - timedelta(days=after_days))
+    if services is not None:
+        queryset = queryset.filter(service__in=services)
+    if plans is not None:
+        queryset = queryset.filter(plan__in=plans)
+    return queryset
+
+
+def archive_subscriptions(subscription_ids):
+    """
+    Переносит подписки в архив одним запросом и увеличивает суммы архивных подписок услуг.
+
+    Функция должна вызываться внутри транзакции, в которой подписки заблокированы,
+    чтобы их цены не изменились между выборкой и переносом.
+
+    Args:
+        subscription_ids (Iterable[int]): Идентификаторы подписок.
+
+    Returns:
+        int: Количество перенесенных подписок.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(ARCHIVE_SQL, [list(subscription_ids), timezone.now()])
+        return cursor.fetchone()[0]
+
+
+def restore_subscriptions(subscription_ids):
+    """
+    Возвращает подписки из архива, уменьшает суммы архивных подписок услуг и пересчитывает цены.
+
+    Цены восстановленных подписок пересчитываются по текущим услугам и планам, а время
+    последнего изменения обновляется, чтобы подписки не попали в архив при следующем запуске.
+
+    Args:
+        subscription_ids (Iterable[int]): Идентификаторы архивных подписок.
+
+    Returns:
+        int: Количество восстановленных подписок.
+    """
+    from services.models import Subscription
+    from services.pricing import reprice_subscriptions
+
+    subscription_ids = list(subscription_ids)
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(RESTORE_SQL, [subscription_ids])
+            restored = cursor.fetchone()[0]
+        if restored:
+            reprice_subscriptions(Subscription.objects.filter(id__in=subscription_ids))
+            send_prices_changed(subscription_ids)
+    if restored:
+        invalidate_total_amount()
+    return restored
+
+
+def get_archived_amount():
+    """
+    Возвращает сумму цен архивных подписок по таблице сумм услуг.
+    """
+    from services.models import ArchivedTotal
+
+    return ArchivedTotal.objects.aggregate(total=Sum('amount'))['total'] or 0
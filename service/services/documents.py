@@ -0,0 +1,134 @@
+"""
+Модуль для построения документов с подписками клиентов.
+
+Документ клиента - готовый JSON с данными клиента, его подписками, планами, ценами
+и суммой цен. Документы строятся двумя запросами на любое количество клиентов и
+сохраняются в ClientSubscriptionsDocument, поэтому эндпоинт клиента читает одну
+строку по первичному ключу и не выполняет join и сериализацию.
+
+Функции:
+- build_client_documents: Строит документы клиентов.
+- rebuild_client_documents: Строит и сохраняет документы клиентов.
+- schedule_client_documents: Ставит перестроение документов клиентов в очередь после коммита транзакции.
+- get_client_document: Возвращает документ клиента, при отсутствии строит его.
+"""
+
+from django.db import transaction
+from django.utils import timezone
+
+from .renderers import ORJSONRenderer
+
+
+def build_client_documents(client_ids):
+    """
+    Строит документы клиентов двумя запросами: клиенты с email пользователя и подписки с планами.
+
+    Args:
+        client_ids (Iterable[int]): Идентификаторы клиентов.
+
+    Returns:
+        dict: Содержимое документа и сумма цен подписок по идентификатору клиента.
+              Несуществующие клиенты пропускаются.
+    """
+    from clients.models import Client
+    from services.models import Subscription
+
+    documents = {
+        client['id']: {
+            'client': {'id': client['id'], 'client_name': client['company_name'], 'email': client['user__email']},
+            'subscriptions': [],
+            'subtotal': 0,
+        }
+        for client in Client.objects.filter(id__in=client_ids).values('id', 'company_name', 'user__email')
+    }
+    subscriptions = Subscription.objects.filter(client_id__in=list(documents)).order_by('id').values(
+        'id', 'client_id', 'service_id', 'plan_id', 'plan__plan_type', 'plan__discount_percent',
+        'price', 'last_change_time',
+    )
+    for subscription in subscriptions:
+        document = documents[subscription['client_id']]
+        document['subscriptions'].append({
+            'id': subscription['id'],
+            'service_id': subscription['service_id'],
+            'plan_id': subscription['plan_id'],
+            'plan': {
+                'id': subscription['plan_id'],
+                'plan_type': subscription['plan__plan_type'],
+                'discount_percent': subscription['plan__discount_percent'],
+            },
+            'price': subscription['price'],
+            'last_change_time': subscription['last_change_time'],
+        })
+        document['subtotal'] += subscription['price']
+
+    renderer = ORJSONRenderer()
+    return {
+        client_id: (renderer.render(document).decode(), document['subtotal'])
+        for client_id, document in documents.items()
+    }
+
+
+def rebuild_client_documents(client_ids):
+    """
+    Строит и сохраняет документы клиентов одним INSERT ... ON CONFLICT.
+
+    Строки клиентов блокируются на время построения, поэтому документ, построенный
+    по более новым данным, не перезаписывается параллельным перестроением по старым.
+
+    Args:
+        client_ids (Iterable[int]): Идентификаторы клиентов.
+
+    Returns:
+        int: Количество сохраненных документов.
+    """
+    from clients.models import Client
+    from services.models import ClientSubscriptionsDocument
+
+    client_ids = sorted(set(client_ids))
+    if not client_ids:
+        return 0
+    with transaction.atomic():
+        list(Client.objects.filter(id__in=client_ids).order_by('id').select_for_update().values_list('id'))
+        now = timezone.now()
+        documents = [
+            ClientSubscriptionsDocument(client_id=client_id, content=content, subtotal=subtotal, updated_at=now)
+            for client_id, (content, subtotal) in build_client_documents(client_ids).items()
+        ]
+        ClientSubscriptionsDocument.objects.bulk_create(
+            documents, update_conflicts=True, unique_fields=['client'],
+            update_fields=['content', 'subtotal', 'updated_at'],
+        )
+    return len(documents)
+
+
+def schedule_client_documents(client_ids):
+    """
+    Ставит перестроение документов клиентов в очередь после коммита текущей транзакции.
+
+    Args:
+        client_ids (Iterable[int]): Идентификаторы клиентов.
+    """
+    from services.tasks import refresh_client_documents
+
+    client_ids = sorted(set(client_ids))
+    if client_ids:
+        transaction.on_commit(lambda: refresh_client_documents.delay(client_ids))
+
+
+def get_client_document(client_id):
+    """
+    Возвращает документ клиента. Если документ еще не построен, строит его синхронно.
+
+    Args:
+        client_id (int): Идентификатор клиента.
+
+    Returns:
+        str: JSON-документ или None, если клиента не существует.
+    """
+    from services.models import ClientSubscriptionsDocument
+
+    documents = ClientSubscriptionsDocument.objects.filter(client_id=client_id).values_list('content', flat=True)
+    content = documents.first()
+    if content is None and rebuild_client_documents([client_id]):
+        content = documents.first()
+    return content
@@ -0,0 +1,67 @@
+"""
+Модуль для публикации событий об изменении цен подписок.
+
+События публикуются в канал Redis settings.PRICE_EVENTS_CHANNEL и доставляются
+подписчикам ASGI-приложения из модуля services.streams.
+
+Функции:
+- build_price_events: Возвращает события об изменении цен для переданных подписок.
+- publish_price_events: Публикует события об изменении цен одним сообщением.
+"""
+
+import json
+
+import redis
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+_redis_client = None
+
+
+def get_redis_client():
+    """
+    Возвращает клиент Redis для публикации событий, создавая его при первом обращении.
+    """
+    global _redis_client
+    if _redis_client is None:
+        _redis_client = redis.Redis.from_url(settings.PRICE_EVENTS_REDIS_URL)
+    return _redis_client
+
+
+def build_price_events(subscription_ids):
+    """
+    Возвращает события об изменении цен для переданных подписок.
+
+    Args:
+        subscription_ids (Iterable[int]): Идентификаторы измененных подписок.
+
+    Returns:
+        list: События с идентификаторами подписки, клиента и услуги, ценой и временем изменения.
+    """
+    from services.models import Subscription
+
+    return [
+        {
+            'subscription_id': subscription['id'],
+            'client_id': subscription['client_id'],
+            'service_id': subscription['service_id'],
+            'price': subscription['price'],
+            'last_change_time': subscription['last_change_time'],
+        }
+        for subscription in Subscription.objects.filter(id__in=subscription_ids).values(
+            'id', 'client_id', 'service_id', 'price', 'last_change_time')
+    ]
+
+
+def publish_price_events(events):
+    """
+    Публикует события об изменении цен одним сообщением в канал settings.PRICE_EVENTS_CHANNEL.
+
+    Если settings.PRICE_EVENTS_REDIS_URL не задан, публикация отключена.
+
+    Args:
+        events (list): События об изменении цен.
+    """
+    if not settings.PRICE_EVENTS_REDIS_URL or not events:
+        return
+    get_redis_client().publish(settings.PRICE_EVENTS_CHANNEL, json.dumps(events, cls=DjangoJSONEncoder))
@@ -0,0 +1,35 @@
+"""
+Команда для построения документов с подписками всех клиентов.
+
+Нужна после первого развертывания и после изменений, которые не перестраивают документы
+автоматически, например переименования компании клиента или типа плана.
+
+Запуск:
+    python manage.py rebuild_client_documents --batch-size 1000
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from clients.models import Client
+from services.documents import rebuild_client_documents
+
+
+class Command(BaseCommand):
+    help = 'Строит документы с подписками всех клиентов пакетами.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Количество клиентов в пакете.')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        rebuilt = 0
+        last_id = 0
+        while client_ids := list(Client.objects.filter(id__gt=last_id).order_by('id')
+                                 .values_list('id', flat=True)[:options['batch_size']]):
+            rebuilt += rebuild_client_documents(client_ids)
+            last_id = client_ids[-1]
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {rebuilt} client documents in {elapsed:.1f} s.'))
@@ -0,0 +1,34 @@
+"""
+Команда для прогрева общих кэшей после развертывания.
+
+Вычисляет общую сумму цен, загружает услуги и планы в кэш cachalot и выполняет
+первые страницы списков, выводя время загрузки приложения и каждого шага прогрева.
+
+Запуск:
+    python manage.py warm_up --path /api/subscriptions/ --path /api/repricing-jobs/
+"""
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.core.wsgi import get_wsgi_application
+
+from services.warmup import warm_up
+
+
+class Command(BaseCommand):
+    help = 'Прогревает кэш общей суммы цен, кэш cachalot и первые страницы списков.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', action='append', dest='paths',
+                            help='Путь страницы для прогрева, по умолчанию settings.WARMUP_PATHS.')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        application = get_wsgi_application()
+        timings = warm_up(application, options['paths'] or settings.WARMUP_PATHS,
+                          setup_ms=(time.perf_counter() - started) * 1000)
+        self.stdout.write(self.style.SUCCESS(
+            'Warm-up finished: ' + ', '.join(f'{name}={value:.0f} ms' for name, value in timings.items())
+        ))
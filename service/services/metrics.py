@@ -0,0 +1,47 @@
+"""
+Модуль с метриками Prometheus.
+
+Если задана переменная окружения PROMETHEUS_MULTIPROC_DIR, метрики процессов
+веб-сервера собираются из общего каталога, иначе отдаются метрики текущего процесса.
+
+Метрики:
+- THROTTLE_DECISIONS: Количество решений ограничителей запросов по ограничителю, области и решению.
+- THROTTLE_TOKENS: Количество токенов, списанных ограничителем стоимости, по области.
+
+Функции:
+- metrics_view: Отдает метрики в текстовом формате Prometheus.
+"""
+
+import os
+
+from django.http import HttpResponse
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, generate_latest, multiprocess
+
+THROTTLE_DECISIONS = Counter(
+    'throttle_decisions',
+    'Throttle decisions by throttle, consumer scope and decision.',
+    ['throttle', 'scope', 'decision'],
+)
+THROTTLE_TOKENS = Counter(
+    'throttle_tokens',
+    'Tokens consumed by cost-weighted throttling by consumer scope.',
+    ['scope'],
+)
+
+
+def metrics_view(request):
+    """
+    Отдает метрики в текстовом формате Prometheus.
+
+    Args:
+        request (HttpRequest): Объект запроса.
+
+    Returns:
+        HttpResponse: Ответ с метриками.
+    """
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return HttpResponse(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
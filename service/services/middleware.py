@@ -0,0 +1,207 @@
+"""
+Модуль с middleware приложения services.
+
+Классы:
+- CompressionMiddleware: Сжимает большие ответы API алгоритмом brotli или gzip в зависимости от Accept-Encoding.
+- QueryBudgetMiddleware: Проверяет количество и время SQL-запросов представления и повторяющиеся запросы (N+1).
+- ProfilingMiddleware: Профилирует запрос сотрудника по параметру profile и возвращает отчет архивом.
+- ConcurrencyReleaseMiddleware: Освобождает место одновременного запроса после обработки запроса.
+"""
+
+import logging
+import os
+import random
+from contextlib import ExitStack
+
+import brotli
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.regex_helper import _lazy_re_compile
+from django.utils.text import compress_string
+
+from services.profiling import RequestProfiler
+from services.querybudget import QueryBudgetExceeded, QueryRecorder, get_budget
+from services.throttling import release_concurrency_slot
+
+logger = logging.getLogger(__name__)
+
+re_accepts_brotli = _lazy_re_compile(r'\bbr\b')
+re_accepts_gzip = _lazy_re_compile(r'\bgzip\b')
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Сжимает ответы API размером не меньше settings.COMPRESSION_MIN_LENGTH байт.
+
+    Brotli выбирается, если клиент его поддерживает, иначе используется gzip.
+    Уровень сжатия brotli задается настройкой settings.COMPRESSION_BROTLI_QUALITY.
+    Сжимаются только ответы с типами содержимого из settings.COMPRESSION_CONTENT_TYPES:
+    HTML-страницы админки и browsable API содержат CSRF-токен, и их сжатие без защиты
+    от атаки BREACH позволило бы подобрать токен по размеру ответа. Стриминговые и уже
+    сжатые ответы не изменяются.
+    """
+
+    def process_response(self, request, response):
+        if response.streaming or response.has_header('Content-Encoding'):
+            return response
+        content_type = response.get('Content-Type', '').partition(';')[0].strip().lower()
+        if content_type not in settings.COMPRESSION_CONTENT_TYPES:
+            return response
+        if len(response.content) < settings.COMPRESSION_MIN_LENGTH:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        accept_encoding = request.META.get('HTTP_ACCEPT_ENCODING', '')
+        if re_accepts_brotli.search(accept_encoding):
+            encoding = 'br'
+            compressed_content = brotli.compress(response.content, quality=settings.COMPRESSION_BROTLI_QUALITY)
+        elif re_accepts_gzip.search(accept_encoding):
+            encoding = 'gzip'
+            compressed_content = compress_string(response.content)
+        else:
+            return response
+
+        if len(compressed_content) >= len(response.content):
+            return response
+
+        response.content = compressed_content
+        response.headers['Content-Length'] = str(len(response.content))
+
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+
+        return response
+
+
+class QueryBudgetMiddleware:
+    """
+    Проверяет бюджет SQL-запросов обработки HTTP-запроса.
+
+    Проверяется доля settings.QUERY_BUDGET_SAMPLE_RATE запросов. Бюджет представления
+    берется из settings.QUERY_BUDGETS по имени представления. В режиме
+    settings.QUERY_BUDGET_MODE = 'raise' нарушение вызывает исключение QueryBudgetExceeded,
+    в режиме 'log' записывается в лог, при None проверка отключена.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        mode = settings.QUERY_BUDGET_MODE
+        if mode is None or random.random() >= settings.QUERY_BUDGET_SAMPLE_RATE:
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        if getattr(request, 'profiled', False):
+            return response
+
+        view_name = request.resolver_match.view_name if request.resolver_match else None
+        violations = recorder.get_violations(get_budget(view_name))
+        if violations:
+            message = f'Query budget of {view_name or request.path} exceeded:\n' + '\n'.join(violations)
+            if mode == 'raise':
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
+
+
+class ProfilingMiddleware:
+    """
+    Профилирует запрос сотрудника с параметром settings.PROFILING_QUERY_PARAM и возвращает отчет.
+
+    Профилирование доступно только активным пользователям с is_staff или is_superuser
+    при settings.PROFILING_ENABLED. Вместо ответа представления возвращается zip-архив
+    с отчетом RequestProfiler, который также сохраняется в каталог settings.PROFILING_REPORTS_DIR,
+    если он задан. Запросы профилирования не проверяются QueryBudgetMiddleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not self.should_profile(request):
+            return self.get_response(request)
+
+        request.profiled = True
+        profiler = RequestProfiler()
+        response = profiler.profile(self.get_response, request)
+        report = profiler.build_report(request, response)
+
+        filename = f"profile-{timezone.now().strftime('%Y%m%dT%H%M%S%f')}.zip"
+        if settings.PROFILING_REPORTS_DIR:
+            os.makedirs(settings.PROFILING_REPORTS_DIR, exist_ok=True)
+            with open(os.path.join(settings.PROFILING_REPORTS_DIR, filename), 'wb') as report_file:
+                report_file.write(report)
+
+        profile_response = HttpResponse(report, content_type='application/zip')
+        profile_response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        profile_response['X-Profiled-Status'] = str(response.status_code)
+        return profile_response
+
+    def should_profile(self, request):
+        if not settings.PROFILING_ENABLED or settings.PROFILING_QUERY_PARAM not in request.GET:
+            return False
+        user = getattr(request, 'user', None)
+        return bool(user and user.is_active and (user.is_staff or user.is_superuser))
+
+
+class ConcurrencyReleaseMiddleware:
+    """
+    Освобождает место одновременного запроса, занятое ConcurrencyThrottle, после обработки запроса.
+
+    Место освобождается для ответа любого представления, в том числе корня API, ответов
+    об ошибках и исключений, а рендеринг и сжатие большого ответа учитываются в ограничении.
+    Для стримингового ответа место освобождается после передачи последнего фрагмента
+    или закрытия потока. Если поток закрыт до первого фрагмента, место перестает
+    учитываться через settings.THROTTLE_CONCURRENCY_TIMEOUT секунд.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        streaming = False
+        try:
+            response = self.get_response(request)
+            if response.streaming:
+                response.streaming_content = self.release_after(response, request)
+                streaming = True
+            return response
+        finally:
+            if not streaming:
+                release_concurrency_slot(request)
+
+    def release_after(self, response, request):
+        """
+        Возвращает содержимое стримингового ответа, после которого освобождается место запроса.
+        """
+        content = response.streaming_content
+
+        if response.is_async:
+            async def release_after_async():
+                try:
+                    async for chunk in content:
+                        yield chunk
+                finally:
+                    release_concurrency_slot(request)
+
+            return release_after_async()
+
+        def release_after_sync():
+            try:
+                yield from content
+            finally:
+                release_concurrency_slot(request)
+
+        return release_after_sync()
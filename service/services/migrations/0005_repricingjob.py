@@ -0,0 +1,34 @@
+# Generated by Django 4.2.13 on 2026-10-19 03:41
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0004_subscription_services_su_client__f485a9_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RepricingJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('chunk_size', models.PositiveIntegerField(default=1000)),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('processed', models.PositiveIntegerField(default=0)),
+                ('last_subscription_id', models.BigIntegerField(default=0)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('plans', models.ManyToManyField(blank=True, related_name='repricing_jobs', to='services.plan')),
+                ('services', models.ManyToManyField(blank=True, related_name='repricing_jobs', to='services.service')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status'], name='services_re_status_276430_idx')],
+            },
+        ),
+    ]
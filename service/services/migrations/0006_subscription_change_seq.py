@@ -0,0 +1,80 @@
+# Generated by Django 4.2.13 on 2026-10-19 03:48
+
+from django.db import migrations, models
+import django.utils.timezone
+
+CHANGE_SEQ_SQL = """
+CREATE SEQUENCE services_subscription_change_seq;
+
+UPDATE services_subscription SET change_seq = nextval('services_subscription_change_seq');
+
+CREATE FUNCTION services_subscription_set_change_seq() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND (NEW.client_id, NEW.service_id, NEW.plan_id, NEW.price, NEW.last_change_time)
+            IS NOT DISTINCT FROM (OLD.client_id, OLD.service_id, OLD.plan_id, OLD.price, OLD.last_change_time) THEN
+        NEW.change_seq := OLD.change_seq;
+    ELSE
+        NEW.change_seq := nextval('services_subscription_change_seq');
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER services_subscription_set_change_seq
+    BEFORE INSERT OR UPDATE ON services_subscription
+    FOR EACH ROW EXECUTE FUNCTION services_subscription_set_change_seq();
+
+CREATE FUNCTION services_subscription_tombstone() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO services_subscriptiontombstone (subscription_id, client_id, change_seq, deleted_at)
+    VALUES (OLD.id, OLD.client_id, nextval('services_subscription_change_seq'), now());
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER services_subscription_tombstone
+    AFTER DELETE ON services_subscription
+    FOR EACH ROW EXECUTE FUNCTION services_subscription_tombstone();
+"""
+
+DROP_CHANGE_SEQ_SQL = """
+DROP TRIGGER services_subscription_tombstone ON services_subscription;
+DROP FUNCTION services_subscription_tombstone();
+DROP TRIGGER services_subscription_set_change_seq ON services_subscription;
+DROP FUNCTION services_subscription_set_change_seq();
+DROP SEQUENCE services_subscription_change_seq;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0005_repricingjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SubscriptionTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subscription_id', models.BigIntegerField()),
+                ('client_id', models.BigIntegerField()),
+                ('change_seq', models.BigIntegerField()),
+                ('deleted_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='subscription',
+            name='change_seq',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.RunSQL(CHANGE_SEQ_SQL, DROP_CHANGE_SEQ_SQL),
+        migrations.AddIndex(
+            model_name='subscription',
+            index=models.Index(fields=['change_seq'], name='services_su_change__2066a5_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subscriptiontombstone',
+            index=models.Index(fields=['change_seq'], name='services_su_change__147e0d_idx'),
+        ),
+    ]
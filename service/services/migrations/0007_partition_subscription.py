@@ -0,0 +1,105 @@
+# Hash-partitions services_subscription by client_id.
+#
+# Django does not manage partitioned tables, so the table is rebuilt with raw SQL
+# and the migration state is left unchanged. Queries keep working as before;
+# filters on client_id are pruned to a single partition. The primary key of a
+# partitioned table must include the partition key, so it becomes (id, client_id)
+# and id is filled from an ordinary sequence.
+
+from django.db import migrations
+
+PARTITIONS = 16
+
+COLUMNS = 'id, client_id, plan_id, service_id, price, last_change_time, change_seq'
+
+
+def rebuild_sql(partitioned):
+    """
+    Returns SQL that rebuilds services_subscription as a partitioned or an ordinary table.
+    """
+    if partitioned:
+        create_table = f"""
+        CREATE TABLE services_subscription (
+            id bigint NOT NULL,
+            client_id bigint NOT NULL,
+            plan_id bigint NOT NULL,
+            service_id bigint NOT NULL,
+            price integer NOT NULL CONSTRAINT services_subscription_price_check CHECK (price >= 0),
+            last_change_time timestamp with time zone NOT NULL,
+            change_seq bigint NOT NULL
+        ) PARTITION BY HASH (client_id);
+        """ + ''.join(
+            f"""
+            CREATE TABLE services_subscription_p{remainder} PARTITION OF services_subscription
+                FOR VALUES WITH (MODULUS {PARTITIONS}, REMAINDER {remainder});
+            """
+            for remainder in range(PARTITIONS)
+        )
+        id_default = f"""
+        CREATE SEQUENCE services_subscription_id_seq OWNED BY services_subscription.id;
+        SELECT setval('services_subscription_id_seq', COALESCE(MAX(id), 0) + 1, false) FROM services_subscription;
+        ALTER TABLE services_subscription ALTER COLUMN id SET DEFAULT nextval('services_subscription_id_seq');
+        ALTER TABLE services_subscription ADD CONSTRAINT services_subscription_pkey PRIMARY KEY (id, client_id);
+        """
+    else:
+        create_table = """
+        CREATE TABLE services_subscription (
+            id bigint NOT NULL,
+            client_id bigint NOT NULL,
+            plan_id bigint NOT NULL,
+            service_id bigint NOT NULL,
+            price integer NOT NULL CONSTRAINT services_subscription_price_check CHECK (price >= 0),
+            last_change_time timestamp with time zone NOT NULL,
+            change_seq bigint NOT NULL
+        );
+        """
+        id_default = """
+        ALTER TABLE services_subscription ALTER COLUMN id ADD GENERATED BY DEFAULT AS IDENTITY;
+        SELECT setval(pg_get_serial_sequence('services_subscription', 'id'), COALESCE(MAX(id), 0) + 1, false)
+        FROM services_subscription;
+        ALTER TABLE services_subscription ADD CONSTRAINT services_subscription_pkey PRIMARY KEY (id);
+        """
+
+    return f"""
+    ALTER TABLE services_subscription RENAME TO services_subscription_old;
+    {create_table}
+    INSERT INTO services_subscription ({COLUMNS}) SELECT {COLUMNS} FROM services_subscription_old;
+    DROP TABLE services_subscription_old;
+    {id_default}
+
+    ALTER TABLE services_subscription
+        ADD CONSTRAINT services_subscription_client_id_2f59b771_fk_clients_client_id
+        FOREIGN KEY (client_id) REFERENCES clients_client (id) DEFERRABLE INITIALLY DEFERRED;
+    ALTER TABLE services_subscription
+        ADD CONSTRAINT services_subscription_plan_id_84c06a76_fk_services_plan_id
+        FOREIGN KEY (plan_id) REFERENCES services_plan (id) DEFERRABLE INITIALLY DEFERRED;
+    ALTER TABLE services_subscription
+        ADD CONSTRAINT services_subscriptio_service_id_6615e3a3_fk_services_
+        FOREIGN KEY (service_id) REFERENCES services_service (id) DEFERRABLE INITIALLY DEFERRED;
+
+    CREATE INDEX services_subscription_client_id_2f59b771 ON services_subscription (client_id);
+    CREATE INDEX services_subscription_plan_id_84c06a76 ON services_subscription (plan_id);
+    CREATE INDEX services_subscription_service_id_6615e3a3 ON services_subscription (service_id);
+    CREATE INDEX services_su_client__f485a9_idx ON services_subscription (client_id, service_id);
+    CREATE INDEX services_su_change__2066a5_idx ON services_subscription (change_seq);
+
+    CREATE TRIGGER services_subscription_set_change_seq
+        BEFORE INSERT OR UPDATE ON services_subscription
+        FOR EACH ROW EXECUTE FUNCTION services_subscription_set_change_seq();
+    CREATE TRIGGER services_subscription_tombstone
+        AFTER DELETE ON services_subscription
+        FOR EACH ROW EXECUTE FUNCTION services_subscription_tombstone();
+
+    ANALYZE services_subscription;
+    """
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0006_subscription_change_seq'),
+    ]
+
+    operations = [
+        migrations.RunSQL(rebuild_sql(partitioned=True), rebuild_sql(partitioned=False)),
+    ]
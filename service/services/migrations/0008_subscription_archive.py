@@ -0,0 +1,36 @@
+# Generated by Django 4.2.13 on 2026-10-19 04:27
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0001_initial'),
+        ('services', '0007_partition_subscription'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedTotal',
+            fields=[
+                ('service', models.OneToOneField(on_delete=django.db.models.deletion.PROTECT, primary_key=True, related_name='archived_total', serialize=False, to='services.service')),
+                ('subscription_count', models.PositiveIntegerField(default=0)),
+                ('amount', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SubscriptionArchive',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('price', models.PositiveIntegerField(default=0)),
+                ('last_change_time', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('client', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='archived_subscriptions', to='clients.client')),
+                ('plan', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='archived_subscriptions', to='services.plan')),
+                ('service', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='archived_subscriptions', to='services.service')),
+            ],
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.13 on 2026-10-19 04:31
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0001_initial'),
+        ('services', '0008_subscription_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClientSubscriptionsDocument',
+            fields=[
+                ('client', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='subscriptions_document', serialize=False, to='clients.client')),
+                ('content', models.TextField()),
+                ('subtotal', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+    ]
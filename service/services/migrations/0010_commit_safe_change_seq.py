@@ -0,0 +1,90 @@
+# Makes subscription change numbers safe to read before earlier transactions commit.
+#
+# A number taken from a sequence is assigned before the transaction commits, so
+# a transaction holding number N may become visible after a reader has already
+# moved its cursor past N + 1. A change number now holds the id of the writing
+# transaction in the high bits and a counter within the transaction in the low
+# CHANGE_SEQ_XID_SHIFT bits. Transactions below pg_snapshot_xmin() have all
+# finished, so the feed only returns numbers below that transaction id shifted
+# by CHANGE_SEQ_XID_SHIFT, and every change committed later gets a larger number.
+
+from django.db import migrations
+
+CHANGE_SEQ_XID_SHIFT = 24
+
+COMMIT_SAFE_SQL = f"""
+CREATE FUNCTION services_next_change_seq() RETURNS bigint AS $$
+DECLARE
+    counter bigint := COALESCE(NULLIF(current_setting('services.change_counter', true), ''), '0')::bigint + 1;
+BEGIN
+    IF counter >= (1::bigint << {CHANGE_SEQ_XID_SHIFT}) THEN
+        RAISE EXCEPTION 'Too many subscription changes in one transaction';
+    END IF;
+    PERFORM set_config('services.change_counter', counter::text, true);
+    RETURN (pg_current_xact_id()::text::bigint << {CHANGE_SEQ_XID_SHIFT}) | counter;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION services_subscription_set_change_seq() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND (NEW.client_id, NEW.service_id, NEW.plan_id, NEW.price, NEW.last_change_time)
+            IS NOT DISTINCT FROM (OLD.client_id, OLD.service_id, OLD.plan_id, OLD.price, OLD.last_change_time) THEN
+        NEW.change_seq := OLD.change_seq;
+    ELSE
+        NEW.change_seq := services_next_change_seq();
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION services_subscription_tombstone() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO services_subscriptiontombstone (subscription_id, client_id, change_seq, deleted_at)
+    VALUES (OLD.id, OLD.client_id, services_next_change_seq(), now());
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP SEQUENCE services_subscription_change_seq;
+"""
+
+SEQUENCE_SQL = """
+CREATE SEQUENCE services_subscription_change_seq;
+SELECT setval('services_subscription_change_seq', GREATEST(
+    (SELECT COALESCE(MAX(change_seq), 0) FROM services_subscription),
+    (SELECT COALESCE(MAX(change_seq), 0) FROM services_subscriptiontombstone)
+) + 1, false);
+
+CREATE OR REPLACE FUNCTION services_subscription_set_change_seq() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND (NEW.client_id, NEW.service_id, NEW.plan_id, NEW.price, NEW.last_change_time)
+            IS NOT DISTINCT FROM (OLD.client_id, OLD.service_id, OLD.plan_id, OLD.price, OLD.last_change_time) THEN
+        NEW.change_seq := OLD.change_seq;
+    ELSE
+        NEW.change_seq := nextval('services_subscription_change_seq');
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION services_subscription_tombstone() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO services_subscriptiontombstone (subscription_id, client_id, change_seq, deleted_at)
+    VALUES (OLD.id, OLD.client_id, nextval('services_subscription_change_seq'), now());
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP FUNCTION services_next_change_seq();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0009_clientsubscriptionsdocument'),
+    ]
+
+    operations = [
+        migrations.RunSQL(COMMIT_SAFE_SQL, SEQUENCE_SQL),
+    ]
@@ -0,0 +1,44 @@
+# Stops writing tombstones for subscriptions moved to another partition.
+#
+# An UPDATE of client_id moves the row to another hash partition, and PostgreSQL
+# runs the move as a delete from the old partition and an insert into the new one.
+# The AFTER DELETE trigger fires for the delete, so the changes feed reported a
+# live subscription as deleted. AFTER row triggers run after the whole statement,
+# so the moved row is already visible and the tombstone is skipped when a row
+# with the same id still exists.
+
+from django.db import migrations
+
+TOMBSTONE_SQL = """
+CREATE OR REPLACE FUNCTION services_subscription_tombstone() RETURNS trigger AS $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM services_subscription WHERE id = OLD.id) THEN
+        RETURN OLD;
+    END IF;
+    INSERT INTO services_subscriptiontombstone (subscription_id, client_id, change_seq, deleted_at)
+    VALUES (OLD.id, OLD.client_id, services_next_change_seq(), now());
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+ALWAYS_TOMBSTONE_SQL = """
+CREATE OR REPLACE FUNCTION services_subscription_tombstone() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO services_subscriptiontombstone (subscription_id, client_id, change_seq, deleted_at)
+    VALUES (OLD.id, OLD.client_id, services_next_change_seq(), now());
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0010_commit_safe_change_seq'),
+    ]
+
+    operations = [
+        migrations.RunSQL(TOMBSTONE_SQL, ALWAYS_TOMBSTONE_SQL),
+    ]
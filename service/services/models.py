@@ -1,49 +1,172 @@
+from django.contrib.auth.models import User
 from django.core.validators import MaxValueValidator
-from django.db import models
-from django.db.models.signals import post_delete
+from django.db import connections, models, transaction
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save
 from django.utils import timezone
 
 from clients.models import Client
-from .receivers import delete_cache_total_sum
-from .tasks import set_price, set_last_change_time
+from .receivers import (delete_cache_total_sum, refresh_client_document, refresh_plan_documents,
+                        refresh_subscription_documents, refresh_user_documents)
 
 
-class Service(models.Model):
+class TrackedFieldsMixin:
+    """
+    Примесь для отслеживания изменения полей модели относительно значений, загруженных из базы данных.
+
+    Исходные значения полей из tracked_fields сохраняются в from_db только для фактически
+    загруженных полей, поэтому отложенные через only()/defer() поля не вызывают дополнительных
+    запросов, а экземпляры, созданные конструктором, не тратят время на сохранение значений.
+
+    Attributes:
+        tracked_fields (tuple): Имена отслеживаемых полей.
+
+    Methods:
+        has_changed(field_name): Возвращает True, если значение поля изменилось после загрузки.
+        get_changed_fields(): Возвращает имена измененных отслеживаемых полей.
+        snapshot_tracked_fields(field_names=None): Запоминает текущие значения как сохраненные.
+    """
+
+    tracked_fields = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = {name: instance.__dict__[name] for name in cls.tracked_fields
+                                   if name in instance.__dict__}
+        return instance
+
+    def has_changed(self, field_name):
+        """
+        Возвращает True, если значение поля изменилось после загрузки из базы данных или последнего сохранения.
+
+        Для новых объектов изменений нет. Отложенное поле, которому присвоено значение,
+        считается измененным, потому что исходное значение не загружалось.
+        """
+        if self._state.adding or field_name not in self.__dict__:
+            return False
+        loaded_values = getattr(self, '_loaded_values', {})
+        return field_name not in loaded_values or loaded_values[field_name] != self.__dict__[field_name]
+
+    def get_changed_fields(self):
+        """
+        Возвращает имена измененных отслеживаемых полей.
+        """
+        return [name for name in self.tracked_fields if self.has_changed(name)]
+
+    def snapshot_tracked_fields(self, field_names=None):
+        """
+        Запоминает текущие значения загруженных отслеживаемых полей как сохраненные в базе данных.
+        """
+        loaded_values = getattr(self, '_loaded_values', {})
+        for name in self.tracked_fields:
+            if name in self.__dict__ and (field_names is None or name in field_names):
+                loaded_values[name] = self.__dict__[name]
+        self._loaded_values = loaded_values
+
+    def save(self, *args, **kwargs):
+        saved_instance = super().save(*args, **kwargs)
+        self.snapshot_tracked_fields(kwargs.get('update_fields'))
+        return saved_instance
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+        self.snapshot_tracked_fields(fields)
+
+
+class RepricingQuerySet(models.QuerySet):
+    """
+    QuerySet, который после массового изменения цены ставит одно задание на пересчет цен подписок.
+
+    Attributes:
+        price_field (str): Поле, от которого зависят цены подписок.
+        repricing_relation (str): Связь RepricingJob, в которую записываются измененные объекты.
+
+    Methods:
+        update(**kwargs): Обновляет объекты и пересчитывает цены подписок объектов с измененной ценой.
+        bulk_update(objs, fields, batch_size=None): Обновляет объекты пакетно и пересчитывает цены подписок.
+    """
+
+    price_field = None
+    repricing_relation = None
+
+    def schedule_repricing(self, pks):
+        if pks:
+            RepricingJob.schedule(**{self.repricing_relation: pks})
+
+    def update(self, **kwargs):
+        if self.price_field not in kwargs:
+            return super().update(**kwargs)
+
+        with transaction.atomic(using=self.db):
+            changed_pks = list(self.exclude(**{self.price_field: kwargs[self.price_field]})
+                               .values_list('pk', flat=True))
+            rows = super().update(**kwargs)
+            self.schedule_repricing(changed_pks)
+        return rows
+
+    def bulk_update(self, objs, fields, batch_size=None):
+        if self.price_field not in fields:
+            return super().bulk_update(objs, fields, batch_size=batch_size)
+
+        objs = list(objs)
+        with transaction.atomic(using=self.db):
+            stored = dict(self.filter(pk__in=[obj.pk for obj in objs]).values_list('pk', self.price_field))
+            changed_pks = [obj.pk for obj in objs if stored.get(obj.pk) != getattr(obj, self.price_field)]
+            # Базовый bulk_update выполняет update() без повторного планирования пересчета для каждого пакета.
+            rows = models.QuerySet(self.model, using=self.db).bulk_update(objs, fields, batch_size=batch_size)
+            self.schedule_repricing(changed_pks)
+        for obj in objs:
+            obj.snapshot_tracked_fields(fields)
+        return rows
+
+
+class ServiceQuerySet(RepricingQuerySet):
+    price_field = 'full_price'
+    repricing_relation = 'services'
+
+
+class PlanQuerySet(RepricingQuerySet):
+    price_field = 'discount_percent'
+    repricing_relation = 'plans'
+
+
+class Service(TrackedFieldsMixin, models.Model):
     """
     Модель, представляющая услугу.
 
     Attributes:
         name (str): Название услуги.
         full_price (int): Полная цена услуги.
+        objects (ServiceQuerySet): Менеджер, пересчитывающий цены подписок при массовом изменении цены.
 
     Methods:
         save(*args, **kwargs): Переопределенный метод сохранения, который запускает
-                               асинхронные задачи для обновления подписок.
+                               задание на пересчет цен подписок.
     """
 
     name = models.CharField(max_length=50)
     full_price = models.PositiveIntegerField()
 
+    tracked_fields = ('full_price',)
+
+    objects = ServiceQuerySet.as_manager()
+
     def __str__(self):
         return f'Service {self.pk} | {self.name}'
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.__full_price = self.full_price
-
     def save(self, *args, **kwargs):
         """
-        Переопределенный метод сохранения для запуска асинхронных задач при изменении цены услуги.
+        Переопределенный метод сохранения для запуска задания на пересчет цен при изменении цены услуги.
         """
-        if self.__full_price != self.full_price and self.pk is not None:
-            for subscription in self.subscriptions.all():
-                set_price.delay(subscription.id)
-                set_last_change_time.delay(subscription.id)
-
-        return super().save(*args, **kwargs)
+        price_changed = self.has_changed('full_price')
+        saved_instance = super().save(*args, **kwargs)
+        if price_changed:
+            RepricingJob.schedule(services=[self])
+        return saved_instance
 
 
-class Plan(models.Model):
+class Plan(TrackedFieldsMixin, models.Model):
     """
     Модель, представляющая план подписки.
 
@@ -51,10 +174,12 @@ class Plan(models.Model):
         PLAN_TYPES (tuple): Кортеж с вариантами типов плана.
         plan_type (str): Тип плана (например, 'full', 'student', 'discount').
         discount_percent (int): Процент скидки для плана.
+        tracked_fields (tuple): Поля, изменение которых пересчитывает цены или перестраивает документы клиентов.
+        objects (PlanQuerySet): Менеджер, пересчитывающий цены подписок при массовом изменении скидки.
 
     Methods:
         save(*args, **kwargs): Переопределенный метод сохранения, который запускает
-                               асинхронные задачи для обновления подписок.
+                               задание на пересчет цен подписок.
     """
 
     PLAN_TYPES = (
@@ -69,23 +194,22 @@ class Plan(models.Model):
                                                        MaxValueValidator(100)
                                                    ])
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.__discount_percent = self.discount_percent
+    tracked_fields = ('discount_percent', 'plan_type')
+
+    objects = PlanQuerySet.as_manager()
 
     def save(self, *args, **kwargs):
         """
-        Переопределенный метод сохранения для запуска асинхронных задач при изменении скидки плана.
+        Переопределенный метод сохранения для запуска задания на пересчет цен при изменении скидки плана.
         """
-        if self.__discount_percent != self.discount_percent and self.pk is not None:
-            for subscription in self.subscriptions.all():
-                set_price.delay(subscription.id)
-                set_last_change_time.delay(subscription.id)
-
-        return super().save(*args, **kwargs)
+        discount_changed = self.has_changed('discount_percent')
+        saved_instance = super().save(*args, **kwargs)
+        if discount_changed:
+            RepricingJob.schedule(plans=[self])
+        return saved_instance
 
 
-class Subscription(models.Model):
+class Subscription(TrackedFieldsMixin, models.Model):
     """
     Модель, представляющая подписку клиента на услугу.
 
@@ -95,9 +219,15 @@ class Subscription(models.Model):
         plan (Plan): Внешний ключ на модель плана подписки.
         price (int): Цена подписки.
         last_change_time (datetime): Время последнего изменения подписки.
+        change_seq (int): Номер последнего изменения подписки. Назначается триггером базы данных
+                          при вставке и при каждом изменении строки: старшие биты содержат
+                          идентификатор изменившей строку транзакции, младшие CHANGE_SEQ_XID_SHIFT
+                          бит - номер изменения внутри транзакции.
+        tracked_fields (tuple): Отслеживаемые поля. По загруженному client_id перестраивается
+                                документ прежнего клиента при переносе подписки.
 
     Meta:
-        indexes (list): Список индексов для ускорения запросов по клиенту и услуге.
+        indexes (list): Список индексов для ускорения запросов по клиенту и услуге и по номеру изменения.
 
     Methods:
         save(*args, **kwargs): Переопределенный метод сохранения, который запускает
@@ -109,10 +239,14 @@ class Subscription(models.Model):
     plan = models.ForeignKey(Plan, related_name='subscriptions', on_delete=models.PROTECT)
     price = models.PositiveIntegerField(default=0)
     last_change_time = models.DateTimeField(default=timezone.now)
+    change_seq = models.BigIntegerField(default=0, editable=False)
+
+    tracked_fields = ('client_id',)
 
     class Meta:
         indexes = [
             models.Index(fields=['client', 'service']),
+            models.Index(fields=['change_seq']),
         ]
 
     def __str__(self):
@@ -122,6 +256,8 @@ class Subscription(models.Model):
         """
         Переопределенный метод сохранения для запуска асинхронной задачи при создании подписки.
         """
+        from services.tasks import set_price
+
         creating = not bool(self.id)
         saved_instance = super().save(*args, **kwargs)
         if creating:
@@ -129,4 +265,260 @@ class Subscription(models.Model):
         return saved_instance
 
 
+
+class SubscriptionTombstone(models.Model):
+    """
+    Модель, представляющая запись об удалении подписки для ленты изменений.
+
+    Записи создаются триггером базы данных при удалении подписки и получают номер изменения
+    так же, как Subscription.change_seq.
+
+    Attributes:
+        subscription_id (int): Идентификатор удаленной подписки.
+        client_id (int): Идентификатор клиента удаленной подписки.
+        change_seq (int): Номер изменения.
+        deleted_at (datetime): Время удаления подписки.
+    """
+
+    subscription_id = models.BigIntegerField()
+    client_id = models.BigIntegerField()
+    change_seq = models.BigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['change_seq']),
+        ]
+
+    def __str__(self):
+        return f'SubscriptionTombstone {self.subscription_id} | {self.change_seq}'
+
+
+CHANGE_SEQ_XID_SHIFT = 24
+
+
+def get_committed_change_seq(using='default'):
+    """
+    Возвращает номер изменения, все изменения ниже которого уже зафиксированы.
+
+    Транзакции с идентификатором меньше pg_snapshot_xmin() завершены, а транзакции, которые
+    еще выполняются или зафиксируются позже, назначают номера не меньше возвращаемого.
+    Лента изменений, не выдающая номера выше этой границы, не пропускает изменения
+    транзакций, зафиксированных после более поздних.
+
+    Args:
+        using (str): Псевдоним базы данных.
+
+    Returns:
+        int: Граница зафиксированных номеров изменений.
+    """
+    with connections[using].cursor() as cursor:
+        cursor.execute('SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint << %s', [CHANGE_SEQ_XID_SHIFT])
+        return cursor.fetchone()[0]
+
+
+class SubscriptionArchive(models.Model):
+    """
+    Модель, представляющая архивную подписку.
+
+    Подписки, которые давно не изменялись, переносятся из services_subscription в архив
+    функциями модуля services.archive с сохранением идентификатора и цены на момент архивации.
+    Цены архивных подписок не пересчитываются, а при восстановлении пересчитываются заново.
+
+    Attributes:
+        id (int): Идентификатор подписки в services_subscription.
+        client (Client): Внешний ключ на модель клиента.
+        service (Service): Внешний ключ на модель услуги.
+        plan (Plan): Внешний ключ на модель плана подписки.
+        price (int): Цена подписки на момент архивации.
+        last_change_time (datetime): Время последнего изменения подписки до архивации.
+        archived_at (datetime): Время архивации.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    client = models.ForeignKey(Client, related_name='archived_subscriptions', on_delete=models.PROTECT)
+    service = models.ForeignKey(Service, related_name='archived_subscriptions', on_delete=models.PROTECT)
+    plan = models.ForeignKey(Plan, related_name='archived_subscriptions', on_delete=models.PROTECT)
+    price = models.PositiveIntegerField(default=0)
+    last_change_time = models.DateTimeField()
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f'SubscriptionArchive {self.pk} | {self.service_id}'
+
+
+class ArchivedTotal(models.Model):
+    """
+    Модель, представляющая количество и сумму цен архивных подписок услуги.
+
+    Записи обновляются в той же транзакции, что и перенос подписок в архив или из архива,
+    поэтому общая сумма цен складывается из суммы по services_subscription и суммы
+    по этой небольшой таблице без чтения архива.
+
+    Attributes:
+        service (Service): Услуга архивных подписок.
+        subscription_count (int): Количество архивных подписок услуги.
+        amount (int): Сумма цен архивных подписок услуги.
+    """
+
+    service = models.OneToOneField(Service, primary_key=True, related_name='archived_total',
+                                   on_delete=models.PROTECT)
+    subscription_count = models.PositiveIntegerField(default=0)
+    amount = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f'ArchivedTotal {self.service_id} | {self.amount}'
+
+
+class ClientSubscriptionsDocument(models.Model):
+    """
+    Модель, представляющая готовый JSON-документ с подписками клиента.
+
+    Документ содержит данные клиента, подписки с планами и ценами и сумму цен подписок.
+    Он перестраивается функциями модуля services.documents при изменении цен, создании
+    и удалении подписок клиента и отдается эндпоинтом клиента без сериализации.
+
+    Attributes:
+        client (Client): Клиент документа.
+        content (str): JSON-документ.
+        subtotal (int): Сумма цен подписок клиента.
+        updated_at (datetime): Время последнего построения документа.
+    """
+
+    client = models.OneToOneField(Client, primary_key=True, related_name='subscriptions_document',
+                                  on_delete=models.CASCADE)
+    content = models.TextField()
+    subtotal = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f'ClientSubscriptionsDocument {self.client_id} | {self.updated_at}'
+
+
+class RepricingJob(models.Model):
+    """
+    Модель, представляющая задание на пересчет цен подписок.
+
+    Задание обрабатывает подписки выбранных услуг и планов порциями по chunk_size,
+    упорядоченными по id. После каждой порции в той же транзакции сохраняется
+    контрольная точка, поэтому прерванное задание продолжается с места остановки.
+
+    Attributes:
+        STATUSES (tuple): Кортеж с вариантами статусов задания.
+        services (ManyToManyField): Услуги, подписки которых нужно пересчитать.
+        plans (ManyToManyField): Планы, подписки которых нужно пересчитать.
+        status (str): Статус задания.
+        chunk_size (int): Размер порции подписок, пересчитываемой в одной транзакции.
+        total (int): Количество подписок на момент запуска задания.
+        processed (int): Количество уже пересчитанных подписок.
+        last_subscription_id (int): Контрольная точка - id последней пересчитанной подписки.
+        created_at (datetime): Время создания задания.
+        started_at (datetime): Время запуска задания.
+        updated_at (datetime): Время сохранения последней контрольной точки.
+        finished_at (datetime): Время завершения задания.
+
+    Methods:
+        schedule(services, plans): Создает задание и ставит его в очередь после коммита транзакции.
+        get_subscriptions(): Возвращает подписки, которые затрагивает задание.
+    """
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    )
+
+    services = models.ManyToManyField(Service, related_name='repricing_jobs', blank=True)
+    plans = models.ManyToManyField(Plan, related_name='repricing_jobs', blank=True)
+    status = models.CharField(choices=STATUSES, max_length=10, default=PENDING)
+    chunk_size = models.PositiveIntegerField(default=1000)
+    total = models.PositiveIntegerField(default=0)
+    processed = models.PositiveIntegerField(default=0)
+    last_subscription_id = models.BigIntegerField(default=0)
+    created_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status']),
+        ]
+
+    def __str__(self):
+        return f'RepricingJob {self.pk} | {self.status}'
+
+    @classmethod
+    def schedule(cls, services=(), plans=()):
+        """
+        Создает задание на пересчет цен и ставит его в очередь после коммита транзакции.
+
+        Args:
+            services (Iterable[Service]): Услуги, подписки которых нужно пересчитать.
+            plans (Iterable[Plan]): Планы, подписки которых нужно пересчитать.
+
+        Returns:
+            RepricingJob: Созданное задание.
+        """
+        from services.tasks import run_repricing_job
+
+        job = cls.objects.create()
+        job.services.set(services)
+        job.plans.set(plans)
+        transaction.on_commit(lambda: run_repricing_job.delay(job.id))
+        return job
+
+    def get_subscriptions(self):
+        """
+        Возвращает подписки выбранных услуг и планов.
+
+        Returns:
+            QuerySet: Подписки, которые затрагивает задание.
+        """
+        return Subscription.objects.filter(Q(service__in=self.services.all()) | Q(plan__in=self.plans.all()))
+
+    @property
+    def progress(self):
+        """
+        Процент выполнения задания.
+        """
+        if self.status == self.DONE:
+            return 100.0
+        if not self.total:
+            return 0.0
+        return min(100.0, self.processed * 100.0 / self.total)
+
+    @property
+    def throughput(self):
+        """
+        Скорость пересчета в подписках в секунду.
+        """
+        if self.started_at is None or not self.processed:
+            return 0.0
+        elapsed = ((self.finished_at or self.updated_at or timezone.now()) - self.started_at).total_seconds()
+        return self.processed / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def eta(self):
+        """
+        Оценка оставшегося времени выполнения задания в секундах.
+        """
+        if self.status == self.DONE:
+            return 0.0
+        throughput = self.throughput
+        if not throughput:
+            return None
+        return max(self.total - self.processed, 0) / throughput
+
+
 post_delete.connect(delete_cache_total_sum, sender=Subscription)
+post_save.connect(refresh_subscription_documents, sender=Subscription)
+post_delete.connect(refresh_subscription_documents, sender=Subscription)
+post_save.connect(refresh_plan_documents, sender=Plan)
+post_save.connect(refresh_client_document, sender=Client)
+post_save.connect(refresh_user_documents, sender=User)
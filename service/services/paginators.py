@@ -0,0 +1,83 @@
+"""
+Модуль с пагинаторами для административного интерфейса и API.
+
+Классы:
+- EstimatedCountPaginator: Пагинатор, который для больших таблиц без фильтров берет
+  оценку количества строк из статистики PostgreSQL вместо COUNT(*).
+- ArchivePagination: Пагинация архивных подписок по курсору без COUNT(*).
+
+Функции:
+- estimate_count: Возвращает оценку количества строк таблицы модели по статистике PostgreSQL.
+"""
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+from rest_framework.pagination import CursorPagination
+
+
+def estimate_count(model, using='default'):
+    """
+    Возвращает оценку количества строк таблицы модели из pg_class.reltuples.
+
+    Для секционированной таблицы складываются оценки ее секций: начиная с PostgreSQL 14
+    ANALYZE записывает общее количество строк и в reltuples родительской таблицы, поэтому
+    сумма родительской таблицы и секций учла бы каждую строку дважды, а автоочистка
+    не анализирует родительскую таблицу, и ее оценка устаревает.
+
+    Args:
+        model: Модель Django.
+        using (str): Псевдоним базы данных.
+
+    Returns:
+        int: Оценка количества строк.
+    """
+    db_table = model._meta.db_table
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT CASE WHEN parent.relkind = 'p' THEN (
+                SELECT COALESCE(SUM(GREATEST(partition.reltuples, 0)), 0)
+                FROM pg_inherits
+                JOIN pg_class partition ON partition.oid = pg_inherits.inhrelid
+                WHERE pg_inherits.inhparent = parent.oid
+            ) ELSE GREATEST(parent.reltuples, 0) END
+            FROM pg_class parent
+            WHERE parent.oid = %s::regclass
+            """,
+            [db_table],
+        )
+        return int(cursor.fetchone()[0])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Пагинатор, который для больших таблиц без фильтров использует оценку количества строк.
+
+    Оценка берется из pg_class.reltuples функцией estimate_count. Если оценка меньше
+    settings.ADMIN_ESTIMATED_COUNT_THRESHOLD или к запросу применены фильтры,
+    выполняется точный COUNT(*).
+    """
+
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, 'query', None)
+        if query is None or query.where:
+            return super().count
+
+        estimate = estimate_count(self.object_list.model, self.object_list.db)
+        if estimate < settings.ADMIN_ESTIMATED_COUNT_THRESHOLD:
+            return super().count
+        return estimate
+
+
+class ArchivePagination(CursorPagination):
+    """
+    Пагинация архивных подписок по курсору.
+
+    Архив растет без ограничений, поэтому страницы выбираются по первичному ключу
+    без COUNT(*) и OFFSET.
+    """
+    page_size = settings.ARCHIVE_PAGE_SIZE
+    ordering = '-id'
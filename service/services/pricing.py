@@ -0,0 +1,86 @@
+"""
+Модуль для пересчета цен подписок на стороне базы данных.
+
+Этот модуль содержит функции, которые пересчитывают цены множества подписок
+одним UPDATE-запросом вместо сохранения каждой подписки по отдельности.
+
+Функции:
+- discounted_price: Возвращает выражение цены со скидкой с отброшенной дробной частью.
+- price_expression: Возвращает выражение для вычисления цены подписки по услуге и плану.
+- reprice_subscriptions: Пересчитывает цены подписок из переданного QuerySet.
+- find_price_drift: Возвращает подписки, сохраненная цена которых не совпадает с вычисленной.
+"""
+
+from django.db.models import F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Cast, Floor
+from django.utils import timezone
+
+
+def discounted_price(full_price, discount_percent):
+    """
+    Возвращает выражение цены full_price - full_price * discount_percent / 100.
+
+    Дробная часть отбрасывается, как при сохранении вычисленной цены в целочисленное
+    поле подписки: приведение numeric к integer в PostgreSQL округляет, поэтому
+    перед приведением берется FLOOR. Цены и скидки неотрицательны, и FLOOR совпадает
+    с отбрасыванием дробной части.
+
+    Args:
+        full_price: Выражение полной цены услуги.
+        discount_percent: Выражение процента скидки плана.
+
+    Returns:
+        Cast: Выражение цены, приведенное к целому числу.
+    """
+    return Cast(Floor(full_price - full_price * discount_percent / 100.00), output_field=IntegerField())
+
+
+def price_expression():
+    """
+    Возвращает выражение для вычисления цены подписки.
+
+    Цена вычисляется функцией discounted_price. Связанные поля читаются через подзапросы,
+    потому что UPDATE не поддерживает ссылки на поля через join.
+
+    Returns:
+        Cast: Выражение цены, приведенное к целому числу.
+    """
+    from services.models import Service, Plan
+
+    full_price = Subquery(Service.objects.filter(pk=OuterRef('service_id')).values('full_price')[:1])
+    discount_percent = Subquery(Plan.objects.filter(pk=OuterRef('plan_id')).values('discount_percent')[:1])
+    return discounted_price(full_price, discount_percent)
+
+
+def reprice_subscriptions(queryset, touch=True):
+    """
+    Пересчитывает цены подписок одним UPDATE-запросом.
+
+    Args:
+        queryset (QuerySet): Подписки, цены которых нужно пересчитать.
+        touch (bool): Обновлять ли время последнего изменения подписок.
+
+    Returns:
+        int: Количество обновленных подписок.
+    """
+    values = {'price': price_expression()}
+    if touch:
+        values['last_change_time'] = timezone.now()
+    return queryset.update(**values)
+
+
+def find_price_drift(queryset):
+    """
+    Возвращает подписки, сохраненная цена которых не совпадает с вычисленной по услуге и плану.
+
+    Расхождения находятся одним SELECT-запросом с join к услугам и планам, цена
+    вычисляется той же функцией discounted_price, что и в price_expression.
+
+    Args:
+        queryset (QuerySet): Проверяемые подписки.
+
+    Returns:
+        QuerySet: Подписки с расхождением цены и аннотацией expected_price.
+    """
+    expected_price = discounted_price(F('service__full_price'), F('plan__discount_percent'))
+    return queryset.annotate(expected_price=expected_price).exclude(price=F('expected_price'))
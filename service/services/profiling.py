@@ -0,0 +1,169 @@
+"""
+Модуль для профилирования отдельного HTTP-запроса.
+
+Профиль включает детерминированный профиль cProfile всей обработки запроса (представление,
+сериализация, ORM, кэш), выполненные SQL-запросы со временем и планы EXPLAIN ANALYZE
+для SELECT-запросов. Отчет упаковывается в zip-архив.
+
+Классы:
+- RequestProfiler: Собирает профиль и SQL-запросы обработки запроса и формирует отчет.
+
+Функции:
+- is_plain_select: Проверяет, что SQL-запрос - SELECT без блокировки строк.
+"""
+
+import cProfile
+import io
+import json
+import marshal
+import pstats
+import re
+import time
+import zipfile
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections, transaction
+
+re_locking_clause = re.compile(r'\bFOR\s+(?:NO\s+KEY\s+UPDATE|UPDATE|KEY\s+SHARE|SHARE)\b', re.IGNORECASE)
+
+
+def is_plain_select(sql):
+    """
+    Проверяет, что SQL-запрос - SELECT без блокировки строк (FOR UPDATE, FOR NO KEY UPDATE,
+    FOR SHARE, FOR KEY SHARE). Только такие запросы безопасно выполнять повторно для EXPLAIN ANALYZE.
+
+    Args:
+        sql (str): SQL-запрос.
+
+    Returns:
+        bool: True для SELECT-запроса без блокировки строк.
+    """
+    return sql.lstrip().upper().startswith('SELECT') and not re_locking_clause.search(sql)
+
+
+class RequestProfiler:
+    """
+    Собирает профиль и SQL-запросы обработки одного запроса.
+
+    Экземпляр передается в connection.execute_wrapper для записи SQL-запросов,
+    а метод profile выполняет обработку запроса под cProfile.
+
+    Атрибуты:
+        profiler (cProfile.Profile): Профилировщик обработки запроса.
+        queries (list): Выполненные SQL-запросы с параметрами, базой данных и временем выполнения.
+        duration (float): Время обработки запроса в секундах.
+
+    Методы:
+        profile(function, *args): Выполняет функцию под профилировщиком с записью SQL-запросов.
+        explain(): Возвращает планы EXPLAIN ANALYZE самых долгих SELECT-запросов.
+        build_report(request, response): Возвращает zip-архив с отчетом.
+    """
+
+    def __init__(self):
+        self.profiler = cProfile.Profile()
+        self.queries = []
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                'alias': context['connection'].alias,
+                'sql': sql,
+                'params': params,
+                'many': many,
+                'time_ms': (time.perf_counter() - started) * 1000,
+            })
+
+    def profile(self, function, *args):
+        """
+        Выполняет функцию под профилировщиком с записью SQL-запросов всех баз данных.
+
+        Returns:
+            Результат функции.
+        """
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(self))
+            started = time.perf_counter()
+            try:
+                return self.profiler.runcall(function, *args)
+            finally:
+                self.duration = time.perf_counter() - started
+
+    def explain(self):
+        """
+        Возвращает планы EXPLAIN ANALYZE самых долгих SELECT-запросов.
+
+        Запросы выполняются повторно внутри транзакции, которая откатывается. Анализируются
+        только запросы, для которых is_plain_select возвращает True, без пакетных. Количество анализируемых
+        запросов ограничено settings.PROFILING_MAX_EXPLAIN.
+
+        Returns:
+            list: Запросы с планами выполнения.
+        """
+        selects = [
+            query for query in self.queries
+            if not query['many'] and is_plain_select(query['sql'])
+        ]
+        selects.sort(key=lambda query: query['time_ms'], reverse=True)
+
+        explained = []
+        for query in selects[:settings.PROFILING_MAX_EXPLAIN]:
+            connection = connections[query['alias']]
+            with transaction.atomic(using=query['alias']):
+                with connection.cursor() as cursor:
+                    cursor.execute('EXPLAIN (ANALYZE, BUFFERS) ' + query['sql'], query['params'])
+                    plan = '\n'.join(row[0] for row in cursor.fetchall())
+                transaction.set_rollback(True, using=query['alias'])
+            explained.append(dict(query, plan=plan))
+        return explained
+
+    def build_report(self, request, response):
+        """
+        Возвращает zip-архив с отчетом о профилировании.
+
+        Архив содержит summary.json (запрос, статус ответа, время, количество SQL-запросов),
+        profile.txt (функции по накопленному времени), profile.pstats (для pstats и snakeviz),
+        sql.txt (все SQL-запросы) и explain.txt (планы выполнения).
+
+        Args:
+            request (HttpRequest): Профилируемый запрос.
+            response (HttpResponse): Ответ на профилируемый запрос.
+
+        Returns:
+            bytes: Содержимое zip-архива.
+        """
+        stats_text = io.StringIO()
+        stats = pstats.Stats(self.profiler, stream=stats_text)
+        stats.sort_stats('cumulative').print_stats(settings.PROFILING_MAX_FUNCTIONS)
+
+        summary = {
+            'method': request.method,
+            'path': request.get_full_path(),
+            'user': request.user.get_username(),
+            'status': response.status_code,
+            'duration_ms': round(self.duration * 1000, 2),
+            'queries': len(self.queries),
+            'queries_time_ms': round(sum(query['time_ms'] for query in self.queries), 2),
+        }
+        sql_text = '\n\n'.join(
+            f"-- {query['time_ms']:.2f} ms, {query['alias']}\n{query['sql']}\n-- params: {query['params']!r}"
+            for query in self.queries
+        )
+        explain_text = '\n\n'.join(
+            f"-- {query['time_ms']:.2f} ms\n{query['sql']}\n-- params: {query['params']!r}\n{query['plan']}"
+            for query in self.explain()
+        )
+
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, 'w', zipfile.ZIP_DEFLATED) as report:
+            report.writestr('summary.json', json.dumps(summary, indent=2))
+            report.writestr('profile.txt', stats_text.getvalue())
+            report.writestr('profile.pstats', marshal.dumps(stats.stats))
+            report.writestr('sql.txt', sql_text)
+            report.writestr('explain.txt', explain_text)
+        return archive.getvalue()
@@ -0,0 +1,142 @@
+"""
+Модуль для контроля количества и времени SQL-запросов обработки HTTP-запроса.
+
+Запросы к базе данных записываются через connection.execute_wrapper. Для каждого
+представления проверяется бюджет из settings.QUERY_BUDGETS: количество запросов и,
+если включено settings.QUERY_BUDGET_CHECK_TIME, суммарное время их выполнения. Повторение одного и того же шаблона запроса не меньше
+settings.QUERY_BUDGET_REPEAT_THRESHOLD раз считается проблемой N+1, для нее сохраняется
+стек вызовов кода проекта, который выполнил повторный запрос.
+
+Классы:
+- QueryBudgetExceeded: Исключение о превышении бюджета запросов.
+- QueryRecorder: Записывает запросы к базе данных и находит нарушения бюджета.
+
+Функции:
+- get_budget: Возвращает бюджет запросов представления.
+- query_shape: Возвращает шаблон SQL-запроса без значений параметров.
+"""
+
+import os
+import re
+import time
+import traceback
+from collections import Counter
+
+from django.conf import settings
+
+SKIPPED_STATEMENTS = ('SAVEPOINT', 'RELEASE SAVEPOINT', 'ROLLBACK TO SAVEPOINT')
+
+re_placeholders = re.compile(r'\(\s*%s(?:\s*,\s*%s)*\s*\)')
+re_whitespace = re.compile(r'\s+')
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class QueryBudgetExceeded(Exception):
+    """
+    Исключение о превышении бюджета запросов к базе данных при обработке запроса.
+    """
+
+
+def get_budget(view_name):
+    """
+    Возвращает бюджет запросов представления.
+
+    Args:
+        view_name (str): Имя представления из resolver_match, например subscription-list.
+
+    Returns:
+        dict: Максимальное количество запросов queries и суммарное время time_ms.
+    """
+    budget = dict(settings.QUERY_BUDGETS['default'])
+    budget.update(settings.QUERY_BUDGETS.get(view_name, {}))
+    return budget
+
+
+def query_shape(sql):
+    """
+    Возвращает шаблон SQL-запроса, в котором списки параметров любой длины сведены к одному.
+
+    Args:
+        sql (str): SQL-запрос с плейсхолдерами %s.
+
+    Returns:
+        str: Шаблон запроса.
+    """
+    return re_placeholders.sub('(%s, ...)', re_whitespace.sub(' ', sql.strip()))
+
+
+def project_stack():
+    """
+    Возвращает стек вызовов, в котором оставлены только кадры кода проекта.
+    """
+    return [
+        frame for frame in traceback.extract_stack()[:-2]
+        if frame.filename.startswith(PROJECT_ROOT) and os.sep + 'site-packages' + os.sep not in frame.filename
+        and frame.filename != __file__
+    ]
+
+
+class QueryRecorder:
+    """
+    Записывает запросы к базе данных для проверки бюджета.
+
+    Экземпляр передается в connection.execute_wrapper. Для каждого шаблона запроса
+    считается количество выполнений, а при достижении порога повторов сохраняется
+    стек вызовов кода проекта.
+
+    Атрибуты:
+        count (int): Количество выполненных запросов.
+        duration (float): Суммарное время выполнения запросов в секундах.
+        shapes (Counter): Количество выполнений каждого шаблона запроса.
+        stacks (dict): Стек вызовов для шаблонов, повторенных не меньше порога.
+
+    Методы:
+        get_violations(budget): Возвращает описания нарушений бюджета.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+        self.stacks = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        if sql.lstrip().upper().startswith(SKIPPED_STATEMENTS):
+            return execute(sql, params, many, context)
+
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            shape = query_shape(sql)
+            self.shapes[shape] += 1
+            if self.shapes[shape] == settings.QUERY_BUDGET_REPEAT_THRESHOLD:
+                self.stacks[shape] = project_stack()
+
+    def get_violations(self, budget):
+        """
+        Возвращает описания нарушений бюджета.
+
+        Время запросов проверяется, только если включено settings.QUERY_BUDGET_CHECK_TIME.
+
+        Args:
+            budget (dict): Бюджет с максимальным количеством запросов queries и временем time_ms.
+
+        Returns:
+            list: Строки с описанием каждого нарушения.
+        """
+        violations = []
+        if self.count > budget['queries']:
+            violations.append(f"{self.count} queries exceed the budget of {budget['queries']}")
+        duration_ms = self.duration * 1000
+        if settings.QUERY_BUDGET_CHECK_TIME and duration_ms > budget['time_ms']:
+            violations.append(f"{duration_ms:.1f} ms of queries exceed the budget of {budget['time_ms']} ms")
+        for shape, stack in self.stacks.items():
+            violations.append(
+                f'N+1: query repeated {self.shapes[shape]} times: {shape}\n'
+                + ''.join(traceback.format_list(stack))
+            )
+        return violations
@@ -5,13 +5,22 @@
 
 Функции:
 - delete_cache_total_sum: Обработчик сигнала post_delete для удаления кэша суммарной стоимости.
+- publish_price_changes: Обработчик сигнала prices_changed для публикации событий об изменении цен.
+- refresh_price_documents: Обработчик сигнала prices_changed для перестроения документов клиентов.
+- refresh_subscription_documents: Обработчик сохранения и удаления подписки для перестроения документов клиентов.
+- refresh_plan_documents: Обработчик сохранения плана для перестроения документов клиентов при смене типа плана.
+- refresh_client_document: Обработчик сохранения клиента для перестроения его документа.
+- refresh_user_documents: Обработчик сохранения пользователя для перестроения документа клиента при смене email.
 """
 
 from django.conf import settings
-from django.core.cache import cache
 from django.db.models.signals import post_delete
 from django.dispatch import receiver
 
+from .documents import schedule_client_documents
+from .signals import prices_changed
+from .totals import invalidate_total_amount
+
 
 @receiver(post_delete, sender=None)
 def delete_cache_total_sum(*args, **kwargs):
@@ -22,6 +31,110 @@ def delete_cache_total_sum(*args, **kwargs):
         *args: Позиционные аргументы.
         **kwargs: Ключевые аргументы.
 
-    Использует настройку settings.PRICE_CACHE_NAME для удаления кэша.
+    Последнее вычисленное значение суммы сохраняется для ответов до окончания пересчета.
+    """
+    invalidate_total_amount()
+
+
+@receiver(prices_changed)
+def publish_price_changes(sender, subscription_ids, **kwargs):
+    """
+    Обработчик сигнала prices_changed для публикации событий об изменении цен.
+
+    Args:
+        sender: Модель Subscription.
+        subscription_ids (list): Идентификаторы измененных подписок.
+        **kwargs: Ключевые аргументы.
+    """
+    if settings.PRICE_EVENTS_REDIS_URL:
+        from .events import build_price_events, publish_price_events
+
+        publish_price_events(build_price_events(subscription_ids))
+
+
+@receiver(prices_changed)
+def refresh_price_documents(sender, subscription_ids, **kwargs):
+    """
+    Обработчик сигнала prices_changed, который ставит в очередь перестроение документов клиентов
+    измененных подписок одной задачей.
+
+    Args:
+        sender: Модель Subscription.
+        subscription_ids (list): Идентификаторы измененных подписок.
+        **kwargs: Ключевые аргументы.
+    """
+    schedule_client_documents(
+        sender.objects.filter(id__in=subscription_ids).values_list('client_id', flat=True).distinct()
+    )
+
+
+def refresh_subscription_documents(sender, instance, created=True, **kwargs):
+    """
+    Обработчик сигналов post_save и post_delete подписки, который ставит в очередь
+    перестроение документа клиента при создании, изменении и удалении подписки.
+
+    Если подписка перенесена к другому клиенту, перестраивается и документ прежнего
+    клиента, загруженного из базы данных.
+
+    Args:
+        sender: Модель Subscription.
+        instance (Subscription): Сохраненная или удаленная подписка.
+        created (bool): Создана ли подписка. Для post_delete аргумент не передается.
+        **kwargs: Ключевые аргументы.
+    """
+    client_ids = [instance.client_id]
+    loaded_client_id = getattr(instance, '_loaded_values', {}).get('client_id')
+    if loaded_client_id is not None:
+        client_ids.append(loaded_client_id)
+    schedule_client_documents(client_ids)
+
+
+def refresh_plan_documents(sender, instance, created, **kwargs):
+    """
+    Обработчик сигнала post_save плана, который ставит в очередь перестроение документов
+    клиентов с подписками на план при смене типа плана. Изменение скидки перестраивает
+    документы через пересчет цен и сигнал prices_changed.
+
+    Args:
+        sender: Модель Plan.
+        instance (Plan): Сохраненный план.
+        created (bool): Создан ли план.
+        **kwargs: Ключевые аргументы.
+    """
+    if not created and instance.has_changed('plan_type'):
+        schedule_client_documents(instance.subscriptions.values_list('client_id', flat=True).distinct())
+
+
+def refresh_client_document(sender, instance, created, **kwargs):
     """
-    cache.delete(settings.PRICE_CACHE_NAME)
+    Обработчик сигнала post_save клиента, который ставит в очередь перестроение его документа
+    после изменения. Документ нового клиента строится при первом запросе.
+
+    Args:
+        sender: Модель Client.
+        instance (Client): Сохраненный клиент.
+        created (bool): Создан ли клиент.
+        **kwargs: Ключевые аргументы.
+    """
+    if not created:
+        schedule_client_documents([instance.pk])
+
+
+def refresh_user_documents(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Обработчик сигнала post_save пользователя, который ставит в очередь перестроение документа
+    его клиента. Сохранения, не затрагивающие email, например обновление last_login при входе,
+    пропускаются.
+
+    Args:
+        sender: Модель User.
+        instance (User): Сохраненный пользователь.
+        created (bool): Создан ли пользователь.
+        update_fields (frozenset): Сохраненные поля или None, если сохранены все поля.
+        **kwargs: Ключевые аргументы.
+    """
+    if created or (update_fields is not None and 'email' not in update_fields):
+        return
+    from clients.models import Client
+
+    schedule_client_documents(Client.objects.filter(user_id=instance.pk).values_list('id', flat=True))
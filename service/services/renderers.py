@@ -0,0 +1,102 @@
+"""
+Модуль с рендерерами Django Rest Framework.
+
+Этот модуль содержит быстрые рендереры для больших списков подписок, которые выбираются
+по заголовку Accept или параметру format.
+
+Классы:
+- ORJSONRenderer: Рендерер JSON на основе orjson, совместимый по формату с JSONRenderer из DRF.
+- MessagePackRenderer: Рендерер application/msgpack.
+"""
+
+import datetime
+import decimal
+
+import msgpack
+import orjson
+from django.db.models.query import QuerySet
+from django.utils.encoding import force_str
+from django.utils.functional import Promise
+from rest_framework.renderers import BaseRenderer
+
+
+def encode_default(obj):
+    """
+    Преобразует объекты, которые не поддерживаются кодировщиком, так же как JSONEncoder из DRF.
+
+    Args:
+        obj: Объект для преобразования.
+
+    Returns:
+        Значение, поддерживаемое кодировщиком.
+    """
+    if isinstance(obj, Promise):
+        return force_str(obj)
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    if isinstance(obj, datetime.timedelta):
+        return str(obj.total_seconds())
+    if isinstance(obj, bytes):
+        return obj.decode()
+    if isinstance(obj, (QuerySet, set, frozenset)):
+        return list(obj)
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    if hasattr(obj, '__iter__'):
+        return list(obj)
+    raise TypeError(f'Object of type {type(obj).__name__} is not serializable')
+
+
+def encode_msgpack_default(obj):
+    """
+    Преобразует объекты для MessagePack. Дата и время кодируются строками ISO 8601, как в JSON.
+
+    Args:
+        obj: Объект для преобразования.
+
+    Returns:
+        Значение, поддерживаемое MessagePack.
+    """
+    if isinstance(obj, datetime.datetime):
+        representation = obj.isoformat()
+        if representation.endswith('+00:00'):
+            representation = representation[:-6] + 'Z'
+        return representation
+    if isinstance(obj, (datetime.date, datetime.time)):
+        return obj.isoformat()
+    if isinstance(obj, datetime.timedelta):
+        return str(obj.total_seconds())
+    return encode_default(obj)
+
+
+class ORJSONRenderer(BaseRenderer):
+    """
+    Рендерер JSON на основе orjson.
+
+    Формат вывода совпадает с JSONRenderer из DRF: время в UTC кодируется с суффиксом Z,
+    Decimal - числом, а нестроковые ключи словарей приводятся к строкам.
+    """
+    media_type = 'application/json'
+    format = 'json'
+    charset = None
+    options = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return orjson.dumps(data, default=encode_default, option=self.options)
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    Рендерер MessagePack для клиентов, передающих заголовок Accept: application/msgpack.
+    """
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=encode_msgpack_default, use_bin_type=True)
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 
-from services.models import Subscription, Plan
+from clients.models import Client
+from services.models import Subscription, SubscriptionArchive, Plan, RepricingJob
 
 
 class PlanSerializer(serializers.ModelSerializer):
@@ -14,10 +15,29 @@ class PlanSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
+class ClientSerializer(serializers.ModelSerializer):
+    """
+    Сериализатор для модели Client в нормализованном ответе списка подписок.
+
+    Атрибуты:
+        client_name (CharField): Поле для отображения названия компании клиента.
+        email (EmailField): Поле для отображения email пользователя клиента.
+    """
+    client_name = serializers.CharField(source='company_name')
+    email = serializers.EmailField(source='user.email')
+
+    class Meta:
+        model = Client
+        fields = ('id', 'client_name', 'email')
+
+
 class SubscriptionSerializer(serializers.ModelSerializer):
     """
     Сериализатор для модели Subscription.
 
+    Принимает необязательный аргумент fields - список имен полей, которые нужно оставить в выводе.
+    Кроме полей из Meta.fields, в нем можно указать client_id.
+
     Атрибуты:
         plan (PlanSerializer): Сериализатор для вложенного объекта плана.
         client_name (CharField): Поле для отображения названия компании клиента.
@@ -26,6 +46,7 @@ class SubscriptionSerializer(serializers.ModelSerializer):
         last_change_time (SerializerMethodField): Поле для отображения времени последнего изменения подписки.
 
     Методы:
+        __init__(*args, fields=None, **kwargs): Оставляет в сериализаторе только запрошенные поля.
         get_price(instance): Возвращает цену подписки.
         get_last_change_time(instance): Возвращает время последнего изменения подписки.
     """
@@ -35,6 +56,15 @@ class SubscriptionSerializer(serializers.ModelSerializer):
     price = serializers.SerializerMethodField()
     last_change_time = serializers.SerializerMethodField()
 
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is None:
+            return
+        if 'client_id' in fields:
+            self.fields['client_id'] = serializers.IntegerField(read_only=True)
+        for field_name in set(self.fields) - set(fields):
+            self.fields.pop(field_name)
+
     def get_price(self, instance):
         """
         Возвращает цену подписки.
@@ -62,3 +92,34 @@ class SubscriptionSerializer(serializers.ModelSerializer):
     class Meta:
         model = Subscription
         fields = ('id', 'plan_id', 'plan', 'price', 'last_change_time', 'client_name', 'email')
+
+
+class RepricingJobSerializer(serializers.ModelSerializer):
+    """
+    Сериализатор для модели RepricingJob.
+
+    Атрибуты:
+        progress (FloatField): Процент выполнения задания.
+        throughput (FloatField): Скорость пересчета в подписках в секунду.
+        eta (FloatField): Оценка оставшегося времени выполнения задания в секундах.
+    """
+    progress = serializers.FloatField(read_only=True)
+    throughput = serializers.FloatField(read_only=True)
+    eta = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = RepricingJob
+        fields = ('id', 'status', 'services', 'plans', 'total', 'processed', 'progress', 'throughput', 'eta',
+                  'created_at', 'started_at', 'updated_at', 'finished_at')
+
+
+class SubscriptionArchiveSerializer(serializers.ModelSerializer):
+    """
+    Сериализатор для модели SubscriptionArchive.
+
+    Связанные объекты выводятся идентификаторами, поэтому сериализация не выполняет запросов.
+    """
+
+    class Meta:
+        model = SubscriptionArchive
+        fields = ('id', 'client', 'service', 'plan', 'price', 'last_change_time', 'archived_at')
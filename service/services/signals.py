@@ -0,0 +1,41 @@
+"""
+Модуль с сигналами приложения services.
+
+Сигналы:
+- prices_changed: Отправляется после коммита транзакции, изменившей цены или время последнего изменения подписок.
+
+Функции:
+- send_prices_changed: Отправляет сигнал prices_changed после коммита текущей транзакции.
+"""
+
+import logging
+
+from django.db import transaction
+from django.dispatch import Signal
+
+logger = logging.getLogger(__name__)
+
+prices_changed = Signal()
+
+
+def send_prices_changed(subscription_ids):
+    """
+    Отправляет сигнал prices_changed после коммита текущей транзакции.
+
+    Обработчики публикуют события и ставят задачи в очередь, но цены к этому моменту уже
+    зафиксированы, поэтому ошибка обработчика, например недоступность Redis, записывается
+    в лог и не передается коду, изменившему цены.
+
+    Args:
+        subscription_ids (Iterable[int]): Идентификаторы измененных подписок.
+    """
+    from services.models import Subscription
+
+    subscription_ids = list(subscription_ids)
+
+    def send():
+        for receiver, response in prices_changed.send_robust(sender=Subscription, subscription_ids=subscription_ids):
+            if isinstance(response, Exception):
+                logger.error('prices_changed receiver %s failed', receiver.__name__, exc_info=response)
+
+    transaction.on_commit(send)
@@ -0,0 +1,224 @@
+"""
+Модуль с ASGI-приложением для push-уведомлений об изменении цен подписок.
+
+События, опубликованные модулем services.events в канал Redis, принимаются одним
+подписчиком на процесс и раздаются открытым соединениям. Соединения ожидают событий
+в корутинах без отдельных потоков, а подписчики индексируются по клиенту и услуге,
+поэтому процесс держит тысячи простаивающих соединений и не перебирает их все на каждое событие.
+
+Эндпоинты:
+- /api/subscriptions/stream/: Server-sent events.
+- /ws/subscriptions/: WebSocket.
+
+Параметры запроса client и service задают через запятую идентификаторы клиентов и услуг,
+события которых нужно получать. Без параметров передаются все события.
+События, накопленные за settings.PRICE_EVENTS_BATCH_INTERVAL секунд, отправляются одним сообщением.
+
+Классы:
+- PriceEventSubscriber: Подписчик на события одного соединения.
+- PriceEventBroadcaster: Раздача событий из Redis подписчикам процесса.
+- PriceEventsApplication: ASGI-приложение, обслуживающее эндпоинты событий и передающее остальные запросы Django.
+"""
+
+import asyncio
+import collections
+import json
+import logging
+from urllib.parse import parse_qs
+
+import redis.asyncio as redis
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+SSE_PATH = '/api/subscriptions/stream/'
+WEBSOCKET_PATH = '/ws/subscriptions/'
+
+
+class PriceEventSubscriber:
+    """
+    Подписчик на события об изменении цен одного соединения.
+
+    Attributes:
+        client_ids (set): Идентификаторы клиентов, события которых нужно получать.
+        service_ids (set): Идентификаторы услуг, события которых нужно получать.
+        events (deque): Буфер событий, ограниченный settings.PRICE_EVENTS_MAX_BUFFER.
+    """
+
+    def __init__(self, client_ids=(), service_ids=()):
+        self.client_ids = set(client_ids)
+        self.service_ids = set(service_ids)
+        self.events = collections.deque(maxlen=settings.PRICE_EVENTS_MAX_BUFFER)
+        self.ready = asyncio.Event()
+
+    def push(self, event):
+        self.events.append(event)
+        self.ready.set()
+
+    async def next_batch(self, timeout):
+        """
+        Ожидает события и возвращает их, накопив за интервал пакетирования.
+
+        Args:
+            timeout (float): Максимальное время ожидания первого события в секундах.
+
+        Returns:
+            list: События или пустой список, если за timeout событий не было.
+        """
+        try:
+            await asyncio.wait_for(self.ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return []
+        await asyncio.sleep(settings.PRICE_EVENTS_BATCH_INTERVAL)
+        events = list(self.events)
+        self.events.clear()
+        self.ready.clear()
+        return events
+
+
+class PriceEventBroadcaster:
+    """
+    Раздача событий из канала Redis подписчикам процесса.
+
+    Подписка на канал Redis запускается при появлении первого подписчика
+    и переподключается при ошибках соединения.
+    """
+
+    def __init__(self):
+        self.subscribers = set()
+        self.by_client = collections.defaultdict(set)
+        self.by_service = collections.defaultdict(set)
+        self.unfiltered = set()
+        self.listener = None
+
+    def subscribe(self, client_ids=(), service_ids=()):
+        subscriber = PriceEventSubscriber(client_ids, service_ids)
+        self.subscribers.add(subscriber)
+        if not subscriber.client_ids and not subscriber.service_ids:
+            self.unfiltered.add(subscriber)
+        for client_id in subscriber.client_ids:
+            self.by_client[client_id].add(subscriber)
+        for service_id in subscriber.service_ids:
+            self.by_service[service_id].add(subscriber)
+        if self.listener is None or self.listener.done():
+            self.listener = asyncio.ensure_future(self.listen())
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        self.subscribers.discard(subscriber)
+        self.unfiltered.discard(subscriber)
+        for index, keys in ((self.by_client, subscriber.client_ids), (self.by_service, subscriber.service_ids)):
+            for key in keys:
+                index[key].discard(subscriber)
+                if not index[key]:
+                    del index[key]
+
+    def dispatch(self, events):
+        """
+        Раздает события подписчикам, отфильтровавшим их по клиенту или услуге.
+
+        Args:
+            events (list): События об изменении цен.
+        """
+        for event in events:
+            recipients = self.unfiltered | self.by_client.get(event['client_id'], set()) \
+                | self.by_service.get(event['service_id'], set())
+            for subscriber in recipients:
+                subscriber.push(event)
+
+    async def listen(self):
+        while self.subscribers:
+            try:
+                connection = redis.Redis.from_url(settings.PRICE_EVENTS_REDIS_URL)
+                async with connection.pubsub() as pubsub:
+                    await pubsub.subscribe(settings.PRICE_EVENTS_CHANNEL)
+                    while self.subscribers:
+                        message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                        if message is not None:
+                            self.dispatch(json.loads(message['data']))
+                await connection.aclose()
+            except (redis.RedisError, OSError):
+                logger.exception('Price events subscription failed, reconnecting')
+                await asyncio.sleep(1)
+
+
+broadcaster = PriceEventBroadcaster()
+
+
+def parse_ids(query, name):
+    return {int(value) for values in query.get(name, ()) for value in values.split(',') if value.isdigit()}
+
+
+class PriceEventsApplication:
+    """
+    ASGI-приложение, обслуживающее эндпоинты событий и передающее остальные запросы приложению Django.
+
+    Attributes:
+        application: ASGI-приложение Django.
+    """
+
+    def __init__(self, application):
+        self.application = application
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'http' and scope['path'] == SSE_PATH:
+            return await self.server_sent_events(scope, receive, send)
+        if scope['type'] == 'websocket' and scope['path'] == WEBSOCKET_PATH:
+            return await self.websocket(scope, receive, send)
+        return await self.application(scope, receive, send)
+
+    def subscribe(self, scope):
+        query = parse_qs(scope.get('query_string', b'').decode())
+        return broadcaster.subscribe(parse_ids(query, 'client'), parse_ids(query, 'service'))
+
+    async def wait_disconnect(self, receive, disconnect_type):
+        while (await receive())['type'] != disconnect_type:
+            pass
+
+    async def stream(self, subscriber, disconnect, send_batch):
+        """
+        Отправляет пакеты событий, пока клиент не отключится.
+        """
+        try:
+            while True:
+                batch = asyncio.ensure_future(subscriber.next_batch(settings.PRICE_EVENTS_HEARTBEAT_INTERVAL))
+                done, _ = await asyncio.wait({batch, disconnect}, return_when=asyncio.FIRST_COMPLETED)
+                if disconnect in done:
+                    batch.cancel()
+                    return
+                await send_batch(batch.result())
+        finally:
+            broadcaster.unsubscribe(subscriber)
+            disconnect.cancel()
+
+    async def server_sent_events(self, scope, receive, send):
+        subscriber = self.subscribe(scope)
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [
+                (b'content-type', b'text/event-stream'),
+                (b'cache-control', b'no-cache'),
+                (b'x-accel-buffering', b'no'),
+            ],
+        })
+
+        async def send_batch(events):
+            body = f'event: prices\ndata: {json.dumps(events)}\n\n' if events else ': ping\n\n'
+            await send({'type': 'http.response.body', 'body': body.encode(), 'more_body': True})
+
+        disconnect = asyncio.ensure_future(self.wait_disconnect(receive, 'http.disconnect'))
+        await self.stream(subscriber, disconnect, send_batch)
+
+    async def websocket(self, scope, receive, send):
+        if (await receive())['type'] != 'websocket.connect':
+            return
+        await send({'type': 'websocket.accept'})
+        subscriber = self.subscribe(scope)
+
+        async def send_batch(events):
+            if events:
+                await send({'type': 'websocket.send', 'text': json.dumps(events)})
+
+        disconnect = asyncio.ensure_future(self.wait_disconnect(receive, 'websocket.disconnect'))
+        await self.stream(subscriber, disconnect, send_batch)
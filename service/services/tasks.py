@@ -4,37 +4,94 @@
 Этот модуль содержит задачи Celery для обработки асинхронных операций над подписками.
 
 Задачи:
-- set_price: Обновляет цену подписки и очищает кэш суммарной стоимости.
+- set_price: Обновляет цены подписок пакетами и очищает кэш суммарной стоимости.
 - set_last_change_time: Устанавливает время последнего изменения подписки и очищает кэш суммарной стоимости.
+- run_repricing_job: Выполняет задание на пересчет цен порциями с сохранением контрольных точек.
+- refresh_total_amount: Пересчитывает общую сумму цен подписок в кэше и снимает блокировку пересчета.
+- reconcile_prices: Находит и исправляет подписки с расхождением сохраненной и вычисленной цены.
+- archive_cold_subscriptions: Переносит давно не изменявшиеся подписки в архив порциями.
+- refresh_client_documents: Перестраивает документы с подписками клиентов пакетами.
+
+Функции:
+- update_prices: Обновляет цены подписок одним UPDATE-запросом.
+
+Обработчики сигналов:
+- warm_up_worker: Прогревает кэши перед запуском процессов воркера.
+- resume_repricing_jobs: Возобновляет незавершенные задания на пересчет цен при запуске воркера.
 """
 
+import logging
+import time
+from collections import Counter
+
 from celery import shared_task
+from celery.signals import worker_init, worker_ready
+from celery_batches import Batches
 from celery_singleton import Singleton
+# Создает настроенное приложение Celery до первой постановки задачи в очередь.
+import celery_app  # noqa: F401
 from django.conf import settings
-from django.core.cache import cache
-from django.db import transaction
-from django.db.models import F
+from django.db import InterfaceError, OperationalError, transaction
+from django.db.models import Max
 from django.utils import timezone
+from redis.exceptions import RedisError
 
+from .signals import send_prices_changed
+from .totals import invalidate_total_amount, release_total_amount_lock, store_total_amount
 
-@shared_task(base=Singleton)
-def set_price(subscription_id):
+logger = logging.getLogger(__name__)
+
+# Кратковременные ошибки базы данных и Redis, после которых задание на пересчет цен повторяется.
+RETRYABLE_ERRORS = (OperationalError, InterfaceError, RedisError)
+
+
+@shared_task(base=Batches, flush_every=settings.PRICE_BATCH_SIZE, flush_interval=settings.PRICE_BATCH_INTERVAL)
+def set_price(requests):
     """
-    Обновляет цену подписки и очищает кэш суммарной стоимости.
+    Обновляет цены подписок пакетом и очищает кэш суммарной стоимости.
+
+    Задача ставится в очередь по одной подписке: set_price.delay(subscription_id). Воркер
+    накапливает сообщения, пока их не станет settings.PRICE_BATCH_SIZE или не пройдет
+    settings.PRICE_BATCH_INTERVAL секунд, и обрабатывает их вызовом update_prices.
 
     Args:
-        subscription_id (int): Идентификатор подписки.
+        requests (list): Запросы SimpleRequest, первый аргумент каждого - идентификатор подписки.
+    """
+    update_prices([request.args[0] for request in requests])
+
+
+@shared_task(base=Batches, flush_every=settings.PRICE_BATCH_SIZE, flush_interval=settings.PRICE_BATCH_INTERVAL)
+def refresh_client_documents(requests):
+    """
+    Перестраивает документы с подписками клиентов пакетом.
+
+    Задача ставится в очередь со списком клиентов: refresh_client_documents.delay(client_ids).
+    Клиенты из всех сообщений пакета объединяются, поэтому документ клиента, подписки
+    которого изменились несколько раз за время накопления пакета, строится один раз.
+
+    Args:
+        requests (list): Запросы SimpleRequest, первый аргумент каждого - список идентификаторов клиентов.
+    """
+    from services.documents import rebuild_client_documents
+
+    rebuild_client_documents({client_id for request in requests for client_id in request.args[0]})
+
+
+def update_prices(subscription_ids):
+    """
+    Обновляет цены подписок одним UPDATE-запросом и очищает кэш суммарной стоимости один раз.
+
+    Args:
+        subscription_ids (list): Идентификаторы подписок, в том числе повторяющиеся.
     """
     from services.models import Subscription
+    from services.pricing import reprice_subscriptions
 
+    subscription_ids = sorted(set(subscription_ids))
     with transaction.atomic():
-        subscription = Subscription.objects.filter(id=subscription_id).annotate(
-            annotated_price=F('service__full_price') - F('service__full_price') * F('plan__discount_percent') / 100.00)
-        subscription = subscription.first()
-
-        subscription.price = subscription.annotated_price
-        subscription.save()
-    cache.delete(settings.PRICE_CACHE_NAME)
+        reprice_subscriptions(Subscription.objects.filter(id__in=subscription_ids), touch=False)
+        send_prices_changed(subscription_ids)
+    invalidate_total_amount()
 
 
 @shared_task(base=Singleton)
@@ -52,4 +109,225 @@ def set_last_change_time(subscription_id):
 
         subscription.last_change_time = timezone.now()
         subscription.save()
-    cache.delete(settings.PRICE_CACHE_NAME)
+        send_prices_changed([subscription_id])
+    invalidate_total_amount()
+
+
+@shared_task(base=Singleton, bind=True, acks_late=True, max_retries=settings.REPRICING_MAX_RETRIES)
+def run_repricing_job(self, job_id):
+    """
+    Выполняет задание на пересчет цен подписок.
+
+    Подписки обрабатываются порциями по возрастанию id. Каждая порция пересчитывается
+    одним UPDATE-запросом, и в той же транзакции сохраняется контрольная точка задания,
+    поэтому после перезапуска воркера задание продолжается с первой необработанной подписки.
+
+    При кратковременной ошибке базы данных или Redis задание остается в статусе RUNNING
+    и повторяется с контрольной точки через settings.REPRICING_RETRY_DELAY секунд,
+    удваивая паузу при каждом повторе. Задание получает статус FAILED после
+    settings.REPRICING_MAX_RETRIES неудачных повторов или при любой другой ошибке.
+
+    Args:
+        job_id (int): Идентификатор задания на пересчет цен.
+    """
+    from services.models import RepricingJob, Subscription
+    from services.pricing import reprice_subscriptions
+
+    try:
+        job = RepricingJob.objects.get(id=job_id)
+        if job.status == RepricingJob.DONE:
+            return
+
+        subscriptions = job.get_subscriptions()
+        if job.started_at is None:
+            job.started_at = timezone.now()
+            job.total = subscriptions.count()
+        job.status = RepricingJob.RUNNING
+        job.save(update_fields=['status', 'started_at', 'total'])
+
+        while True:
+            with transaction.atomic():
+                job = RepricingJob.objects.select_for_update().get(id=job_id)
+                chunk = list(
+                    subscriptions.filter(id__gt=job.last_subscription_id)
+                    .order_by('id')
+                    .values_list('id', flat=True)[:job.chunk_size]
+                )
+                if not chunk:
+                    break
+
+                reprice_subscriptions(Subscription.objects.filter(id__in=chunk))
+                send_prices_changed(chunk)
+                job.processed += len(chunk)
+                job.last_subscription_id = chunk[-1]
+                job.updated_at = timezone.now()
+                job.save(update_fields=['processed', 'last_subscription_id', 'updated_at'])
+            invalidate_total_amount()
+    except RETRYABLE_ERRORS as exc:
+        if self.request.retries >= self.max_retries:
+            RepricingJob.objects.filter(id=job_id).update(status=RepricingJob.FAILED)
+            raise
+        logger.warning('Repricing job %s failed, retrying from checkpoint', job_id, exc_info=True)
+        # Повтор ставится в очередь с тем же id задачи, который Singleton считает дубликатом
+        # выполняющейся задачи, поэтому блокировка снимается заранее.
+        self.release_lock(task_args=[job_id])
+        raise self.retry(exc=exc, countdown=settings.REPRICING_RETRY_DELAY * 2 ** self.request.retries)
+    except Exception:
+        RepricingJob.objects.filter(id=job_id).update(status=RepricingJob.FAILED)
+        raise
+
+    job.status = RepricingJob.DONE
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'finished_at'])
+
+
+@shared_task(base=Singleton)
+def refresh_total_amount():
+    """
+    Пересчитывает общую сумму цен подписок в кэше и снимает блокировку пересчета.
+
+    Задача ставится в очередь процессом, получившим блокировку в services.totals.get_total_amount,
+    пока остальные запросы получают последнее вычисленное значение.
+    """
+    try:
+        store_total_amount()
+    finally:
+        release_total_amount_lock()
+
+
+@shared_task(base=Singleton)
+def reconcile_prices(chunk_size=None, interval=None):
+    """
+    Находит и исправляет подписки, сохраненная цена которых не совпадает с вычисленной.
+
+    Цены могут разойтись, если задача set_price была потеряна, отброшена Singleton или
+    выполнилась одновременно с изменением услуги. Подписки проверяются диапазонами id
+    по chunk_size строк: расхождения в диапазоне находятся одним SELECT-запросом и
+    исправляются одним UPDATE-запросом, а между диапазонами задача делает паузу interval
+    секунд, чтобы ограничить нагрузку на базу данных. Задача запускается периодически
+    из CELERYBEAT_SCHEDULE.
+
+    Args:
+        chunk_size (int): Размер диапазона id, по умолчанию settings.PRICE_RECONCILIATION_CHUNK_SIZE.
+        interval (float): Пауза между диапазонами в секундах,
+                          по умолчанию settings.PRICE_RECONCILIATION_INTERVAL.
+
+    Returns:
+        dict: Количество исправленных подписок всего и по парам услуги и плана.
+    """
+    from services.models import Subscription
+    from services.pricing import find_price_drift, reprice_subscriptions
+
+    chunk_size = chunk_size or settings.PRICE_RECONCILIATION_CHUNK_SIZE
+    interval = settings.PRICE_RECONCILIATION_INTERVAL if interval is None else interval
+
+    drift = Counter()
+    max_id = Subscription.objects.aggregate(max_id=Max('id'))['max_id'] or 0
+    for start in range(0, max_id, chunk_size):
+        with transaction.atomic():
+            mismatched = list(
+                find_price_drift(Subscription.objects.filter(id__gt=start, id__lte=start + chunk_size))
+                .values_list('id', 'service_id', 'plan_id')
+            )
+            if mismatched:
+                ids = [subscription_id for subscription_id, _, _ in mismatched]
+                reprice_subscriptions(Subscription.objects.filter(id__in=ids))
+                send_prices_changed(ids)
+                drift.update((service_id, plan_id) for _, service_id, plan_id in mismatched)
+        if mismatched:
+            invalidate_total_amount()
+        if interval and start + chunk_size < max_id:
+            time.sleep(interval)
+
+    report = {
+        'fixed': sum(drift.values()),
+        'by_service_plan': [
+            {'service_id': service_id, 'plan_id': plan_id, 'count': count}
+            for (service_id, plan_id), count in drift.most_common()
+        ],
+    }
+    if drift:
+        logger.warning('Fixed %s drifted subscription prices: %s', report['fixed'], report['by_service_plan'])
+    return report
+
+
+@shared_task(base=Singleton)
+def archive_cold_subscriptions(after_days=None, services=None, plans=None, chunk_size=None, interval=None):
+    """
+    Переносит подписки, которые не изменялись больше after_days дней, в архив.
+
+    Подписки обходятся диапазонами id по chunk_size строк, как в reconcile_prices, поэтому
+    для выборки не нужен индекс по last_change_time. Подписки диапазона блокируются
+    с пропуском уже заблокированных строк и переносятся одним запросом в отдельной
+    транзакции, а между диапазонами задача делает паузу interval секунд. Общая сумма
+    цен при переносе не меняется, поэтому кэш суммы не очищается. Задача запускается
+    периодически из CELERYBEAT_SCHEDULE.
+
+    Args:
+        after_days (int): Возраст последнего изменения подписки в днях, по умолчанию settings.ARCHIVE_AFTER_DAYS.
+        services (list): Идентификаторы услуг, если архивировать нужно только их подписки.
+        plans (list): Идентификаторы планов, если архивировать нужно только их подписки.
+        chunk_size (int): Размер диапазона id, по умолчанию settings.ARCHIVE_CHUNK_SIZE.
+        interval (float): Пауза между диапазонами в секундах, по умолчанию settings.ARCHIVE_INTERVAL.
+
+    Returns:
+        int: Количество перенесенных в архив подписок.
+    """
+    from services.archive import archive_subscriptions, get_archivable_subscriptions
+    from services.documents import schedule_client_documents
+    from services.models import Subscription
+
+    after_days = settings.ARCHIVE_AFTER_DAYS if after_days is None else after_days
+    chunk_size = chunk_size or settings.ARCHIVE_CHUNK_SIZE
+    interval = settings.ARCHIVE_INTERVAL if interval is None else interval
+
+    archived = 0
+    queryset = get_archivable_subscriptions(after_days, services, plans)
+    max_id = Subscription.objects.aggregate(max_id=Max('id'))['max_id'] or 0
+    for start in range(0, max_id, chunk_size):
+        with transaction.atomic():
+            subscriptions = list(
+                queryset.filter(id__gt=start, id__lte=start + chunk_size)
+                .select_for_update(skip_locked=True).values_list('id', 'client_id')
+            )
+            if subscriptions:
+                archived += archive_subscriptions([subscription_id for subscription_id, _ in subscriptions])
+                schedule_client_documents(client_id for _, client_id in subscriptions)
+        if interval and start + chunk_size < max_id:
+            time.sleep(interval)
+
+    if archived:
+        logger.info('Archived %s subscriptions', archived)
+    return archived
+
+
+@worker_init.connect
+def warm_up_worker(**kwargs):
+    """
+    Прогревает общую сумму цен и кэш услуг и планов до того, как воркер начнет получать задачи.
+
+    Ошибка прогрева не прерывает запуск воркера. Соединения с базой данных закрываются
+    после прогрева, чтобы процессы пула prefork их не унаследовали.
+    """
+    from services.warmup import warm_up_on_startup
+
+    if settings.WARMUP_ON_STARTUP:
+        warm_up_on_startup()
+
+
+@worker_ready.connect
+def resume_repricing_jobs(**kwargs):
+    """
+    Возобновляет незавершенные задания на пересчет цен при запуске воркера.
+
+    Блокировка Singleton остается в Redis, если воркер был остановлен во время выполнения
+    задания, поэтому перед повторной постановкой в очередь она снимается. Одновременный
+    запуск одного задания двумя воркерами безопасен: контрольная точка читается под
+    блокировкой строки задания.
+    """
+    from services.models import RepricingJob
+
+    for job_id in RepricingJob.objects.filter(
+            status__in=(RepricingJob.PENDING, RepricingJob.RUNNING)).values_list('id', flat=True):
+        run_repricing_job.release_lock(task_args=[job_id])
+        run_repricing_job.delay(job_id)
@@ -0,0 +1,240 @@
+"""
+Модуль с ограничителями запросов Django Rest Framework на основе Redis.
+
+Потребитель - аутентифицированный пользователь или IP-адрес анонимного клиента.
+Для каждого потребителя действуют два ограничения: корзина токенов, из которой запрос
+списывает токены по ожидаемому количеству строк ответа, и количество одновременно
+выполняемых запросов. Решения ограничителей учитываются в метриках Prometheus.
+Если Redis недоступен, запросы пропускаются. Запросы прогрева кэшей при запуске
+процесса не ограничиваются.
+
+Классы:
+- CostThrottle: Ограничитель по корзине токенов со стоимостью запроса по ожидаемому количеству строк.
+- ConcurrencyThrottle: Ограничитель количества одновременных запросов потребителя.
+
+Функции:
+- is_exempt: Проверяет, что запрос не ограничивается.
+- get_consumer: Возвращает область и идентификатор потребителя запроса.
+- estimate_rows: Возвращает кэшированную оценку количества строк таблицы модели.
+- get_request_cost: Возвращает стоимость запроса в токенах.
+- release_concurrency_slot: Освобождает место одновременного запроса.
+"""
+
+import logging
+import math
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django_redis import get_redis_connection
+from redis.exceptions import RedisError
+from rest_framework.throttling import BaseThrottle
+
+from .metrics import THROTTLE_DECISIONS, THROTTLE_TOKENS
+from .paginators import estimate_count
+from .warmup import WARMUP_ENVIRON_KEY
+
+logger = logging.getLogger(__name__)
+
+TOKEN_BUCKET_SCRIPT = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(bucket[1]) or burst
+local updated = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated) * rate)
+local allowed = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+CONCURRENCY_ACQUIRE_SCRIPT = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local limit = tonumber(ARGV[1])
+local timeout = tonumber(ARGV[2])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - timeout)
+if redis.call('ZCARD', KEYS[1]) >= limit then
+    return 0
+end
+redis.call('ZADD', KEYS[1], now, ARGV[3])
+redis.call('EXPIRE', KEYS[1], math.ceil(timeout))
+return 1
+"""
+
+
+def is_exempt(request):
+    """
+    Проверяет, что запрос не ограничивается.
+
+    Ограничители отключены настройкой settings.THROTTLE_ENABLED или запрос выполняется
+    при прогреве кэшей функцией services.warmup.request_path.
+
+    Args:
+        request (Request): Объект запроса.
+
+    Returns:
+        bool: True, если запрос не ограничивается.
+    """
+    return not settings.THROTTLE_ENABLED or bool(request.META.get(WARMUP_ENVIRON_KEY))
+
+
+def get_consumer(throttle, request):
+    """
+    Возвращает область и идентификатор потребителя запроса.
+
+    Args:
+        throttle (BaseThrottle): Ограничитель, определяющий IP-адрес клиента.
+        request (Request): Объект запроса.
+
+    Returns:
+        tuple: Область ('user' или 'anon') и идентификатор потребителя.
+    """
+    if request.user and request.user.is_authenticated:
+        return 'user', f'user:{request.user.pk}'
+    return 'anon', f'anon:{throttle.get_ident(request)}'
+
+
+def estimate_rows(model):
+    """
+    Возвращает оценку количества строк таблицы модели, кэшированную на settings.THROTTLE_ESTIMATE_TIMEOUT секунд.
+    """
+    return cache.get_or_set(f'{settings.THROTTLE_KEY_PREFIX}:rows:{model._meta.db_table}',
+                            lambda: estimate_count(model), settings.THROTTLE_ESTIMATE_TIMEOUT)
+
+
+def get_request_cost(request, view, burst):
+    """
+    Возвращает стоимость запроса в токенах.
+
+    Ожидаемое количество строк ответа возвращает метод представления get_throttle_rows(request),
+    по умолчанию одна строка. Каждые settings.THROTTLE_ROWS_PER_TOKEN строк стоят один токен,
+    но не больше емкости корзины, чтобы самый дорогой запрос оставался выполнимым.
+
+    Args:
+        request (Request): Объект запроса.
+        view (APIView): Представление.
+        burst (int): Емкость корзины потребителя.
+
+    Returns:
+        int: Стоимость запроса.
+    """
+    get_rows = getattr(view, 'get_throttle_rows', None)
+    rows = get_rows(request) if get_rows is not None else 1
+    return min(max(1, math.ceil(rows / settings.THROTTLE_ROWS_PER_TOKEN)), burst)
+
+
+class CostThrottle(BaseThrottle):
+    """
+    Ограничитель по корзине токенов потребителя в Redis.
+
+    Корзина пополняется со скоростью rate токенов в секунду до емкости burst из
+    settings.THROTTLE_BUCKETS для области потребителя. Запрос списывает токены
+    по стоимости get_request_cost, а если их не хватает, отклоняется с заголовком
+    Retry-After, равным времени накопления недостающих токенов. Отклоненный запрос
+    помечается атрибутом throttle_denied, чтобы ConcurrencyThrottle не занимал для него место.
+
+    Атрибуты:
+        wait_seconds (float): Время до накопления недостающих токенов.
+    """
+
+    script = None
+
+    def __init__(self):
+        self.wait_seconds = None
+
+    def allow_request(self, request, view):
+        if is_exempt(request):
+            return True
+
+        scope, consumer = get_consumer(self, request)
+        rate, burst = settings.THROTTLE_BUCKETS[scope]['rate'], settings.THROTTLE_BUCKETS[scope]['burst']
+        cost = get_request_cost(request, view, burst)
+        try:
+            if CostThrottle.script is None:
+                CostThrottle.script = get_redis_connection('default').register_script(TOKEN_BUCKET_SCRIPT)
+            allowed, tokens = CostThrottle.script(keys=[f'{settings.THROTTLE_KEY_PREFIX}:bucket:{consumer}'],
+                                                  args=[rate, burst, cost])
+        except RedisError:
+            logger.warning('Cost throttle is unavailable, request allowed', exc_info=True)
+            THROTTLE_DECISIONS.labels('cost', scope, 'error').inc()
+            return True
+
+        if allowed:
+            THROTTLE_DECISIONS.labels('cost', scope, 'allow').inc()
+            THROTTLE_TOKENS.labels(scope).inc(cost)
+            return True
+        THROTTLE_DECISIONS.labels('cost', scope, 'deny').inc()
+        self.wait_seconds = (cost - float(tokens)) / rate
+        request.throttle_denied = True
+        return False
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class ConcurrencyThrottle(BaseThrottle):
+    """
+    Ограничитель количества одновременно выполняемых запросов потребителя.
+
+    Место запроса хранится в отсортированном множестве Redis со временем получения
+    и освобождается ConcurrencyReleaseMiddleware после обработки запроса любого представления.
+    Места, которые не были освобождены, например из-за остановки процесса, перестают
+    учитываться через settings.THROTTLE_CONCURRENCY_TIMEOUT секунд. Для запроса, уже
+    отклоненного предыдущим ограничителем, место не занимается.
+    """
+
+    script = None
+
+    def allow_request(self, request, view):
+        if is_exempt(request) or getattr(request, 'throttle_denied', False):
+            return True
+
+        scope, consumer = get_consumer(self, request)
+        key = f'{settings.THROTTLE_KEY_PREFIX}:concurrency:{consumer}'
+        token = uuid.uuid4().hex
+        try:
+            if ConcurrencyThrottle.script is None:
+                ConcurrencyThrottle.script = get_redis_connection('default').register_script(
+                    CONCURRENCY_ACQUIRE_SCRIPT)
+            allowed = ConcurrencyThrottle.script(
+                keys=[key],
+                args=[settings.THROTTLE_MAX_CONCURRENT[scope], settings.THROTTLE_CONCURRENCY_TIMEOUT, token],
+            )
+        except RedisError:
+            logger.warning('Concurrency throttle is unavailable, request allowed', exc_info=True)
+            THROTTLE_DECISIONS.labels('concurrency', scope, 'error').inc()
+            return True
+
+        if allowed:
+            THROTTLE_DECISIONS.labels('concurrency', scope, 'allow').inc()
+            request._request.concurrency_slot = (key, token)
+            return True
+        THROTTLE_DECISIONS.labels('concurrency', scope, 'deny').inc()
+        return False
+
+
+def release_concurrency_slot(request):
+    """
+    Освобождает место одновременного запроса, полученное ConcurrencyThrottle.
+
+    Args:
+        request (HttpRequest): Объект запроса Django.
+    """
+    slot = getattr(request, 'concurrency_slot', None)
+    if slot is None:
+        return
+    request.concurrency_slot = None
+    try:
+        get_redis_connection('default').zrem(*slot)
+    except RedisError:
+        logger.warning('Concurrency slot was not released', exc_info=True)
+
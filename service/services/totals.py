@@ -0,0 +1,129 @@
+"""
+Модуль для кэширования общей суммы цен подписок.
+
+Сумма хранится в двух ключах кэша: актуальное значение settings.PRICE_CACHE_NAME, которое
+удаляется при каждом изменении цен, и последнее вычисленное значение, которое не удаляется.
+После удаления актуального значения сумму пересчитывает только один процесс, получивший
+блокировку, а остальные запросы до окончания пересчета получают последнее значение
+с признаком устаревания.
+
+Функции:
+- get_version: Возвращает номер изменения цен.
+- get_total_amount: Возвращает общую сумму цен подписок и признак устаревания.
+- compute_total_amount: Вычисляет общую сумму цен подписок запросом к базе данных.
+- store_total_amount: Вычисляет общую сумму цен подписок и сохраняет ее в кэш.
+- invalidate_total_amount: Удаляет актуальное значение общей суммы цен.
+- release_total_amount_lock: Снимает блокировку пересчета общей суммы цен.
+"""
+
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Sum
+
+MISSING = object()
+
+LAST_KEY = f'{settings.PRICE_CACHE_NAME}:last'
+LOCK_KEY = f'{settings.PRICE_CACHE_NAME}:lock'
+VERSION_KEY = f'{settings.PRICE_CACHE_NAME}:version'
+
+
+def get_version():
+    """
+    Возвращает номер изменения цен, который увеличивается при каждом удалении актуального значения.
+    """
+    return cache.get(VERSION_KEY, 0)
+
+
+def get_total_amount():
+    """
+    Возвращает общую сумму цен подписок и признак устаревания.
+
+    При наличии актуального значения в кэше оно возвращается без запросов к базе данных.
+    Иначе процесс, получивший блокировку, ставит в очередь задачу refresh_total_amount
+    и возвращает последнее вычисленное значение, как и процессы, не получившие блокировку.
+    Если последнего значения еще нет, сумма вычисляется получившим блокировку процессом
+    синхронно, а остальные ждут ее не дольше settings.PRICE_CACHE_LOCK_WAIT секунд.
+
+    Returns:
+        tuple: Общая сумма цен и True, если возвращено последнее вычисленное значение.
+    """
+    total = cache.get(settings.PRICE_CACHE_NAME, MISSING)
+    if total is not MISSING:
+        return total, False
+
+    locked = cache.add(LOCK_KEY, True, settings.PRICE_CACHE_LOCK_TIMEOUT)
+    last_total = cache.get(LAST_KEY, MISSING)
+    if last_total is not MISSING:
+        if locked:
+            from services.tasks import refresh_total_amount
+
+            refresh_total_amount.delay()
+        return last_total, True
+
+    if locked:
+        try:
+            return store_total_amount(), False
+        finally:
+            release_total_amount_lock()
+
+    deadline = time.monotonic() + settings.PRICE_CACHE_LOCK_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        total = cache.get(settings.PRICE_CACHE_NAME, MISSING)
+        if total is not MISSING:
+            return total, False
+    return compute_total_amount(), False
+
+
+def compute_total_amount():
+    """
+    Вычисляет общую сумму цен подписок запросом к базе данных.
+
+    Сумма складывается из цен подписок services_subscription и сумм архивных подписок
+    из ArchivedTotal, поэтому архив не читается.
+    """
+    from services.archive import get_archived_amount
+    from services.models import Subscription
+
+    total = Subscription.objects.aggregate(total=Sum('price')).get('total')
+    archived = get_archived_amount()
+    if archived:
+        total = (total or 0) + archived
+    return total
+
+
+def store_total_amount():
+    """
+    Вычисляет общую сумму цен подписок и сохраняет ее в кэш.
+
+    Последнее вычисленное значение сохраняется всегда. Актуальное значение сохраняется,
+    только если за время вычисления цены не изменялись, иначе следующий запрос
+    запустит новый пересчет.
+
+    Returns:
+        int: Общая сумма цен подписок.
+    """
+    version = get_version()
+    total = compute_total_amount()
+    cache.set(LAST_KEY, total, None)
+    if get_version() == version:
+        cache.set(settings.PRICE_CACHE_NAME, total, settings.PRICE_CACHE_TIMEOUT)
+    return total
+
+
+def invalidate_total_amount():
+    """
+    Удаляет актуальное значение общей суммы цен, сохраняя последнее вычисленное значение.
+    """
+    cache.add(VERSION_KEY, 0, None)
+    cache.incr(VERSION_KEY)
+    cache.delete(settings.PRICE_CACHE_NAME)
+
+
+def release_total_amount_lock():
+    """
+    Снимает блокировку пересчета общей суммы цен.
+    """
+    cache.delete(LOCK_KEY)
@@ -1,39 +1,165 @@
 from django.conf import settings
-from django.core.cache import cache
-from django.db.models import Prefetch, F, Sum
+from django.db.models import Prefetch, F
+from django.http import Http404, HttpResponse
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
 from rest_framework.viewsets import ReadOnlyModelViewSet
 
 from clients.models import Client
-from services.models import Subscription
-from services.serializers import SubscriptionSerializer
+from services.archive import restore_subscriptions
+from services.documents import get_client_document
+from services.models import (Subscription, SubscriptionArchive, SubscriptionTombstone, Plan, RepricingJob,
+                             get_committed_change_seq)
+from services.paginators import ArchivePagination
+from services.throttling import estimate_rows
+from services.serializers import (SubscriptionSerializer, SubscriptionArchiveSerializer, PlanSerializer,
+                                  ClientSerializer, RepricingJobSerializer)
+from services.totals import get_total_amount
 
 
 class SubscriptionView(ReadOnlyModelViewSet):
     """
     Представление только для чтения, отображающее подписки клиентов с предвыборкой связанных данных.
 
+    Поддерживает параметры запроса:
+        fields: Список полей через запятую. Из базы данных читаются только столбцы,
+                нужные для этих полей, а связанные объекты предвыбираются только при необходимости.
+        normalize: Список связей через запятую (plans, clients). Объекты этих связей выводятся
+                   один раз в словарях plans и clients, а строки ссылаются на них по plan_id и client_id.
+
     Атрибуты:
-        queryset (QuerySet): Запрос для выборки всех подписок с предвыборкой связанных планов и клиентов.
+        queryset (QuerySet): Запрос для выборки всех подписок.
         serializer_class (Serializer): Класс сериалайзера для подписок.
+        FIELD_COLUMNS (dict): Столбцы модели Subscription, необходимые для каждого поля ответа.
+        NORMALIZED_RELATIONS (dict): Поля ответа, которые заменяются ссылкой при нормализации связи.
 
     Методы:
+        get_queryset(): Возвращает подписки только с нужными для запрошенных полей столбцами и связями.
         list(request, *args, **kwargs): Переопределенный метод для обработки GET-запросов,
                                         возвращающий список подписок с общей суммой цен.
+        changes(request): Возвращает подписки, измененные и удаленные после переданного курсора.
+        get_throttle_rows(request): Возвращает ожидаемое количество строк ответа для ограничителя запросов.
     """
-    queryset = Subscription.objects.all().prefetch_related(
-        'plan',
-        Prefetch('client',
-                 queryset=Client.objects.all().select_related('user').only('company_name', 'user__email')
-                 )
-    )
+    queryset = Subscription.objects.all()
     serializer_class = SubscriptionSerializer
 
+    FIELD_COLUMNS = {
+        'id': 'id',
+        'plan_id': 'plan',
+        'plan': 'plan',
+        'price': 'price',
+        'last_change_time': 'last_change_time',
+        'client_name': 'client',
+        'email': 'client',
+        'client_id': 'client',
+    }
+    NORMALIZED_RELATIONS = {
+        'plans': (('plan',), 'plan_id'),
+        'clients': (('client_name', 'email'), 'client_id'),
+    }
+
+    def get_normalized_relations(self):
+        """
+        Возвращает связи из параметра normalize.
+
+        Returns:
+            list: Имена нормализуемых связей.
+
+        Raises:
+            ValidationError: Если указана неизвестная связь.
+        """
+        relations = [name for name in self.request.query_params.get('normalize', '').split(',') if name]
+        unknown = [name for name in relations if name not in self.NORMALIZED_RELATIONS]
+        if unknown:
+            raise ValidationError({'normalize': [f'Unknown relation: {name}' for name in unknown]})
+        return relations
+
+    def get_fields(self):
+        """
+        Возвращает поля ответа с учетом параметров fields и normalize.
+
+        Returns:
+            tuple: Список полей ответа и список связей, вынесенных в отдельные словари.
+
+        Raises:
+            ValidationError: Если указано неизвестное поле.
+        """
+        requested = self.request.query_params.get('fields')
+        if requested:
+            fields = [name for name in requested.split(',') if name]
+            unknown = [name for name in fields if name not in self.FIELD_COLUMNS]
+            if unknown:
+                raise ValidationError({'fields': [f'Unknown field: {name}' for name in unknown]})
+        else:
+            fields = list(self.serializer_class.Meta.fields)
+
+        included = []
+        for relation in self.get_normalized_relations():
+            nested_fields, reference_field = self.NORMALIZED_RELATIONS[relation]
+            if not set(nested_fields) & set(fields):
+                continue
+            fields = [name for name in fields if name not in nested_fields]
+            if reference_field not in fields:
+                fields.append(reference_field)
+            included.append(relation)
+        return fields, included
+
+    def get_queryset(self):
+        """
+        Возвращает подписки, из которых читаются только столбцы и связи, нужные для запрошенных полей.
+
+        Returns:
+            QuerySet: Запрос для выборки подписок.
+        """
+        fields, _ = self.get_fields()
+        queryset = super().get_queryset().only('id', *{self.FIELD_COLUMNS[name] for name in fields})
+        if 'plan' in fields:
+            queryset = queryset.prefetch_related('plan')
+        if 'client_name' in fields or 'email' in fields:
+            queryset = queryset.prefetch_related(
+                Prefetch('client',
+                         queryset=Client.objects.all().select_related('user').only('company_name', 'user__email')
+                         )
+            )
+        return queryset
+
+    def get_serializer(self, *args, **kwargs):
+        if self.request is not None:
+            kwargs.setdefault('fields', self.get_fields()[0])
+        return super().get_serializer(*args, **kwargs)
+
+    def get_included(self, subscriptions, relations):
+        """
+        Возвращает словари нормализованных связей, в которых каждый объект выводится один раз.
+
+        Args:
+            subscriptions (list): Подписки текущего ответа.
+            relations (list): Нормализуемые связи.
+
+        Returns:
+            dict: Словари планов и клиентов по их идентификаторам.
+        """
+        included = {}
+        if 'plans' in relations:
+            plans = Plan.objects.filter(id__in={subscription.plan_id for subscription in subscriptions})
+            included['plans'] = {plan['id']: plan for plan in PlanSerializer(plans, many=True).data}
+        if 'clients' in relations:
+            clients = Client.objects.filter(
+                id__in={subscription.client_id for subscription in subscriptions}
+            ).select_related('user').only('company_name', 'user__email')
+            included['clients'] = {client['id']: client for client in ClientSerializer(clients, many=True).data}
+        return included
+
     def list(self, request, *args, **kwargs):
         """
         Обрабатывает GET-запросы, возвращая список подписок с общей суммой цен.
 
-        Если общая сумма цен подписок есть в кэше, она используется. Иначе
-        она вычисляется и сохраняется в кэш на час.
+        Общая сумма цен берется из кэша. Пока она пересчитывается после изменения цен,
+        возвращается последнее вычисленное значение, а total_amount_stale равен True.
+        При нормализации ответ дополнительно содержит словари plans и clients.
 
         Args:
             request (Request): Объект запроса.
@@ -44,20 +170,200 @@ class SubscriptionView(ReadOnlyModelViewSet):
             Response: Ответ с данными подписок и общей суммой цен.
         """
         queryset = self.filter_queryset(self.get_queryset())
-        response = super().list(request, *args, **kwargs)
-
-        price_cache = cache.get(settings.PRICE_CACHE_NAME)
+        _, relations = self.get_fields()
 
-        if price_cache:
-            total_price = price_cache
+        page = self.paginate_queryset(queryset)
+        subscriptions = page if page is not None else list(queryset)
+        serializer = self.get_serializer(subscriptions, many=True)
+        if page is not None:
+            response = self.get_paginated_response(serializer.data)
         else:
-            total_price = queryset.aggregate(total=Sum('price')).get('total')
-            cache.set(settings.PRICE_CACHE_NAME, total_price, 60 * 60)
+            response = Response(serializer.data)
+
+        total_price, stale = get_total_amount()
 
         response_data = {
             'result': response.data,
-            'total_amount': total_price
+            'total_amount': total_price,
+            'total_amount_stale': stale,
         }
+        response_data.update(self.get_included(subscriptions, relations))
         response.data = response_data
 
         return response
+
+    def get_throttle_rows(self, request):
+        """
+        Возвращает ожидаемое количество строк ответа для CostThrottle.
+
+        Список без пагинации возвращает все подписки, поэтому его стоимость равна оценке
+        количества строк таблицы, а стоимость ленты изменений - запрошенному лимиту.
+        """
+        if self.action == 'list':
+            return estimate_rows(Subscription)
+        if self.action == 'changes':
+            try:
+                limit = int(request.query_params.get('limit', settings.CHANGES_PAGE_SIZE))
+            except ValueError:
+                limit = settings.CHANGES_PAGE_SIZE
+            return min(max(limit, 1), settings.CHANGES_MAX_PAGE_SIZE)
+        return 1
+
+    def get_int_param(self, name, default):
+        """
+        Возвращает неотрицательное целое значение параметра запроса.
+
+        Raises:
+            ValidationError: Если значение параметра не является неотрицательным целым числом.
+        """
+        value = self.request.query_params.get(name, default)
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            raise ValidationError({name: ['A non-negative integer is required.']})
+        if value < 0:
+            raise ValidationError({name: ['A non-negative integer is required.']})
+        return value
+
+    @action(detail=False)
+    def changes(self, request):
+        """
+        Возвращает подписки, измененные после курсора, и идентификаторы удаленных подписок.
+
+        Изменения упорядочены по номеру изменения change_seq, поэтому стоимость запроса
+        пропорциональна количеству изменений, а не размеру таблицы. Для продолжения
+        синхронизации следующий запрос передает значение cursor из ответа. Возвращаются
+        только номера ниже get_committed_change_seq(): изменения транзакций, начатых до
+        самой старой незавершенной, поэтому позже зафиксированные изменения не окажутся
+        ниже курсора. Незавершенная транзакция задерживает ленту до своего завершения.
+
+        Параметры запроса:
+            cursor: Номер последнего полученного изменения, по умолчанию 0.
+            limit: Максимальное количество изменений в ответе.
+
+        Returns:
+            Response: Ответ с измененными подписками, удаленными подписками, новым курсором и признаком has_more.
+        """
+        cursor = self.get_int_param('cursor', 0)
+        limit = min(max(self.get_int_param('limit', settings.CHANGES_PAGE_SIZE), 1), settings.CHANGES_MAX_PAGE_SIZE)
+
+        committed = get_committed_change_seq()
+        subscriptions = list(
+            self.get_queryset().filter(change_seq__gt=cursor, change_seq__lt=committed)
+            .annotate(seq=F('change_seq')).order_by('change_seq')[:limit + 1]
+        )
+        tombstones = list(
+            SubscriptionTombstone.objects.filter(change_seq__gt=cursor, change_seq__lt=committed).order_by('change_seq')
+            .values_list('change_seq', 'subscription_id')[:limit + 1]
+        )
+        events = sorted([(subscription.seq, subscription) for subscription in subscriptions] + tombstones,
+                        key=lambda event: event[0])
+        page = events[:limit]
+
+        changed = [event for seq, event in page if isinstance(event, Subscription)]
+        deleted = [event for seq, event in page if not isinstance(event, Subscription)]
+        return Response({
+            'changes': self.get_serializer(changed, many=True).data,
+            'deleted': deleted,
+            'cursor': page[-1][0] if page else cursor,
+            'has_more': len(events) > limit,
+        })
+
+
+class RepricingJobView(ReadOnlyModelViewSet):
+    """
+    Представление только для чтения, отображающее ход выполнения заданий на пересчет цен.
+
+    Атрибуты:
+        queryset (QuerySet): Запрос для выборки заданий с предвыборкой услуг и планов.
+        serializer_class (Serializer): Класс сериалайзера для заданий.
+    """
+    queryset = RepricingJob.objects.all().prefetch_related('services', 'plans').order_by('-id')
+    serializer_class = RepricingJobSerializer
+
+
+class SubscriptionArchiveView(ReadOnlyModelViewSet):
+    """
+    Представление только для чтения, отображающее архивные подписки.
+
+    Архивные подписки не входят в список SubscriptionView и доступны только через это
+    представление. Страницы выбираются по курсору.
+
+    Поддерживает параметры запроса:
+        client: Идентификатор клиента.
+        service: Идентификатор услуги.
+
+    Атрибуты:
+        queryset (QuerySet): Запрос для выборки архивных подписок.
+        serializer_class (Serializer): Класс сериалайзера для архивных подписок.
+        pagination_class (Pagination): Пагинация по курсору.
+        FILTER_PARAMS (tuple): Параметры запроса, по которым фильтруются подписки.
+
+    Методы:
+        get_queryset(): Возвращает архивные подписки с фильтрами из параметров запроса.
+        restore(request, pk): Возвращает подписку из архива.
+        get_throttle_rows(request): Возвращает ожидаемое количество строк ответа для ограничителя запросов.
+    """
+    queryset = SubscriptionArchive.objects.all()
+    serializer_class = SubscriptionArchiveSerializer
+    pagination_class = ArchivePagination
+
+    FILTER_PARAMS = ('client', 'service')
+
+    def get_queryset(self):
+        """
+        Возвращает архивные подписки, отфильтрованные по параметрам client и service.
+
+        Raises:
+            ValidationError: Если значение параметра не является целым числом.
+        """
+        queryset = super().get_queryset()
+        for name in self.FILTER_PARAMS:
+            value = self.request.query_params.get(name)
+            if value is None:
+                continue
+            if not value.isdigit():
+                raise ValidationError({name: ['An integer is required.']})
+            queryset = queryset.filter(**{f'{name}_id': int(value)})
+        return queryset
+
+    def get_throttle_rows(self, request):
+        """
+        Возвращает ожидаемое количество строк ответа для CostThrottle: размер страницы для списка.
+        """
+        return self.pagination_class.page_size if self.action == 'list' else 1
+
+    @action(detail=True, methods=['post'], permission_classes=[IsAdminUser])
+    def restore(self, request, pk=None):
+        """
+        Возвращает подписку из архива и пересчитывает ее цену. Доступно только сотрудникам.
+
+        Returns:
+            Response: Ответ с количеством восстановленных подписок.
+        """
+        subscription = self.get_object()
+        return Response({'restored': restore_subscriptions([subscription.pk])})
+
+
+class ClientSubscriptionsView(APIView):
+    """
+    Представление, отдающее готовый документ с подписками клиента.
+
+    Документ читается одной строкой ClientSubscriptionsDocument по идентификатору клиента
+    и отдается без сериализации. Если документ еще не построен, он строится при первом запросе.
+
+    Методы:
+        get(request, pk): Возвращает JSON-документ с подписками клиента.
+    """
+
+    def get(self, request, pk):
+        """
+        Возвращает JSON-документ с данными клиента, подписками, планами, ценами и суммой цен.
+
+        Raises:
+            Http404: Если клиента не существует.
+        """
+        content = get_client_document(pk)
+        if content is None:
+            raise Http404
+        return HttpResponse(content, content_type='application/json')
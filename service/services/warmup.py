@@ -0,0 +1,136 @@
+"""
+Модуль для прогрева кэшей при запуске веб-процессов и воркеров.
+
+После развертывания кэш общей суммы цен и кэш запросов cachalot пусты, и первые
+запросы выполняются к базе данных одновременно. Прогрев заранее вычисляет общую
+сумму цен, загружает услуги и планы и выполняет первые страницы списков через
+WSGI-приложение, поэтому процесс начинает принимать запросы с заполненными кэшами,
+построенным резолвером URL и импортированными модулями представлений.
+
+Функции:
+- request_path: Выполняет GET-запрос к WSGI-приложению без сетевого соединения.
+- warm_up: Прогревает кэши и возвращает время каждого шага.
+- warm_up_on_startup: Прогревает кэши при запуске процесса, не прерывая запуск при ошибке.
+"""
+
+import logging
+import time
+from wsgiref.util import setup_testing_defaults
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .totals import MISSING, store_total_amount
+
+logger = logging.getLogger(__name__)
+
+# Ключ окружения WSGI, которым помечаются запросы прогрева. Заголовки HTTP попадают
+# в окружение с префиксом HTTP_, поэтому клиент не может передать этот ключ.
+WARMUP_ENVIRON_KEY = 'services.warmup'
+
+
+def request_path(application, path):
+    """
+    Выполняет GET-запрос к WSGI-приложению без сетевого соединения.
+
+    Запрос проходит через все промежуточные слои, как запрос клиента, но помечается
+    ключом окружения WARMUP_ENVIRON_KEY, и ограничители запросов его не учитывают: иначе
+    у запросов прогрева всех процессов был бы общий потребитель без IP-адреса, и после
+    первого процесса его корзина токенов была бы пуста.
+
+    Args:
+        application: WSGI-приложение.
+        path (str): Путь запроса с необязательной строкой параметров.
+
+    Returns:
+        int: Код статуса ответа.
+    """
+    path, _, query_string = path.partition('?')
+    environ = {
+        'PATH_INFO': path,
+        'QUERY_STRING': query_string,
+        'HTTP_HOST': settings.WARMUP_HOST,
+        WARMUP_ENVIRON_KEY: True,
+    }
+    setup_testing_defaults(environ)
+    statuses = []
+    response = application(environ, lambda status, headers, exc_info=None: statuses.append(status))
+    try:
+        for _ in response:
+            pass
+    finally:
+        if hasattr(response, 'close'):
+            response.close()
+    return int(statuses[0].split()[0])
+
+
+def warm_up(application=None, paths=(), setup_ms=None):
+    """
+    Прогревает кэши и возвращает время каждого шага в миллисекундах.
+
+    Шаги: totals - вычисление общей суммы цен, если ее нет в кэше; lookups - загрузка
+    услуг и планов в кэш cachalot; pages - запросы paths к application. Если после
+    прогрева процесс порождает дочерние процессы, вызывающий код должен закрыть
+    соединения с базой данных, чтобы они не были унаследованы.
+
+    Args:
+        application: WSGI-приложение для запросов первых страниц.
+        paths (Iterable[str]): Пути первых страниц списков.
+        setup_ms (float): Время загрузки приложения для отчета.
+
+    Returns:
+        dict: Время каждого шага и общее время прогрева.
+    """
+    from services.models import Plan, Service
+
+    timings = {} if setup_ms is None else {'setup': setup_ms}
+    started = step_started = time.perf_counter()
+
+    if cache.get(settings.PRICE_CACHE_NAME, MISSING) is MISSING:
+        store_total_amount()
+    timings['totals'] = (time.perf_counter() - step_started) * 1000
+
+    step_started = time.perf_counter()
+    list(Service.objects.all())
+    list(Plan.objects.all())
+    timings['lookups'] = (time.perf_counter() - step_started) * 1000
+
+    if application is not None:
+        step_started = time.perf_counter()
+        for path in paths:
+            status = request_path(application, path)
+            if status >= 400:
+                logger.warning('Warm-up request %s returned %s', path, status)
+        timings['pages'] = (time.perf_counter() - step_started) * 1000
+
+    timings['warmup'] = (time.perf_counter() - started) * 1000
+    logger.info('Warm-up finished: %s', ', '.join(f'{name}={value:.0f} ms' for name, value in timings.items()))
+    return timings
+
+
+def warm_up_on_startup(application=None, paths=(), setup_ms=None):
+    """
+    Прогревает кэши при запуске веб-процесса или воркера и закрывает соединения с базой данных.
+
+    Прогрев только ускоряет первые запросы, поэтому ошибка, например кратковременная
+    недоступность PostgreSQL или Redis во время развертывания, записывается в лог,
+    а процесс запускается с пустыми кэшами. Соединения закрываются, чтобы дочерние
+    процессы их не унаследовали.
+
+    Args:
+        application: WSGI-приложение для запросов первых страниц.
+        paths (Iterable[str]): Пути первых страниц списков.
+        setup_ms (float): Время загрузки приложения для отчета.
+
+    Returns:
+        dict: Время шагов прогрева или None, если прогрев не удался.
+    """
+    from django.db import connections
+
+    try:
+        return warm_up(application, paths, setup_ms)
+    except Exception:
+        logger.exception('Warm-up failed, starting with cold caches')
+        return None
+    finally:
+        connections.close_all()
@@ -0,0 +1,25 @@
+"""
+Модуль с тестовым раннером проекта.
+
+Классы:
+- QueryBudgetTestRunner: Тестовый раннер, проверяющий бюджет SQL-запросов каждого HTTP-запроса.
+"""
+
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+
+
+class QueryBudgetTestRunner(DiscoverRunner):
+    """
+    Тестовый раннер, который проверяет бюджет SQL-запросов каждого HTTP-запроса
+    и завершает тест ошибкой QueryBudgetExceeded при его превышении. Проверяются количество
+    запросов и повторяющиеся запросы, время запросов зависит от скорости машины и не проверяется.
+    Ограничители запросов отключаются и включаются только в тестах ограничителей.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        settings.QUERY_BUDGET_MODE = 'raise'
+        settings.QUERY_BUDGET_SAMPLE_RATE = 1.0
+        settings.QUERY_BUDGET_CHECK_TIME = False
+        settings.THROTTLE_ENABLED = False
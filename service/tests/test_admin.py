@@ -0,0 +1,97 @@
+"""
+Модуль с тестами административного интерфейса приложения services.
+
+Тесты:
+- AdminTestCase: Проверяет число запросов списка подписок, оценку количества строк пагинатором
+  и секционированной таблицы, массовый пересчет цен одним заданием и постановку в очередь
+  задания из формы добавления.
+"""
+
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from clients.models import Client
+from services.models import Service, Plan, Subscription, RepricingJob
+from services.paginators import EstimatedCountPaginator, estimate_count
+
+
+class AdminTestCase(TestCase):
+    """
+    Тесты для административного интерфейса подписок, услуг и планов.
+    """
+
+    def setUp(self):
+        """
+        Подготовка данных для тестирования.
+        """
+        self.admin = User.objects.create_superuser('admin', 'admin@example.com', 'admin')
+        self.services = [Service.objects.create(name=f'Service {i}', full_price=100) for i in range(2)]
+        self.plan = Plan.objects.create(plan_type='full', discount_percent=10)
+        for i in range(10):
+            user = User.objects.create_user(username=f'user{i}', email=f'user{i}@example.com', password='password123')
+            client = Client.objects.create(user=user, company_name=f'Company {i}')
+            Subscription.objects.create(client=client, service=self.services[i % 2], plan=self.plan)
+        self.client.force_login(self.admin)
+
+    def test_subscription_changelist_queries_do_not_grow_with_rows(self):
+        """
+        Тестирование того, что список подписок не выполняет запрос на каждую строку.
+        """
+        with self.assertNumQueries(6):
+            response = self.client.get('/admin/services/subscription/')
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(ADMIN_ESTIMATED_COUNT_THRESHOLD=0)
+    def test_paginator_uses_estimate_for_unfiltered_queryset(self):
+        """
+        Тестирование оценки количества строк без фильтров и точного подсчета с фильтрами.
+        """
+        with patch('django.core.paginator.Paginator.count', new_callable=lambda: property(lambda self: -1)):
+            unfiltered = EstimatedCountPaginator(Subscription.objects.order_by('id'), 100)
+            filtered = EstimatedCountPaginator(Subscription.objects.filter(plan=self.plan).order_by('id'), 100)
+            self.assertGreaterEqual(unfiltered.count, 0)
+            self.assertEqual(filtered.count, -1)
+
+    def test_estimate_count_of_partitioned_table(self):
+        """
+        Тестирование того, что строки секционированной таблицы подписок не учитываются дважды.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE services_subscription')
+
+        self.assertEqual(estimate_count(Subscription), 10)
+
+    def test_reprice_action_schedules_single_job(self):
+        """
+        Тестирование того, что действие пересчета создает одно задание для всех выбранных услуг.
+        """
+        with patch('services.tasks.run_repricing_job.delay') as mock_run_repricing_job_delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post('/admin/services/service/', {
+                    'action': 'reprice_selected',
+                    '_selected_action': [service.id for service in self.services],
+                })
+
+        self.assertEqual(response.status_code, 302)
+        job = RepricingJob.objects.get()
+        self.assertEqual(set(job.services.all()), set(self.services))
+        mock_run_repricing_job_delay.assert_called_once_with(job.id)
+
+    def test_job_added_in_admin_is_scheduled(self):
+        """
+        Тестирование постановки в очередь задания, созданного в форме добавления.
+        """
+        with patch('services.tasks.run_repricing_job.delay') as mock_run_repricing_job_delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post('/admin/services/repricingjob/add/', {
+                    'services': [self.services[0].id],
+                    'chunk_size': 1000,
+                })
+
+        self.assertEqual(response.status_code, 302)
+        job = RepricingJob.objects.get()
+        self.assertEqual(list(job.services.all()), [self.services[0]])
+        mock_run_repricing_job_delay.assert_called_once_with(job.id)
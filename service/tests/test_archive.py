@@ -0,0 +1,132 @@
+"""
+Модуль с тестами архивации подписок.
+
+Тесты:
+- ArchiveColdSubscriptionsTestCase: Тесты для задачи archive_cold_subscriptions, проверяющие перенос
+  старых подписок в архив, сохранение общей суммы цен и записи об удалении для ленты изменений.
+- SubscriptionArchiveViewTestCase: Тесты для эндпоинта архивных подписок и восстановления подписки.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from clients.models import Client
+from services.models import Service, Plan, Subscription, SubscriptionArchive, SubscriptionTombstone, ArchivedTotal
+from services.tasks import archive_cold_subscriptions
+from services.totals import LAST_KEY, LOCK_KEY, VERSION_KEY, compute_total_amount
+
+
+class ArchiveTestMixin:
+    """
+    Общие данные для тестов архивации: две старые подписки и одна недавно измененная.
+    """
+
+    def setUp(self):
+        """
+        Подготовка данных для тестирования.
+        """
+        cache.delete_many([settings.PRICE_CACHE_NAME, LAST_KEY, LOCK_KEY, VERSION_KEY])
+        self.user = User.objects.create_user(username='testuser', email='testuser@example.com', password='password123')
+        self.client_obj = Client.objects.create(user=self.user, company_name='Test Company')
+        self.service = Service.objects.create(name='Test Service', full_price=100)
+        self.other_service = Service.objects.create(name='Other Service', full_price=300)
+        self.plan = Plan.objects.create(plan_type='full', discount_percent=10)
+        old = timezone.now() - timedelta(days=settings.ARCHIVE_AFTER_DAYS + 1)
+        self.old_subscriptions = [
+            Subscription.objects.create(client=self.client_obj, service=service, plan=self.plan,
+                                        price=price, last_change_time=old)
+            for service, price in ((self.service, 90), (self.other_service, 270))
+        ]
+        self.recent = Subscription.objects.create(client=self.client_obj, service=self.service, plan=self.plan,
+                                                  price=90)
+
+
+class ArchiveColdSubscriptionsTestCase(ArchiveTestMixin, TestCase):
+    """
+    Тесты для задачи archive_cold_subscriptions.
+    """
+
+    def test_moves_old_subscriptions_to_archive(self):
+        """
+        Тестирование переноса старых подписок в архив с сохранением общей суммы цен.
+        """
+        total = compute_total_amount()
+
+        archived = archive_cold_subscriptions(chunk_size=1, interval=0)
+
+        self.assertEqual(archived, 2)
+        self.assertEqual(list(Subscription.objects.values_list('id', flat=True)), [self.recent.id])
+        self.assertEqual(set(SubscriptionArchive.objects.values_list('id', 'price')),
+                         {(subscription.id, subscription.price) for subscription in self.old_subscriptions})
+        self.assertEqual(set(ArchivedTotal.objects.values_list('service_id', 'subscription_count', 'amount')),
+                         {(self.service.id, 1, 90), (self.other_service.id, 1, 270)})
+        self.assertEqual(compute_total_amount(), total)
+        self.assertEqual(set(SubscriptionTombstone.objects.values_list('subscription_id', flat=True)),
+                         {subscription.id for subscription in self.old_subscriptions})
+
+    def test_criteria_limit_archived_subscriptions(self):
+        """
+        Тестирование архивации только подписок выбранных услуг.
+        """
+        archived = archive_cold_subscriptions(services=[self.other_service.id], interval=0)
+
+        self.assertEqual(archived, 1)
+        self.assertEqual(list(SubscriptionArchive.objects.values_list('id', flat=True)),
+                         [self.old_subscriptions[1].id])
+        self.assertEqual(archive_cold_subscriptions(after_days=settings.ARCHIVE_AFTER_DAYS + 2, interval=0), 0)
+
+
+class SubscriptionArchiveViewTestCase(ArchiveTestMixin, TestCase):
+    """
+    Тесты для эндпоинта архивных подписок.
+    """
+
+    def setUp(self):
+        """
+        Подготовка данных и архивация старых подписок.
+        """
+        super().setUp()
+        archive_cold_subscriptions(interval=0)
+        self.api_client = APIClient()
+
+    def test_list_returns_only_archived_subscriptions(self):
+        """
+        Тестирование того, что архивные подписки доступны только через отдельный эндпоинт.
+        """
+        response = self.api_client.get('/api/archived-subscriptions/', {'service': self.service.id})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['id'] for row in response.data['results']], [self.old_subscriptions[0].id])
+        self.assertEqual(response.data['results'][0]['client'], self.client_obj.id)
+
+        response = self.api_client.get('/api/subscriptions/')
+        self.assertEqual([row['id'] for row in response.data['result']], [self.recent.id])
+        self.assertEqual(response.data['total_amount'], 450)
+
+    def test_restore_requires_staff_and_reprices_subscription(self):
+        """
+        Тестирование восстановления подписки сотрудником с пересчетом цены по текущей услуге.
+        """
+        subscription = self.old_subscriptions[0]
+        Service.objects.filter(id=self.service.id).update(full_price=200)
+        url = f'/api/archived-subscriptions/{subscription.id}/restore/'
+
+        self.api_client.force_authenticate(self.user)
+        self.assertEqual(self.api_client.post(url).status_code, 403)
+
+        self.api_client.force_authenticate(User.objects.create_superuser('admin', 'admin@example.com', 'admin'))
+        response = self.api_client.post(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {'restored': 1})
+        self.assertFalse(SubscriptionArchive.objects.filter(id=subscription.id).exists())
+        restored = Subscription.objects.get(id=subscription.id)
+        self.assertEqual(restored.price, 180)
+        self.assertEqual(ArchivedTotal.objects.get(service=self.service).amount, 0)
+        self.assertEqual(compute_total_amount(), 270 + 90 + 180)
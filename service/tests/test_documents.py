@@ -0,0 +1,147 @@
+"""
+Модуль с тестами документов с подписками клиентов.
+
+Тесты:
+- ClientSubscriptionsDocumentTestCase: Тесты для построения документа, эндпоинта клиента
+  и перестроения документа при изменении цен, создании, изменении и удалении подписок,
+  изменении плана, клиента и email пользователя.
+"""
+
+import json
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from clients.models import Client
+from services.models import Service, Plan, Subscription, ClientSubscriptionsDocument
+from services.tasks import refresh_client_documents, update_prices
+
+
+class ClientSubscriptionsDocumentTestCase(TestCase):
+    """
+    Тесты для документа с подписками клиента.
+    """
+
+    def setUp(self):
+        """
+        Подготовка данных для тестирования.
+        """
+        self.user = User.objects.create_user(username='testuser', email='testuser@example.com', password='password123')
+        self.client_obj = Client.objects.create(user=self.user, company_name='Test Company')
+        self.service = Service.objects.create(name='Test Service', full_price=100)
+        self.plan = Plan.objects.create(plan_type='student', discount_percent=10)
+        self.subscriptions = [
+            Subscription.objects.create(client=self.client_obj, service=self.service, plan=self.plan, price=price)
+            for price in (90, 50)
+        ]
+        self.url = f'/api/clients/{self.client_obj.id}/subscriptions/'
+
+    def test_endpoint_returns_document(self):
+        """
+        Тестирование построения документа при первом запросе и чтения готового документа при следующих.
+        """
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        document = json.loads(response.content)
+        self.assertEqual(document['client'],
+                         {'id': self.client_obj.id, 'client_name': 'Test Company', 'email': 'testuser@example.com'})
+        self.assertEqual(document['subtotal'], 140)
+        self.assertEqual([row['id'] for row in document['subscriptions']],
+                         [subscription.id for subscription in self.subscriptions])
+        self.assertEqual(document['subscriptions'][0]['plan'],
+                         {'id': self.plan.id, 'plan_type': 'student', 'discount_percent': 10})
+
+        with patch('services.documents.rebuild_client_documents') as mock_rebuild:
+            self.assertEqual(json.loads(self.client.get(self.url).content), document)
+        mock_rebuild.assert_not_called()
+
+    def test_unknown_client_returns_404(self):
+        """
+        Тестирование ответа 404 для несуществующего клиента.
+        """
+        response = self.client.get(f'/api/clients/{self.client_obj.id + 1}/subscriptions/')
+
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(ClientSubscriptionsDocument.objects.exists())
+
+    def test_price_changes_rebuild_document(self):
+        """
+        Тестирование постановки перестроения документа после пересчета цен и его выполнения пакетом.
+        """
+        self.client.get(self.url)
+
+        with patch('services.tasks.refresh_client_documents.delay') as mock_delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                update_prices([subscription.id for subscription in self.subscriptions])
+        mock_delay.assert_called_once_with([self.client_obj.id])
+
+        refresh_client_documents([SimpleNamespace(args=[[self.client_obj.id]]),
+                                  SimpleNamespace(args=[[self.client_obj.id]])])
+
+        document = ClientSubscriptionsDocument.objects.get(client=self.client_obj)
+        self.assertEqual(document.subtotal, 180)
+        self.assertEqual([row['price'] for row in json.loads(document.content)['subscriptions']], [90, 90])
+
+    def test_create_and_delete_schedule_rebuild(self):
+        """
+        Тестирование постановки перестроения документа клиента при создании и удалении подписки.
+        """
+        with patch('services.tasks.refresh_client_documents.delay') as mock_delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                subscription = Subscription.objects.create(client=self.client_obj, service=self.service,
+                                                           plan=self.plan, price=90)
+            with self.captureOnCommitCallbacks(execute=True):
+                subscription.delete()
+
+        self.assertEqual(mock_delay.call_count, 2)
+        mock_delay.assert_called_with([self.client_obj.id])
+
+    def test_moved_subscription_rebuilds_both_clients(self):
+        """
+        Тестирование перестроения документов прежнего и нового клиента при переносе подписки.
+        """
+        other_user = User.objects.create_user(username='otheruser', email='other@example.com', password='password123')
+        other_client = Client.objects.create(user=other_user, company_name='Other Company')
+        subscription = Subscription.objects.get(id=self.subscriptions[0].id)
+
+        with patch('services.tasks.refresh_client_documents.delay') as mock_delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                subscription.client = other_client
+                subscription.save()
+            with self.captureOnCommitCallbacks(execute=True):
+                subscription.save()
+
+        self.assertEqual(mock_delay.call_args_list[0].args, (sorted([self.client_obj.id, other_client.id]),))
+        self.assertEqual(mock_delay.call_args_list[1].args, ([other_client.id],))
+
+    def test_plan_client_and_email_changes_rebuild_document(self):
+        """
+        Тестирование перестроения документа при смене типа плана, названия клиента и email пользователя.
+        """
+        plan = Plan.objects.get(id=self.plan.id)
+        client = Client.objects.get(id=self.client_obj.id)
+        user = User.objects.get(id=self.user.id)
+
+        with patch('services.tasks.refresh_client_documents.delay') as mock_delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                plan.save()
+                user.save(update_fields=['last_login'])
+            mock_delay.assert_not_called()
+
+            for instance, field, value in ((plan, 'plan_type', 'full'), (client, 'company_name', 'Renamed'),
+                                           (user, 'email', 'renamed@example.com')):
+                with self.subTest(field=field), self.captureOnCommitCallbacks(execute=True):
+                    setattr(instance, field, value)
+                    instance.save()
+                mock_delay.assert_called_with([self.client_obj.id])
+
+        self.assertEqual(mock_delay.call_count, 3)
+        refresh_client_documents([SimpleNamespace(args=[[self.client_obj.id]])])
+        document = json.loads(ClientSubscriptionsDocument.objects.get(client=self.client_obj).content)
+        self.assertEqual(document['client']['client_name'], 'Renamed')
+        self.assertEqual(document['client']['email'], 'renamed@example.com')
+        self.assertEqual(document['subscriptions'][0]['plan']['plan_type'], 'full')
@@ -4,9 +4,13 @@
 Этот модуль содержит юнит-тесты для моделей Service, Plan и Subscription.
 
 Тесты:
-- ServiceModelTestCase: Тесты для модели Service, проверяющие поведение метода save().
-- PlanModelTestCase: Тесты для модели Plan, проверяющие поведение метода save() и валидацию максимальной скидки.
+- ServiceModelTestCase: Тесты для модели Service, проверяющие запуск задания на пересчет цен в методе save()
+  и отслеживание изменения цены без запросов для отложенных полей.
+- PlanModelTestCase: Тесты для модели Plan, проверяющие запуск задания на пересчет цен в методе save()
+  и валидацию максимальной скидки.
 - SubscriptionModelTestCase: Тесты для модели Subscription, проверяющие поведение метода save().
+- RepricingQuerySetTestCase: Тесты для массовых update() и bulk_update() услуг и планов,
+  проверяющие запуск одного задания на пересчет цен.
 
 """
 
@@ -15,7 +19,8 @@ from django.test import TestCase
 from unittest.mock import patch
 from django.core.exceptions import ValidationError
 from clients.models import Client
-from services.models import Service, Plan, Subscription
+from services.models import Service, Plan, Subscription, RepricingJob
+from services.tasks import run_repricing_job
 
 
 class ServiceModelTestCase(TestCase):
@@ -37,39 +42,77 @@ class ServiceModelTestCase(TestCase):
         """
         Тестирование метода save() модели Service с обновлением цены.
         """
-        with patch('services.tasks.set_price.delay') as mock_set_price_delay:
-            self.service.full_price = 150
-            self.service.save()
-            for subscription in self.service.subscriptions.all():
-                mock_set_price_delay.assert_called_once_with(subscription.id)
+        with patch('services.tasks.run_repricing_job.delay') as mock_run_repricing_job_delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.service.full_price = 150
+                self.service.save()
+            job = RepricingJob.objects.get()
+            self.assertEqual(list(job.services.all()), [self.service])
+            mock_run_repricing_job_delay.assert_called_once_with(job.id)
+
+    def test_deferred_instances_do_not_query_tracked_fields(self):
+        """
+        Тестирование того, что перебор 10k услуг без загруженной цены выполняет один запрос.
+        """
+        Service.objects.bulk_create([Service(name=f'Service {i}', full_price=100) for i in range(10000)])
+
+        with self.assertNumQueries(1):
+            services = list(Service.objects.only('id', 'name'))
+            self.assertFalse(any(service.get_changed_fields() for service in services))
+        self.assertEqual(len(services), 10001)
+
+    def test_deferred_service_save_tracks_price(self):
+        """
+        Тестирование запуска задания при присвоении цены отложенному полю и его отсутствия при изменении названия.
+        """
+        with patch('services.tasks.run_repricing_job.delay') as mock_run_repricing_job_delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                service = Service.objects.only('id', 'name').get(id=self.service.id)
+                service.name = 'Updated Service Name'
+                service.save()
+            mock_run_repricing_job_delay.assert_not_called()
+
+            with self.captureOnCommitCallbacks(execute=True):
+                service.full_price = 150
+                service.save()
+            self.assertEqual(list(RepricingJob.objects.get().services.all()), [self.service])
+            self.assertFalse(service.has_changed('full_price'))
 
     def test_service_save_method_without_price_update_task(self):
         """
         Тестирование метода save() модели Service без обновления цены.
         """
-        with patch('services.tasks.set_price.delay') as mock_set_price_delay:
-            self.service.name = 'Updated Service Name'
-            self.service.save()
-            mock_set_price_delay.assert_not_called()
+        with patch('services.tasks.run_repricing_job.delay') as mock_run_repricing_job_delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.service.name = 'Updated Service Name'
+                self.service.save()
+            mock_run_repricing_job_delay.assert_not_called()
+            self.assertFalse(RepricingJob.objects.exists())
 
     def test_service_save_method_with_last_change_time_task(self):
         """
-        Тестирование метода save() модели Service с обновлением времени последнего изменения.
+        Тестирование метода save() модели Service с обновлением цены и времени последнего изменения.
         """
-        with patch('services.tasks.set_last_change_time.delay') as mock_set_last_change_time_delay:
-            self.service.full_price = 150
-            self.service.save()
-            for subscription in self.service.subscriptions.all():
-                mock_set_last_change_time_delay.assert_called_once_with(subscription.id)
+        last_change_time = self.subscription.last_change_time
+        with patch('services.tasks.run_repricing_job.delay', side_effect=run_repricing_job):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.service.full_price = 150
+                self.service.save()
+        self.subscription.refresh_from_db()
+        self.assertEqual(self.subscription.price, 135)
+        self.assertGreater(self.subscription.last_change_time, last_change_time)
 
     def test_service_save_method_without_last_change_time_task(self):
         """
         Тестирование метода save() модели Service без обновления времени последнего изменения.
         """
-        with patch('services.tasks.set_last_change_time.delay') as mock_set_last_change_time_delay:
-            self.service.name = 'Updated Service Name'
-            self.service.save()
-            mock_set_last_change_time_delay.assert_not_called()
+        last_change_time = self.subscription.last_change_time
+        with patch('services.tasks.run_repricing_job.delay', side_effect=run_repricing_job):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.service.name = 'Updated Service Name'
+                self.service.save()
+        self.subscription.refresh_from_db()
+        self.assertEqual(self.subscription.last_change_time, last_change_time)
 
 
 class PlanModelTestCase(TestCase):
@@ -91,39 +134,49 @@ class PlanModelTestCase(TestCase):
         """
         Тестирование метода save() модели Plan с обновлением цены.
         """
-        with patch('services.tasks.set_price.delay') as mock_set_price_delay:
-            self.plan.discount_percent = 20
-            self.plan.save()
-            for subscription in self.plan.subscriptions.all():
-                mock_set_price_delay.assert_called_once_with(subscription.id)
+        with patch('services.tasks.run_repricing_job.delay') as mock_run_repricing_job_delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.plan.discount_percent = 20
+                self.plan.save()
+            job = RepricingJob.objects.get()
+            self.assertEqual(list(job.plans.all()), [self.plan])
+            mock_run_repricing_job_delay.assert_called_once_with(job.id)
 
     def test_plan_save_method_without_price_update_task(self):
         """
         Тестирование метода save() модели Plan без обновления цены.
         """
-        with patch('services.tasks.set_price.delay') as mock_set_price_delay:
-            self.plan.plan_type = 'student'
-            self.plan.save()
-            mock_set_price_delay.assert_not_called()
+        with patch('services.tasks.run_repricing_job.delay') as mock_run_repricing_job_delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.plan.plan_type = 'student'
+                self.plan.save()
+            mock_run_repricing_job_delay.assert_not_called()
+            self.assertFalse(RepricingJob.objects.exists())
 
     def test_plan_save_method_with_last_change_time_task(self):
         """
-        Тестирование метода save() модели Plan с обновлением времени последнего изменения.
+        Тестирование метода save() модели Plan с обновлением цены и времени последнего изменения.
         """
-        with patch('services.tasks.set_last_change_time.delay') as mock_set_last_change_time_delay:
-            self.plan.discount_percent = 20
-            self.plan.save()
-            for subscription in self.plan.subscriptions.all():
-                mock_set_last_change_time_delay.assert_called_once_with(subscription.id)
+        last_change_time = self.subscription.last_change_time
+        with patch('services.tasks.run_repricing_job.delay', side_effect=run_repricing_job):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.plan.discount_percent = 20
+                self.plan.save()
+        self.subscription.refresh_from_db()
+        self.assertEqual(self.subscription.price, 80)
+        self.assertGreater(self.subscription.last_change_time, last_change_time)
 
     def test_plan_save_method_without_last_change_time_task(self):
         """
         Тестирование метода save() модели Plan без обновления времени последнего изменения.
         """
-        with patch('services.tasks.set_last_change_time.delay') as mock_set_last_change_time_delay:
-            self.plan.plan_type = 'student'
-            self.plan.save()
-            mock_set_last_change_time_delay.assert_not_called()
+        last_change_time = self.subscription.last_change_time
+        with patch('services.tasks.run_repricing_job.delay', side_effect=run_repricing_job):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.plan.plan_type = 'student'
+                self.plan.save()
+        self.subscription.refresh_from_db()
+        self.assertEqual(self.subscription.last_change_time, last_change_time)
 
     def test_plan_max_discount_validation(self):
         """
@@ -153,11 +206,12 @@ class SubscriptionModelTestCase(TestCase):
         """
         Тестирование метода save() модели Subscription с обновлением цены.
         """
-        with patch('services.tasks.set_price.delay') as mock_set_price_delay:
-            self.subscription.service.full_price = 50
-            self.subscription.service.save()
-            self.subscription.save()
-            mock_set_price_delay.assert_called_with(self.subscription.id)
+        with patch('services.tasks.run_repricing_job.delay', side_effect=run_repricing_job):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.subscription.service.full_price = 50
+                self.subscription.service.save()
+        self.subscription.refresh_from_db()
+        self.assertEqual(self.subscription.price, 45)
 
     def test_subscription_save_method_without_price_update_task(self):
         """
@@ -168,3 +222,77 @@ class SubscriptionModelTestCase(TestCase):
             self.subscription.client.save()
             self.subscription.save()
             mock_set_price_delay.assert_not_called()
+
+
+class RepricingQuerySetTestCase(TestCase):
+    """
+    Тесты для QuerySet услуг и планов, пересчитывающих цены подписок при массовом изменении.
+    """
+
+    def setUp(self):
+        """
+        Подготовка данных для тестирования.
+        """
+        self.user = User.objects.create_user(username='testuser', email='testuser@example.com', password='password123')
+        self.client = Client.objects.create(user=self.user, company_name='Test Company')
+        self.services = [Service.objects.create(name=f'Service {i}', full_price=100) for i in range(3)]
+        self.plan = Plan.objects.create(plan_type='full', discount_percent=10)
+        self.subscriptions = [
+            Subscription.objects.create(client=self.client, service=service, plan=self.plan, price=90)
+            for service in self.services
+        ]
+
+    def get_prices(self):
+        return list(Subscription.objects.order_by('service_id').values_list('price', flat=True))
+
+    def test_update_schedules_one_job_for_changed_services(self):
+        """
+        Тестирование одного задания на пересчет только для услуг, цена которых изменилась.
+        """
+        with patch('services.tasks.run_repricing_job.delay', side_effect=run_repricing_job):
+            with self.captureOnCommitCallbacks(execute=True):
+                Service.objects.filter(id__in=[service.id for service in self.services[:2]]).update(full_price=100)
+                Service.objects.filter(id__in=[service.id for service in self.services[:2]]).update(full_price=200)
+
+        job = RepricingJob.objects.get()
+        self.assertEqual(set(job.services.all()), set(self.services[:2]))
+        self.assertEqual(self.get_prices(), [180, 180, 90])
+
+    def test_update_without_price_does_not_schedule_job(self):
+        """
+        Тестирование массового изменения без изменения цены.
+        """
+        with patch('services.tasks.run_repricing_job.delay') as mock_run_repricing_job_delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                Service.objects.update(name='Renamed')
+                Plan.objects.update(plan_type='student')
+        mock_run_repricing_job_delay.assert_not_called()
+        self.assertFalse(RepricingJob.objects.exists())
+
+    def test_bulk_update_schedules_one_job(self):
+        """
+        Тестирование одного задания на пересчет для услуг, измененных через bulk_update().
+        """
+        services = list(Service.objects.order_by('id'))
+        services[0].full_price = 50
+        services[2].full_price = 300
+
+        with patch('services.tasks.run_repricing_job.delay', side_effect=run_repricing_job):
+            with self.captureOnCommitCallbacks(execute=True):
+                Service.objects.bulk_update(services, ['full_price'])
+
+        job = RepricingJob.objects.get()
+        self.assertEqual(set(job.services.all()), {self.services[0], self.services[2]})
+        self.assertEqual(self.get_prices(), [45, 90, 270])
+        self.assertFalse(services[0].has_changed('full_price'))
+
+    def test_plan_update_reprices_subscriptions(self):
+        """
+        Тестирование пересчета цен подписок при массовом изменении скидки плана.
+        """
+        with patch('services.tasks.run_repricing_job.delay', side_effect=run_repricing_job):
+            with self.captureOnCommitCallbacks(execute=True):
+                Plan.objects.filter(id=self.plan.id).update(discount_percent=50)
+
+        self.assertEqual(list(RepricingJob.objects.get().plans.all()), [self.plan])
+        self.assertEqual(self.get_prices(), [50, 50, 50])
@@ -0,0 +1,89 @@
+"""
+Модуль с тестами массового создания клиентов.
+
+Тесты:
+- OnboardingTestCase: Проверяет создание клиентов пакетами с хэшированием паролей в пуле процессов,
+  пропуск существующих учетных записей, нормализацию имени пользователя и email и команду
+  onboard_clients с CSV-файлом.
+"""
+
+import io
+import os
+import tempfile
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+
+from clients.models import Client
+from clients.onboarding import onboard_clients, read_accounts_csv
+
+
+class OnboardingTestCase(TestCase):
+    """
+    Тесты для массового создания клиентов.
+    """
+
+    def make_accounts(self, count):
+        return [
+            {
+                'username': f'client{i}',
+                'email': f'client{i}@example.com',
+                'password': f'password{i}',
+                'company_name': f'Company {i}',
+                'company_full_address': f'Address {i}',
+            }
+            for i in range(count)
+        ]
+
+    def test_onboard_clients_in_batches_with_process_pool(self):
+        """
+        Тестирование создания клиентов пакетами с хэшированием паролей в двух процессах.
+        """
+        User.objects.create_user(username='client0', email='client0@example.com', password='password0')
+
+        with self.assertNumQueries(15):
+            created, skipped = onboard_clients(self.make_accounts(5), batch_size=2, processes=2)
+
+        self.assertEqual((created, skipped), (4, 1))
+        user = User.objects.get(username='client3')
+        self.assertTrue(user.check_password('password3'))
+        self.assertEqual(user.client.company_full_address, 'Address 3')
+        self.assertEqual(Client.objects.count(), 4)
+
+    def test_onboard_clients_normalizes_username_and_email(self):
+        """
+        Тестирование нормализации имени пользователя и email, как при создании через create_user.
+        """
+        accounts = self.make_accounts(2)
+        accounts[0].update(username='ｃｌｉｅｎｔ0', email='Client0@EXAMPLE.COM')
+        accounts[1].update(username='client0')
+
+        created, skipped = onboard_clients(accounts, processes=1)
+
+        self.assertEqual((created, skipped), (1, 1))
+        user = User.objects.get()
+        self.assertEqual(user.username, 'client0')
+        self.assertEqual(user.email, 'Client0@example.com')
+
+    def test_read_accounts_csv_requires_columns(self):
+        """
+        Тестирование ошибки при отсутствии обязательных столбцов CSV-файла.
+        """
+        with self.assertRaisesMessage(ValueError, 'Missing CSV columns: password'):
+            list(read_accounts_csv(io.StringIO('username,email,company_name\n')))
+
+    def test_onboard_clients_command(self):
+        """
+        Тестирование команды onboard_clients с CSV-файлом.
+        """
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as file:
+            file.write('username,email,password,company_name\n')
+            file.write('alpha,alpha@example.com,secret,Alpha\nalpha,alpha@example.com,secret,Alpha\n')
+        self.addCleanup(os.remove, file.name)
+        stdout = io.StringIO()
+
+        call_command('onboard_clients', file.name, processes=1, stdout=stdout)
+
+        self.assertIn('Created 1 clients, skipped 1 existing', stdout.getvalue())
+        self.assertEqual(Client.objects.get().company_name, 'Alpha')
@@ -0,0 +1,94 @@
+"""
+Модуль с тестами профилирования запросов.
+
+Тесты:
+- ProfilingMiddlewareTestCase: Проверяет отчет профилирования для сотрудника и обычный ответ
+  для остальных пользователей.
+- ExplainQueriesTestCase: Проверяет, что EXPLAIN ANALYZE выполняется только для SELECT без блокировки строк.
+"""
+
+import io
+import json
+import zipfile
+
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase
+
+from clients.models import Client
+from services.models import Service, Plan, Subscription
+from services.profiling import is_plain_select
+
+
+class ProfilingMiddlewareTestCase(TestCase):
+    """
+    Тесты для ProfilingMiddleware.
+    """
+
+    def setUp(self):
+        """
+        Подготовка данных для тестирования.
+        """
+        self.admin = User.objects.create_superuser('admin', 'admin@example.com', 'admin')
+        self.user = User.objects.create_user(username='testuser', email='testuser@example.com', password='password123')
+        client = Client.objects.create(user=self.user, company_name='Test Company')
+        service = Service.objects.create(name='Test Service', full_price=100)
+        plan = Plan.objects.create(plan_type='full', discount_percent=10)
+        Subscription.objects.create(client=client, service=service, plan=plan, price=90)
+
+    def test_staff_user_receives_report(self):
+        """
+        Тестирование отчета с профилем, SQL-запросами и планами EXPLAIN ANALYZE для суперпользователя.
+        """
+        self.client.force_login(self.admin)
+
+        response = self.client.get('/api/subscriptions/?profile=1')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        self.assertIn('attachment; filename="profile-', response['Content-Disposition'])
+        self.assertEqual(response['X-Profiled-Status'], '200')
+
+        with zipfile.ZipFile(io.BytesIO(response.content)) as report:
+            self.assertEqual(set(report.namelist()),
+                             {'summary.json', 'profile.txt', 'profile.pstats', 'sql.txt', 'explain.txt'})
+            summary = json.loads(report.read('summary.json'))
+            self.assertEqual(summary['path'], '/api/subscriptions/?profile=1')
+            self.assertGreater(summary['queries'], 0)
+            self.assertIn('serializer', report.read('profile.txt').decode())
+            self.assertIn('services_subscription', report.read('sql.txt').decode())
+            self.assertIn('actual time', report.read('explain.txt').decode())
+
+    def test_regular_user_is_not_profiled(self):
+        """
+        Тестирование обычного ответа для пользователя без прав сотрудника.
+        """
+        self.client.force_login(self.user)
+
+        response = self.client.get('/api/subscriptions/?profile=1')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertNotIn('Content-Disposition', response)
+
+
+class ExplainQueriesTestCase(SimpleTestCase):
+    """
+    Тесты для выбора запросов, которые анализируются EXPLAIN ANALYZE.
+    """
+
+    def test_only_plain_selects_are_explained(self):
+        """
+        Тестирование того, что запросы с блокировкой строк и изменяющие данные запросы не анализируются.
+        """
+        self.assertTrue(is_plain_select('SELECT "services_plan"."id" FROM "services_plan" WHERE "id" = %s'))
+        for sql in (
+            'SELECT "id" FROM "clients_client" FOR UPDATE',
+            'SELECT "id" FROM "clients_client" FOR NO KEY UPDATE SKIP LOCKED',
+            'SELECT "id" FROM "clients_client" FOR SHARE',
+            'select "id" from "clients_client" for key share',
+            'UPDATE "services_subscription" SET "price" = %s',
+            'DELETE FROM "services_subscription"',
+            'WITH moved AS (DELETE FROM "services_subscription" RETURNING *) SELECT count(*) FROM moved',
+        ):
+            with self.subTest(sql=sql):
+                self.assertFalse(is_plain_select(sql))
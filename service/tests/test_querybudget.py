@@ -0,0 +1,103 @@
+"""
+Модуль с тестами контроля бюджета SQL-запросов.
+
+Тесты:
+- QueryBudgetTestCase: Проверяет бюджет количества запросов представления, обнаружение N+1
+  со стеком вызовов, режим записи нарушений в лог и проверку времени запросов только при ее включении.
+"""
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from clients.models import Client
+from services.middleware import QueryBudgetMiddleware
+from services.models import Service, Plan, Subscription
+from services.querybudget import QueryBudgetExceeded, query_shape
+
+
+class QueryBudgetTestCase(TestCase):
+    """
+    Тесты для QueryBudgetMiddleware.
+    """
+
+    def setUp(self):
+        """
+        Подготовка данных для тестирования.
+        """
+        self.user = User.objects.create_user(username='testuser', email='testuser@example.com', password='password123')
+        self.client = Client.objects.create(user=self.user, company_name='Test Company')
+        self.plan = Plan.objects.create(plan_type='full', discount_percent=10)
+        self.subscriptions = [
+            Subscription.objects.create(client=self.client, plan=self.plan, price=90,
+                                        service=Service.objects.create(name=f'Service {i}', full_price=100))
+            for i in range(12)
+        ]
+
+    def n_plus_one_view(self, request):
+        """
+        Представление, которое читает услугу каждой подписки отдельным запросом.
+        """
+        names = [subscription.service.name for subscription in Subscription.objects.all()]
+        return HttpResponse(len(names))
+
+    def test_query_shape_collapses_parameter_lists(self):
+        """
+        Тестирование того, что списки параметров разной длины дают один шаблон запроса.
+        """
+        self.assertEqual(query_shape('SELECT 1 WHERE id IN (%s, %s)'), query_shape('SELECT 1 WHERE id IN (%s)'))
+
+    def test_n_plus_one_raises_with_stack(self):
+        """
+        Тестирование обнаружения повторяющегося запроса со стеком вызова представления.
+        """
+        middleware = QueryBudgetMiddleware(self.n_plus_one_view)
+
+        with self.assertRaises(QueryBudgetExceeded) as context:
+            middleware(RequestFactory().get('/'))
+
+        message = str(context.exception)
+        self.assertIn('N+1: query repeated 12 times', message)
+        self.assertIn('"services_service"', message)
+        self.assertIn('in n_plus_one_view', message)
+
+    @override_settings(QUERY_BUDGET_MODE='log')
+    def test_log_mode_does_not_fail_request(self):
+        """
+        Тестирование записи нарушения в лог без ошибки запроса.
+        """
+        middleware = QueryBudgetMiddleware(self.n_plus_one_view)
+
+        with self.assertLogs('services.middleware', 'WARNING') as logs:
+            response = middleware(RequestFactory().get('/'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('N+1', logs.output[0])
+
+    @override_settings(QUERY_BUDGETS={'default': {'queries': 50, 'time_ms': 1000},
+                                      'subscription-list': {'queries': 1}})
+    def test_view_query_count_budget(self):
+        """
+        Тестирование бюджета количества запросов, заданного по имени представления.
+        """
+        with self.assertRaisesMessage(QueryBudgetExceeded, 'Query budget of subscription-list exceeded'):
+            APIClient().get('/api/subscriptions/')
+
+    @override_settings(QUERY_BUDGETS={'default': {'queries': 50, 'time_ms': 0}})
+    def test_time_budget_checked_only_when_enabled(self):
+        """
+        Тестирование того, что время запросов не проверяется в тестах и проверяется при QUERY_BUDGET_CHECK_TIME.
+        """
+        def view(request):
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            return HttpResponse()
+
+        middleware = QueryBudgetMiddleware(view)
+        self.assertEqual(middleware(RequestFactory().get('/')).status_code, 200)
+
+        with override_settings(QUERY_BUDGET_CHECK_TIME=True), \
+                self.assertRaisesMessage(QueryBudgetExceeded, 'ms of queries exceed the budget of 0 ms'):
+            middleware(RequestFactory().get('/'))
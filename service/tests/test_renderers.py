@@ -0,0 +1,106 @@
+"""
+Модуль с тестами рендереров и сжатия ответов приложения services.
+
+Тесты:
+- RendererTestCase: Проверяет совместимость ORJSONRenderer с JSONRenderer из DRF и кодирование MessagePack.
+- CompressionMiddlewareTestCase: Проверяет выбор алгоритма сжатия, порог размера и тип содержимого ответа.
+"""
+
+import datetime
+import decimal
+import gzip
+import json
+
+import brotli
+import msgpack
+from django.http import HttpResponse
+from django.test import SimpleTestCase, RequestFactory, override_settings
+from rest_framework.renderers import JSONRenderer
+
+from services.middleware import CompressionMiddleware
+from services.renderers import ORJSONRenderer, MessagePackRenderer
+
+
+class RendererTestCase(SimpleTestCase):
+    """
+    Тесты для рендереров ORJSONRenderer и MessagePackRenderer.
+    """
+
+    def setUp(self):
+        """
+        Подготовка данных для тестирования.
+        """
+        self.data = {
+            'result': [{
+                'id': 1,
+                'plan': {'id': 1, 'plan_type': 'full', 'discount_percent': 10},
+                'price': 90,
+                'last_change_time': datetime.datetime(2024, 7, 11, 10, 54, 1, 123456, tzinfo=datetime.timezone.utc),
+                'client_name': 'Test Company',
+            }],
+            'total_amount': decimal.Decimal('90.00'),
+        }
+
+    def test_orjson_renderer_matches_drf_json_renderer(self):
+        """
+        Тестирование того, что ORJSONRenderer возвращает тот же JSON, что и JSONRenderer из DRF.
+        """
+        self.assertEqual(json.loads(ORJSONRenderer().render(self.data)), json.loads(JSONRenderer().render(self.data)))
+
+    def test_msgpack_renderer(self):
+        """
+        Тестирование кодирования MessagePack с датой в формате ISO 8601.
+        """
+        data = msgpack.unpackb(MessagePackRenderer().render(self.data))
+        self.assertEqual(data['result'][0]['last_change_time'], '2024-07-11T10:54:01.123456Z')
+        self.assertEqual(data['total_amount'], 90.0)
+
+
+@override_settings(COMPRESSION_MIN_LENGTH=100)
+class CompressionMiddlewareTestCase(SimpleTestCase):
+    """
+    Тесты для CompressionMiddleware.
+    """
+
+    content = b'{"price": 100}' * 100
+
+    def get_response(self, accept_encoding, content=None, content_type='application/json'):
+        """
+        Возвращает ответ, обработанный CompressionMiddleware.
+        """
+        request = RequestFactory().get('/api/subscriptions/', HTTP_ACCEPT_ENCODING=accept_encoding)
+        middleware = CompressionMiddleware(
+            lambda request: HttpResponse(content or self.content, content_type=content_type)
+        )
+        return middleware(request)
+
+    def test_brotli_is_preferred(self):
+        """
+        Тестирование выбора brotli, если клиент поддерживает его.
+        """
+        response = self.get_response('gzip, deflate, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(brotli.decompress(response.content), self.content)
+
+    def test_gzip_fallback(self):
+        """
+        Тестирование сжатия gzip, если клиент не поддерживает brotli.
+        """
+        response = self.get_response('gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), self.content)
+
+    def test_small_response_is_not_compressed(self):
+        """
+        Тестирование того, что ответы меньше порога не сжимаются.
+        """
+        response = self.get_response('gzip, br', content=b'{}')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_html_response_is_not_compressed(self):
+        """
+        Тестирование того, что HTML-страницы, которые могут содержать CSRF-токен, не сжимаются.
+        """
+        response = self.get_response('gzip, br', content_type='text/html; charset=utf-8')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response.content, self.content)
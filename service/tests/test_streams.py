@@ -0,0 +1,144 @@
+"""
+Модуль с тестами push-уведомлений об изменении цен.
+
+Тесты:
+- PriceEventsApplicationTestCase: Проверяет фильтрацию и пакетирование событий и поток server-sent events.
+- PricesChangedSignalTestCase: Проверяет отправку сигнала prices_changed после коммита пакетного обновления цен
+  и то, что ошибка публикации событий не передается коду, изменившему цены.
+"""
+
+import asyncio
+import json
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase, override_settings
+from redis.exceptions import RedisError
+
+from clients.models import Client
+from services.models import Service, Plan, Subscription
+from services.signals import prices_changed
+from services.streams import PriceEventBroadcaster, PriceEventsApplication, broadcaster
+from services.tasks import update_prices
+
+
+async def listen_stub(self):
+    pass
+
+
+@override_settings(PRICE_EVENTS_BATCH_INTERVAL=0.01, PRICE_EVENTS_HEARTBEAT_INTERVAL=1)
+@patch.object(PriceEventBroadcaster, 'listen', listen_stub)
+class PriceEventsApplicationTestCase(SimpleTestCase):
+    """
+    Тесты для ASGI-приложения событий об изменении цен.
+    """
+
+    events = [
+        {'subscription_id': 1, 'client_id': 1, 'service_id': 10, 'price': 90},
+        {'subscription_id': 2, 'client_id': 2, 'service_id': 10, 'price': 95},
+        {'subscription_id': 3, 'client_id': 3, 'service_id': 30, 'price': 80},
+    ]
+
+    def test_dispatch_filters_by_client_and_service(self):
+        """
+        Тестирование доставки событий подписчикам по клиенту, услуге и без фильтра.
+        """
+        async def run():
+            events_broadcaster = PriceEventBroadcaster()
+            by_client = events_broadcaster.subscribe(client_ids=[1])
+            by_service = events_broadcaster.subscribe(service_ids=[10])
+            unfiltered = events_broadcaster.subscribe()
+            events_broadcaster.dispatch(self.events)
+            return [await subscriber.next_batch(1) for subscriber in (by_client, by_service, unfiltered)]
+
+        by_client, by_service, unfiltered = asyncio.run(run())
+
+        self.assertEqual([event['subscription_id'] for event in by_client], [1])
+        self.assertEqual([event['subscription_id'] for event in by_service], [1, 2])
+        self.assertEqual([event['subscription_id'] for event in unfiltered], [1, 2, 3])
+
+    def test_server_sent_events(self):
+        """
+        Тестирование отправки пакета событий клиенту SSE и отписки после отключения.
+        """
+        messages = []
+
+        async def run():
+            disconnected = asyncio.Event()
+
+            async def receive():
+                await disconnected.wait()
+                return {'type': 'http.disconnect'}
+
+            async def send(message):
+                messages.append(message)
+                if message.get('more_body'):
+                    disconnected.set()
+
+            async def publish():
+                while not broadcaster.subscribers:
+                    await asyncio.sleep(0)
+                broadcaster.dispatch(self.events)
+
+            scope = {'type': 'http', 'path': '/api/subscriptions/stream/', 'query_string': b'client=2,3'}
+            await asyncio.gather(PriceEventsApplication(None)(scope, receive, send), publish())
+
+        asyncio.run(run())
+
+        self.assertEqual(messages[0]['status'], 200)
+        body = messages[1]['body'].decode()
+        self.assertTrue(body.startswith('event: prices\ndata: '))
+        data = json.loads(body.split('data: ', 1)[1])
+        self.assertEqual([event['subscription_id'] for event in data], [2, 3])
+        self.assertFalse(broadcaster.subscribers)
+
+
+class PricesChangedSignalTestCase(TestCase):
+    """
+    Тесты для сигнала prices_changed.
+    """
+
+    def setUp(self):
+        """
+        Подготовка данных для тестирования.
+        """
+        self.user = User.objects.create_user(username='testuser', email='testuser@example.com', password='password123')
+        self.client = Client.objects.create(user=self.user, company_name='Test Company')
+        self.service = Service.objects.create(name='Test Service', full_price=100)
+        self.plan = Plan.objects.create(plan_type='full', discount_percent=10)
+        self.subscription = Subscription.objects.create(client=self.client, service=self.service, plan=self.plan)
+
+    def test_update_prices_sends_prices_changed_after_commit(self):
+        """
+        Тестирование отправки сигнала prices_changed после коммита пакетного обновления цен.
+        """
+        received = []
+
+        def handler(sender, subscription_ids, **kwargs):
+            received.append(subscription_ids)
+
+        prices_changed.connect(handler)
+        self.addCleanup(prices_changed.disconnect, handler)
+
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            update_prices([self.subscription.id])
+        self.assertEqual(received, [])
+
+        for callback in callbacks:
+            callback()
+        self.assertEqual(received, [[self.subscription.id]])
+
+    @override_settings(PRICE_EVENTS_REDIS_URL='redis://redis:6379/1')
+    def test_publish_error_is_logged(self):
+        """
+        Тестирование того, что ошибка Redis при публикации событий записывается в лог, а остальные
+        обработчики сигнала выполняются.
+        """
+        with patch('services.events.publish_price_events', side_effect=RedisError), \
+                patch('services.receivers.schedule_client_documents') as mock_schedule, \
+                self.assertLogs('services.signals', 'ERROR') as logs, \
+                self.captureOnCommitCallbacks(execute=True):
+            update_prices([self.subscription.id])
+
+        self.assertIn('publish_price_changes', logs.output[0])
+        mock_schedule.assert_called_once()
@@ -0,0 +1,248 @@
+"""
+Модуль с тестами задач приложения services.
+
+Этот модуль содержит юнит-тесты для задания на пересчет цен подписок и сверки цен.
+
+Тесты:
+- RepricingJobTestCase: Тесты для задачи run_repricing_job, проверяющие пересчет цен порциями,
+  продолжение с контрольной точки, повтор после кратковременной ошибки и эндпоинт прогресса.
+- SetPriceTestCase: Тесты для пакетной задачи set_price, проверяющие обновление цен пакета
+  одним запросом и однократную очистку кэша.
+- ReconcilePricesTestCase: Тесты для задачи reconcile_prices, проверяющие исправление расхождений
+  цен порциями, отчет по услугам и планам и отбрасывание дробной части цены.
+"""
+
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.db import OperationalError
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from clients.models import Client
+from services.models import Service, Plan, Subscription, RepricingJob
+from services.pricing import find_price_drift, reprice_subscriptions
+from services.tasks import run_repricing_job, reconcile_prices, set_price
+
+
+class RepricingJobTestCase(TestCase):
+    """
+    Тесты для задания на пересчет цен подписок.
+    """
+
+    def setUp(self):
+        """
+        Подготовка данных для тестирования.
+        """
+        self.user = User.objects.create_user(username='testuser', email='testuser@example.com', password='password123')
+        self.client = Client.objects.create(user=self.user, company_name='Test Company')
+        self.service = Service.objects.create(name='Test Service', full_price=100)
+        self.other_service = Service.objects.create(name='Other Service', full_price=300)
+        self.plan = Plan.objects.create(plan_type='full', discount_percent=10)
+        self.subscriptions = [
+            Subscription.objects.create(client=self.client, service=self.service, plan=self.plan)
+            for _ in range(5)
+        ]
+        self.other_subscription = Subscription.objects.create(client=self.client, service=self.other_service,
+                                                              plan=self.plan)
+
+    def create_job(self, **kwargs):
+        """
+        Создает задание на пересчет цен подписок тестовой услуги.
+        """
+        job = RepricingJob.objects.create(**kwargs)
+        job.services.set([self.service])
+        return job
+
+    def test_run_repricing_job_in_chunks(self):
+        """
+        Тестирование пересчета цен порциями только для подписок выбранной услуги.
+        """
+        job = self.create_job(chunk_size=2)
+
+        run_repricing_job(job.id)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, RepricingJob.DONE)
+        self.assertEqual(job.total, 5)
+        self.assertEqual(job.processed, 5)
+        self.assertEqual(job.last_subscription_id, self.subscriptions[-1].id)
+        self.assertEqual(job.progress, 100.0)
+        self.assertEqual(
+            list(Subscription.objects.filter(service=self.service).values_list('price', flat=True)), [90] * 5
+        )
+        self.other_subscription.refresh_from_db()
+        self.assertEqual(self.other_subscription.price, 0)
+
+    def test_run_repricing_job_resumes_from_checkpoint(self):
+        """
+        Тестирование продолжения прерванного задания с контрольной точки.
+        """
+        job = self.create_job(chunk_size=2, status=RepricingJob.RUNNING, total=5, processed=2,
+                              last_subscription_id=self.subscriptions[1].id)
+        job.started_at = job.created_at
+        job.save()
+
+        run_repricing_job(job.id)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, RepricingJob.DONE)
+        self.assertEqual(job.processed, 5)
+        prices = dict(Subscription.objects.filter(service=self.service).values_list('id', 'price'))
+        self.assertEqual(prices[self.subscriptions[0].id], 0)
+        self.assertEqual(prices[self.subscriptions[1].id], 0)
+        self.assertEqual(prices[self.subscriptions[2].id], 90)
+
+    def test_run_repricing_job_retries_transient_error(self):
+        """
+        Тестирование повтора задания с контрольной точки после кратковременной ошибки базы данных.
+        """
+        job = self.create_job(chunk_size=2)
+        calls = []
+
+        def fail_second_chunk(queryset, **kwargs):
+            calls.append(kwargs)
+            if len(calls) == 2:
+                raise OperationalError('connection lost')
+            return reprice_subscriptions(queryset, **kwargs)
+
+        with patch('services.pricing.reprice_subscriptions', side_effect=fail_second_chunk), \
+                self.assertLogs('services.tasks', 'WARNING'):
+            result = run_repricing_job.apply(args=[job.id])
+
+        self.assertTrue(result.successful())
+        job.refresh_from_db()
+        self.assertEqual(job.status, RepricingJob.DONE)
+        self.assertEqual(job.processed, 5)
+        self.assertEqual(len(calls), 4)
+        self.assertEqual(
+            list(Subscription.objects.filter(service=self.service).values_list('price', flat=True)), [90] * 5
+        )
+
+    def test_run_repricing_job_fails_on_other_error(self):
+        """
+        Тестирование статуса FAILED задания при ошибке, после которой повтор не поможет.
+        """
+        job = self.create_job(chunk_size=2)
+
+        with patch('services.pricing.reprice_subscriptions', side_effect=ValueError):
+            result = run_repricing_job.apply(args=[job.id])
+
+        self.assertTrue(result.failed())
+        job.refresh_from_db()
+        self.assertEqual(job.status, RepricingJob.FAILED)
+
+    def test_repricing_job_progress_endpoint(self):
+        """
+        Тестирование эндпоинта прогресса задания на пересчет цен.
+        """
+        job = self.create_job()
+        run_repricing_job(job.id)
+
+        response = APIClient().get(f'/api/repricing-jobs/{job.id}/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['status'], RepricingJob.DONE)
+        self.assertEqual(response.data['processed'], 5)
+        self.assertEqual(response.data['progress'], 100.0)
+        self.assertEqual(response.data['eta'], 0.0)
+        self.assertEqual(response.data['services'], [self.service.id])
+
+
+class SetPriceTestCase(TestCase):
+    """
+    Тесты для пакетной задачи set_price.
+    """
+
+    def setUp(self):
+        """
+        Подготовка данных для тестирования.
+        """
+        self.user = User.objects.create_user(username='testuser', email='testuser@example.com', password='password123')
+        self.client = Client.objects.create(user=self.user, company_name='Test Company')
+        self.plan = Plan.objects.create(plan_type='full', discount_percent=10)
+        self.services = [Service.objects.create(name=f'Service {i}', full_price=100 * (i + 1)) for i in range(3)]
+        self.subscriptions = [
+            Subscription.objects.create(client=self.client, service=service, plan=self.plan)
+            for service in self.services
+        ]
+
+    def test_set_price_updates_batch_in_one_query(self):
+        """
+        Тестирование обновления цен всех подписок пакета одним UPDATE-запросом с однократной очисткой кэша.
+        """
+        requests = [SimpleNamespace(args=(subscription.id,)) for subscription in self.subscriptions * 2]
+
+        with patch('services.tasks.invalidate_total_amount') as mock_invalidate, \
+                self.captureOnCommitCallbacks(execute=False), self.assertNumQueries(3):
+            set_price(requests)
+
+        mock_invalidate.assert_called_once_with()
+        self.assertEqual(
+            list(Subscription.objects.filter(id__in=[subscription.id for subscription in self.subscriptions])
+                 .order_by('id').values_list('price', flat=True)),
+            [90, 180, 270],
+        )
+
+
+class ReconcilePricesTestCase(TestCase):
+    """
+    Тесты для сверки сохраненных цен подписок с вычисленными.
+    """
+
+    def setUp(self):
+        """
+        Подготовка данных для тестирования.
+        """
+        self.user = User.objects.create_user(username='testuser', email='testuser@example.com', password='password123')
+        self.client = Client.objects.create(user=self.user, company_name='Test Company')
+        self.service = Service.objects.create(name='Test Service', full_price=100)
+        self.other_service = Service.objects.create(name='Other Service', full_price=99)
+        self.plan = Plan.objects.create(plan_type='student', discount_percent=50)
+        self.subscriptions = [
+            Subscription.objects.create(client=self.client, service=self.service, plan=self.plan, price=50)
+            for _ in range(4)
+        ]
+        self.drifted = [
+            Subscription.objects.create(client=self.client, service=self.other_service, plan=self.plan, price=0)
+            for _ in range(3)
+        ]
+
+    def test_fractional_price_is_truncated(self):
+        """
+        Тестирование отбрасывания дробной части цены при пересчете и сверке, как при сохранении цены подписки.
+        """
+        service = Service.objects.create(name='Fractional Service', full_price=150)
+        plan = Plan.objects.create(plan_type='discount', discount_percent=15)
+        subscription = Subscription.objects.create(client=self.client, service=service, plan=plan, price=0)
+        queryset = Subscription.objects.filter(id=subscription.id)
+
+        reprice_subscriptions(queryset)
+
+        subscription.refresh_from_db()
+        self.assertEqual(subscription.price, 127)
+        self.assertFalse(find_price_drift(queryset).exists())
+
+        queryset.update(price=128)
+        self.assertEqual(list(find_price_drift(queryset).values_list('expected_price', flat=True)), [127])
+
+    def test_reconcile_prices_fixes_drift_in_chunks(self):
+        """
+        Тестирование исправления только разошедшихся цен и отчета по услугам и планам.
+        """
+        correct = dict(Subscription.objects.filter(service=self.service).values_list('id', 'last_change_time'))
+
+        report = reconcile_prices(chunk_size=2, interval=0)
+
+        self.assertEqual(report, {
+            'fixed': 3,
+            'by_service_plan': [{'service_id': self.other_service.id, 'plan_id': self.plan.id, 'count': 3}],
+        })
+        self.assertEqual(
+            set(Subscription.objects.filter(service=self.other_service).values_list('price', flat=True)), {49}
+        )
+        self.assertEqual(
+            dict(Subscription.objects.filter(service=self.service).values_list('id', 'last_change_time')), correct
+        )
+        self.assertEqual(reconcile_prices(interval=0)['fixed'], 0)
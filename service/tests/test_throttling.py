@@ -0,0 +1,135 @@
+"""
+Модуль с тестами ограничителей запросов и метрик Prometheus.
+
+Тесты:
+- ThrottlingTestCase: Тесты для ограничения по стоимости запросов, ограничения одновременных
+  запросов с освобождением места для любого представления, стримингового ответа и исключения,
+  пропуска запросов при недоступном Redis и эндпоинта метрик.
+"""
+
+import uuid
+from unittest.mock import Mock, patch
+
+from django.http import StreamingHttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django_redis import get_redis_connection
+from redis.exceptions import RedisError
+
+from services.middleware import ConcurrencyReleaseMiddleware
+from services.throttling import CostThrottle
+
+
+class ThrottlingTestCase(TestCase):
+    """
+    Тесты для ограничителей запросов CostThrottle и ConcurrencyThrottle.
+    """
+
+    def setUp(self):
+        """
+        Включение ограничителей с отдельным префиксом ключей Redis для каждого теста.
+        """
+        self.prefix = f'test-throttle-{uuid.uuid4().hex}'
+        self.redis = get_redis_connection('default')
+        settings_override = override_settings(
+            THROTTLE_ENABLED=True,
+            THROTTLE_KEY_PREFIX=self.prefix,
+            THROTTLE_BUCKETS={'user': {'rate': 0.01, 'burst': 6}, 'anon': {'rate': 0.01, 'burst': 6}},
+            THROTTLE_ROWS_PER_TOKEN=1000,
+            THROTTLE_MAX_CONCURRENT={'user': 1, 'anon': 1},
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.addCleanup(lambda: [self.redis.delete(key) for key in self.redis.scan_iter(f'{self.prefix}:*')])
+
+    def test_cost_weighted_request_is_throttled(self):
+        """
+        Тестирование списания токенов по ожидаемому количеству строк и ответа 429 с заголовком Retry-After.
+        """
+        with patch('services.views.estimate_rows', return_value=5000):
+            self.assertEqual(self.client.get('/api/subscriptions/').status_code, 200)
+            response = self.client.get('/api/subscriptions/')
+
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response['Retry-After']), 0)
+        self.assertEqual(self.client.get('/api/repricing-jobs/').status_code, 200)
+
+    def test_concurrency_limit(self):
+        """
+        Тестирование отклонения запроса при занятых местах и освобождения места после ответа.
+        """
+        key = f'{self.prefix}:concurrency:anon:127.0.0.1'
+        self.redis.zadd(key, {'running': self.redis.time()[0]})
+
+        self.assertEqual(self.client.get('/api/repricing-jobs/').status_code, 429)
+
+        self.redis.zrem(key, 'running')
+        self.assertEqual(self.client.get('/api/repricing-jobs/').status_code, 200)
+        self.assertEqual(self.redis.zcard(key), 0)
+
+    def test_concurrency_slot_released_for_any_view(self):
+        """
+        Тестирование освобождения места для представления корня API и отсутствия места у запроса,
+        отклоненного ограничителем стоимости.
+        """
+        key = f'{self.prefix}:concurrency:anon:127.0.0.1'
+
+        for _ in range(3):
+            self.assertEqual(self.client.get('/').status_code, 200)
+        self.assertEqual(self.redis.zcard(key), 0)
+
+        self.redis.delete(*self.redis.scan_iter(f'{self.prefix}:*'))
+        with patch('services.views.estimate_rows', return_value=6000), \
+                patch('services.middleware.release_concurrency_slot'), \
+                override_settings(THROTTLE_MAX_CONCURRENT={'user': 5, 'anon': 5}):
+            self.assertEqual(self.client.get('/api/subscriptions/').status_code, 200)
+            self.assertEqual(self.client.get('/api/subscriptions/').status_code, 429)
+        self.assertEqual(self.redis.zcard(key), 1)
+
+    def test_concurrency_slot_released_after_streaming_response(self):
+        """
+        Тестирование освобождения места стримингового ответа после передачи содержимого
+        и места запроса, обработка которого завершилась исключением.
+        """
+        def stream(request):
+            request.concurrency_slot = ('key', 'token')
+            return StreamingHttpResponse(iter([b'first', b'second']))
+
+        def fail(request):
+            request.concurrency_slot = ('key', 'token')
+            raise ValueError
+
+        request = RequestFactory().get('/')
+        with patch('services.middleware.release_concurrency_slot') as mock_release:
+            response = ConcurrencyReleaseMiddleware(stream)(request)
+            mock_release.assert_not_called()
+            self.assertEqual(b''.join(response.streaming_content), b'firstsecond')
+            mock_release.assert_called_once_with(request)
+
+            mock_release.reset_mock()
+            with self.assertRaises(ValueError):
+                ConcurrencyReleaseMiddleware(fail)(request)
+            mock_release.assert_called_once_with(request)
+
+    def test_unavailable_redis_allows_requests(self):
+        """
+        Тестирование пропуска запросов, если Redis недоступен.
+        """
+        with patch.object(CostThrottle, 'script', Mock(side_effect=RedisError)), \
+                self.assertLogs('services.throttling', 'WARNING'):
+            response = self.client.get('/api/repricing-jobs/')
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_metrics_endpoint(self):
+        """
+        Тестирование отдачи решений ограничителей в формате Prometheus.
+        """
+        with patch('services.views.estimate_rows', return_value=6000):
+            self.client.get('/api/subscriptions/')
+            self.client.get('/api/subscriptions/')
+
+        response = self.client.get('/metrics/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'throttle_decisions_total{decision="deny",scope="anon",throttle="cost"}', response.content)
+        self.assertIn(b'throttle_tokens_total{scope="anon"}', response.content)
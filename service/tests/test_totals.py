@@ -0,0 +1,78 @@
+"""
+Модуль с тестами кэширования общей суммы цен подписок.
+
+Тесты:
+- TotalAmountTestCase: Проверяет кэширование нулевой суммы, единственный пересчет при одновременных
+  промахах кэша с выдачей последнего значения и сохранение суммы задачей refresh_total_amount.
+"""
+
+from unittest.mock import patch
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+
+from clients.models import Client
+from services.models import Service, Plan, Subscription
+from services.tasks import refresh_total_amount
+from services.totals import (LAST_KEY, LOCK_KEY, VERSION_KEY, get_total_amount, invalidate_total_amount,
+                             store_total_amount)
+
+
+class TotalAmountTestCase(TestCase):
+    """
+    Тесты для кэша общей суммы цен подписок.
+    """
+
+    def setUp(self):
+        """
+        Подготовка данных для тестирования.
+        """
+        cache.delete_many([settings.PRICE_CACHE_NAME, LAST_KEY, LOCK_KEY, VERSION_KEY])
+        self.user = User.objects.create_user(username='testuser', email='testuser@example.com', password='password123')
+        self.client = Client.objects.create(user=self.user, company_name='Test Company')
+        self.service = Service.objects.create(name='Test Service', full_price=100)
+        self.plan = Plan.objects.create(plan_type='full', discount_percent=10)
+
+    def test_zero_total_is_cached(self):
+        """
+        Тестирование того, что нулевая сумма считается значением кэша, а не промахом.
+        """
+        Subscription.objects.create(client=self.client, service=self.service, plan=self.plan, price=0)
+        self.assertEqual(get_total_amount(), (0, False))
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_total_amount(), (0, False))
+
+    def test_concurrent_misses_schedule_single_refresh(self):
+        """
+        Тестирование того, что после удаления кэша пересчет ставится в очередь один раз,
+        а все запросы получают последнее значение с признаком устаревания.
+        """
+        Subscription.objects.create(client=self.client, service=self.service, plan=self.plan, price=90)
+        self.assertEqual(get_total_amount(), (90, False))
+        Subscription.objects.create(client=self.client, service=self.service, plan=self.plan, price=10)
+        invalidate_total_amount()
+
+        with patch('services.tasks.refresh_total_amount.delay') as mock_refresh_delay, self.assertNumQueries(0):
+            results = [get_total_amount() for _ in range(5)]
+
+        self.assertEqual(results, [(90, True)] * 5)
+        mock_refresh_delay.assert_called_once_with()
+
+        refresh_total_amount()
+        self.assertIsNone(cache.get(LOCK_KEY))
+        self.assertEqual(get_total_amount(), (100, False))
+
+    def test_store_skips_fresh_value_changed_during_computation(self):
+        """
+        Тестирование того, что сумма, вычисленная до изменения цен, сохраняется только как последнее значение.
+        """
+        Subscription.objects.create(client=self.client, service=self.service, plan=self.plan, price=90)
+
+        with patch('services.totals.compute_total_amount', side_effect=lambda: invalidate_total_amount() or 90):
+            store_total_amount()
+
+        self.assertIsNone(cache.get(settings.PRICE_CACHE_NAME))
+        self.assertEqual(cache.get(LAST_KEY), 90)
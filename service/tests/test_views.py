@@ -0,0 +1,224 @@
+"""
+Модуль с тестами представлений приложения services.
+
+Тесты:
+- SubscriptionViewTestCase: Тесты для SubscriptionView, проверяющие выбор полей параметром fields
+  и нормализованный режим ответа.
+- SubscriptionChangesTestCase: Тесты для ленты изменений подписок, включая изменения транзакций,
+  зафиксированных после более поздних, и перенос подписки в секцию другого клиента.
+"""
+
+import psycopg2
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from clients.models import Client
+from services.models import Service, Plan, Subscription, SubscriptionTombstone
+from services.totals import LAST_KEY, LOCK_KEY, VERSION_KEY
+
+
+class SubscriptionViewTestCase(TestCase):
+    """
+    Тесты для представления SubscriptionView.
+    """
+
+    def setUp(self):
+        """
+        Подготовка данных для тестирования.
+        """
+        cache.delete_many([settings.PRICE_CACHE_NAME, LAST_KEY, LOCK_KEY, VERSION_KEY])
+        self.user = User.objects.create_user(username='testuser', email='testuser@example.com', password='password123')
+        self.client = Client.objects.create(user=self.user, company_name='Test Company')
+        self.service = Service.objects.create(name='Test Service', full_price=100)
+        self.plan = Plan.objects.create(plan_type='full', discount_percent=10)
+        self.subscriptions = [
+            Subscription.objects.create(client=self.client, service=self.service, plan=self.plan, price=90)
+            for _ in range(3)
+        ]
+        self.api_client = APIClient()
+
+    def test_list_default_fields(self):
+        """
+        Тестирование полного списка полей без параметров запроса.
+        """
+        response = self.api_client.get('/api/subscriptions/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total_amount'], 270)
+        self.assertEqual(set(response.data['result'][0]),
+                         {'id', 'plan_id', 'plan', 'price', 'last_change_time', 'client_name', 'email'})
+        self.assertNotIn('plans', response.data)
+
+    def test_list_sparse_fields_prune_query(self):
+        """
+        Тестирование того, что параметр fields сокращает и ответ, и запросы к базе данных.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            response = self.api_client.get('/api/subscriptions/?fields=id,price')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['result'][0], {'id': self.subscriptions[0].id, 'price': 90})
+        sql = ' '.join(query['sql'] for query in queries.captured_queries)
+        self.assertNotIn('"services_plan"', sql)
+        self.assertNotIn('"clients_client"', sql)
+        self.assertNotIn('"last_change_time"', sql)
+
+    def test_list_unknown_field(self):
+        """
+        Тестирование ошибки при запросе неизвестного поля.
+        """
+        response = self.api_client.get('/api/subscriptions/?fields=id,password')
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_list_normalized(self):
+        """
+        Тестирование нормализованного ответа, в котором планы и клиенты выводятся один раз.
+        """
+        response = self.api_client.get('/api/subscriptions/?normalize=plans,clients')
+
+        self.assertEqual(response.status_code, 200)
+        row = response.data['result'][0]
+        self.assertEqual(set(row), {'id', 'plan_id', 'price', 'last_change_time', 'client_id'})
+        self.assertEqual(row['plan_id'], self.plan.id)
+        self.assertEqual(row['client_id'], self.client.id)
+        self.assertEqual(response.data['plans'],
+                         {self.plan.id: {'id': self.plan.id, 'plan_type': 'full', 'discount_percent': 10}})
+        self.assertEqual(response.data['clients'],
+                         {self.client.id: {'id': self.client.id, 'client_name': 'Test Company',
+                                           'email': 'testuser@example.com'}})
+
+
+class SubscriptionChangesTestCase(TransactionTestCase):
+    """
+    Тесты для ленты изменений /api/subscriptions/changes/.
+
+    Лента не выдает изменения незавершенных транзакций, поэтому тесты выполняются
+    без общей транзакции TestCase, а изменения фиксируются сразу.
+    """
+
+    def setUp(self):
+        """
+        Подготовка данных для тестирования.
+        """
+        self.user = User.objects.create_user(username='testuser', email='testuser@example.com', password='password123')
+        self.client = Client.objects.create(user=self.user, company_name='Test Company')
+        self.service = Service.objects.create(name='Test Service', full_price=100)
+        self.plan = Plan.objects.create(plan_type='full', discount_percent=10)
+        self.subscriptions = [
+            Subscription.objects.create(client=self.client, service=self.service, plan=self.plan)
+            for _ in range(3)
+        ]
+        self.api_client = APIClient()
+
+    def get_changes(self, cursor, limit=100):
+        """
+        Возвращает данные ленты изменений после курсора.
+        """
+        response = self.api_client.get(f'/api/subscriptions/changes/?cursor={cursor}&limit={limit}&fields=id,price')
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def get_partition(self, subscription_id):
+        """
+        Возвращает имя секции таблицы подписок, в которой хранится подписка.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT tableoid::regclass::text FROM services_subscription WHERE id = %s',
+                           [subscription_id])
+            return cursor.fetchone()[0]
+
+    def test_changes_since_cursor(self):
+        """
+        Тестирование того, что после курсора возвращаются только измененные и удаленные подписки.
+        """
+        cursor = self.get_changes(0)['cursor']
+
+        deleted_id = self.subscriptions[1].id
+        Subscription.objects.filter(id=self.subscriptions[0].id).update(price=90)
+        self.subscriptions[1].delete()
+
+        data = self.get_changes(cursor)
+        self.assertEqual(data['changes'], [{'id': self.subscriptions[0].id, 'price': 90}])
+        self.assertEqual(data['deleted'], [deleted_id])
+        self.assertFalse(data['has_more'])
+        self.assertEqual(self.get_changes(data['cursor'])['changes'], [])
+
+    def test_unchanged_update_keeps_cursor(self):
+        """
+        Тестирование того, что сохранение без изменений не попадает в ленту.
+        """
+        cursor = self.get_changes(0)['cursor']
+
+        Subscription.objects.get(id=self.subscriptions[2].id).save()
+
+        data = self.get_changes(cursor)
+        self.assertEqual(data['changes'], [])
+        self.assertEqual(data['cursor'], cursor)
+
+    def test_changes_pagination(self):
+        """
+        Тестирование постраничного чтения ленты изменений.
+        """
+        first_page = self.get_changes(0, limit=2)
+        second_page = self.get_changes(first_page['cursor'], limit=2)
+
+        self.assertTrue(first_page['has_more'])
+        self.assertFalse(second_page['has_more'])
+        self.assertEqual([row['id'] for row in first_page['changes'] + second_page['changes']],
+                         [subscription.id for subscription in self.subscriptions])
+
+    def test_client_change_is_not_deletion(self):
+        """
+        Тестирование того, что перенос подписки в секцию другого клиента не попадает в ленту как удаление.
+        """
+        subscription = self.subscriptions[0]
+        partition = self.get_partition(subscription.id)
+        for number in range(50):
+            user = User.objects.create_user(username=f'other{number}', password='password123')
+            other_client = Client.objects.create(user=user, company_name=f'Other Company {number}')
+            Subscription.objects.filter(id=subscription.id).update(client=other_client)
+            if self.get_partition(subscription.id) != partition:
+                break
+        self.assertNotEqual(self.get_partition(subscription.id), partition)
+
+        data = self.get_changes(0)
+        self.assertEqual(data['deleted'], [])
+        self.assertFalse(SubscriptionTombstone.objects.exists())
+        self.assertEqual([row['id'] for row in data['changes']],
+                         [self.subscriptions[1].id, self.subscriptions[2].id, subscription.id])
+
+    def test_changes_of_late_committed_transaction(self):
+        """
+        Тестирование того, что изменения транзакции, зафиксированной после более поздней, не пропускаются.
+        """
+        cursor = self.get_changes(0)['cursor']
+        first, second = (psycopg2.connect(**connection.get_connection_params()) for _ in range(2))
+        self.addCleanup(first.close)
+        self.addCleanup(second.close)
+        deleted_id = self.subscriptions[2].id
+
+        with first.cursor() as first_cursor:
+            first_cursor.execute('UPDATE services_subscription SET price = 11 WHERE id = %s',
+                                 [self.subscriptions[0].id])
+            first_cursor.execute('DELETE FROM services_subscription WHERE id = %s', [deleted_id])
+        with second.cursor() as second_cursor:
+            second_cursor.execute('UPDATE services_subscription SET price = 22 WHERE id = %s',
+                                  [self.subscriptions[1].id])
+        second.commit()
+
+        data = self.get_changes(cursor)
+        self.assertEqual((data['changes'], data['deleted'], data['cursor']), ([], [], cursor))
+
+        first.commit()
+
+        data = self.get_changes(cursor)
+        self.assertEqual(sorted((row['id'], row['price']) for row in data['changes']),
+                         [(self.subscriptions[0].id, 11), (self.subscriptions[1].id, 22)])
+        self.assertEqual(data['deleted'], [deleted_id])
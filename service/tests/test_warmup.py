@@ -0,0 +1,103 @@
+"""
+Модуль с тестами прогрева кэшей при запуске процессов.
+
+Тесты:
+- WarmUpTestCase: Проверяет заполнение кэша общей суммы цен, запросы первых страниц без ограничителей,
+  запуск веб-процесса без импорта Celery и запуск с пустыми кэшами при ошибке прогрева.
+"""
+
+import subprocess
+import sys
+from unittest.mock import patch
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.signals import request_finished, request_started
+from django.core.wsgi import get_wsgi_application
+from django.db import OperationalError, close_old_connections
+from django.test import TestCase, override_settings
+
+from clients.models import Client
+from services.models import Service, Plan, Subscription
+from services.totals import LAST_KEY, LOCK_KEY, VERSION_KEY
+from services.tasks import warm_up_worker
+from services.warmup import request_path, warm_up, warm_up_on_startup
+
+
+class WarmUpTestCase(TestCase):
+    """
+    Тесты для прогрева кэшей.
+    """
+
+    def setUp(self):
+        """
+        Подготовка данных для тестирования.
+        """
+        cache.delete_many([settings.PRICE_CACHE_NAME, LAST_KEY, LOCK_KEY, VERSION_KEY])
+        user = User.objects.create_user(username='testuser', email='testuser@example.com', password='password123')
+        client = Client.objects.create(user=user, company_name='Test Company')
+        service = Service.objects.create(name='Test Service', full_price=100)
+        plan = Plan.objects.create(plan_type='full', discount_percent=10)
+        Subscription.objects.create(client=client, service=service, plan=plan, price=90)
+        # Как и тестовый клиент Django, запросы внутри теста не должны закрывать соединение с базой данных.
+        for signal in (request_started, request_finished):
+            signal.disconnect(close_old_connections)
+            self.addCleanup(signal.connect, close_old_connections)
+
+    @override_settings(WARMUP_HOST='testserver')
+    def test_warm_up_fills_caches_and_requests_pages(self):
+        """
+        Тестирование вычисления общей суммы цен и запросов первых страниц через WSGI-приложение.
+        """
+        application = get_wsgi_application()
+
+        with self.assertLogs('services.warmup', 'INFO') as logs:
+            timings = warm_up(application, ['/api/subscriptions/'], setup_ms=1.0)
+
+        self.assertEqual(set(timings), {'setup', 'totals', 'lookups', 'pages', 'warmup'})
+        self.assertIn('pages=', logs.output[0])
+        self.assertEqual(cache.get(settings.PRICE_CACHE_NAME), 90)
+        self.assertEqual(request_path(application, '/api/subscriptions/?fields=id'), 200)
+        self.assertEqual(request_path(application, '/api/unknown/'), 404)
+
+    @override_settings(WARMUP_HOST='testserver', THROTTLE_ENABLED=True, THROTTLE_MAX_CONCURRENT={'user': 0, 'anon': 0})
+    def test_warm_up_requests_are_not_throttled(self):
+        """
+        Тестирование того, что запросы прогрева не ограничиваются, а обычные запросы ограничиваются.
+        """
+        application = get_wsgi_application()
+
+        for path in settings.WARMUP_PATHS:
+            self.assertEqual(request_path(application, path), 200)
+        self.assertEqual(self.client.get('/api/repricing-jobs/').status_code, 429)
+
+    def test_failed_warm_up_does_not_stop_startup(self):
+        """
+        Тестирование того, что ошибка при прогреве записывается в лог и не прерывает запуск
+        веб-процесса и воркера.
+        """
+        application = get_wsgi_application()
+
+        with patch('services.warmup.cache.get', side_effect=OperationalError('database is starting up')), \
+                patch('django.db.connections.close_all') as mock_close_all:
+            with self.assertLogs('services.warmup', 'ERROR') as logs:
+                self.assertIsNone(warm_up_on_startup(application, ['/api/subscriptions/']))
+            self.assertIn('Warm-up failed', logs.output[0])
+
+            with self.assertLogs('services.warmup', 'ERROR'):
+                warm_up_worker()
+
+        self.assertEqual(mock_close_all.call_count, 2)
+
+    def test_web_startup_does_not_import_celery(self):
+        """
+        Тестирование того, что загрузка моделей и URL веб-процесса не импортирует Celery и Redis-клиент событий.
+        """
+        output = subprocess.check_output([
+            sys.executable, '-c',
+            'import sys, django; django.setup(); import service.urls; '
+            'print(sorted(name for name in ("celery", "celery_batches", "services.tasks") if name in sys.modules))',
+        ], text=True)
+
+        self.assertEqual(output.strip(), '[]')